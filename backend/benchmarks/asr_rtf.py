@@ -0,0 +1,66 @@
+# backend/benchmarks/asr_rtf.py
+"""
+Real-time factor of the Whisper paths vs. worker count.
+
+    python -m benchmarks.asr_rtf --audio meeting.mp4 --minutes 60 --workers 1 2 4 8
+
+The recording is decoded once and tiled up to --minutes, so every run sees the
+same PCM. RTF = wall time / audio duration (lower is better; 0.1 = 10x faster
+than real time). Prints one JSON object per run.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from utils.audio_pipeline import SAMPLE_RATE, iter_pcm_chunks, transcribe_parallel, transcribe_stream
+from utils.speech_to_text import WHISPER_MODEL, build_whisper
+
+
+def load_audio(path: str, minutes: float) -> np.ndarray:
+    audio = np.concatenate(list(iter_pcm_chunks(path)))
+    if minutes:
+        target = int(minutes * 60 * SAMPLE_RATE)
+        audio = np.tile(audio, -(-target // len(audio)))[:target]
+    return audio
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--audio", required=True, help="any file ffmpeg can decode")
+    ap.add_argument("--minutes", type=float, default=0, help="tile the audio to this length (0 = as is)")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--model", default=WHISPER_MODEL)
+    ap.add_argument("--beam", type=int, default=1)
+    ap.add_argument("--sequential", action="store_true", help="also time the sequential transcribe_stream path")
+    args = ap.parse_args()
+
+    audio = load_audio(args.audio, args.minutes)
+    duration = len(audio) / SAMPLE_RATE
+
+    runs = [("sequential", 1)] if args.sequential else []
+    runs += [("parallel", w) for w in args.workers]
+    for mode, workers in runs:
+        model = build_whisper(workers, args.model)
+        t0 = time.perf_counter()
+        if mode == "parallel":
+            result = transcribe_parallel(model, audio, workers=workers, beam_size=args.beam)
+        else:
+            result = transcribe_stream(model, audio, beam_size=args.beam)
+        wall = time.perf_counter() - t0
+        print(json.dumps({
+            "mode": mode,
+            "workers": workers,
+            "model": args.model,
+            "audio_sec": round(duration, 1),
+            "speech_sec": result.get("speech"),
+            "wall_sec": round(wall, 2),
+            "rtf": round(wall / duration, 4),
+            "segments": len(result["segments"]),
+        }), flush=True)
+        del model
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# backend/benchmarks/compare.py
+"""
+Diff two benchmarks.run result files.
+
+    python -m benchmarks.compare before.json after.json --threshold 10
+
+Compares p50 of every micro-benchmark and p95 / throughput of every load-test
+route present in both. Exits 1 if anything got slower than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+
+def _pct(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(before: dict, after: dict, threshold: float = 10.0) -> list:
+    """[(name, metric, before, after, change %, regressed)]; for rps, lower is worse."""
+    rows = []
+    old = {(r["bench"], str(r["size"])): r for r in before.get("micro", [])}
+    for r in after.get("micro", []):
+        prev = old.get((r["bench"], str(r["size"])))
+        if prev and prev.get("n") and r.get("n"):
+            change = _pct(prev["p50_ms"], r["p50_ms"])
+            rows.append((f"{r['bench']} [{r['size']}]", "p50_ms", prev["p50_ms"], r["p50_ms"], change, change > threshold))
+
+    old_routes = before.get("load", {}).get("routes", {})
+    for route, r in after.get("load", {}).get("routes", {}).items():
+        prev = old_routes.get(route)
+        if not prev or not prev.get("n") or not r.get("n"):
+            continue
+        change = _pct(prev["p95_ms"], r["p95_ms"])
+        rows.append((route, "p95_ms", prev["p95_ms"], r["p95_ms"], change, change > threshold))
+        change = _pct(prev["rps"], r["rps"])
+        rows.append((route, "rps", prev["rps"], r["rps"], change, -change > threshold))
+    return rows
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("before")
+    ap.add_argument("after")
+    ap.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    args = ap.parse_args(argv)
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    print(f"{before.get('git_sha')} -> {after.get('git_sha')}")
+    rows = compare(before, after, args.threshold)
+    for name, metric, b, a, change, bad in rows:
+        print(f"{'!!' if bad else '  '} {name:40} {metric:7} {b:>10.1f} -> {a:>10.1f}  {change:+6.1f}%")
+    regressions = sum(1 for *_, bad in rows if bad)
+    print(f"{regressions} regression(s) over {args.threshold:g}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# backend/benchmarks/env.py
+"""
+Offline environment for benchmarks: SQLite, the fake LLM backend, scratch cache
+dirs, no background warm-up. Must run before `main` is imported.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_offline(workdir: str = None, fake_llm_latency: float = 0.05) -> str:
+    """Point everything at `workdir` (temp dir by default) and chdir there, so scratch files don't touch the repo."""
+    workdir = os.path.abspath(workdir or tempfile.mkdtemp(prefix="minapps_bench_"))
+    os.makedirs(workdir, exist_ok=True)
+    env = {
+        "DATABASE_URL": "sqlite:///" + os.path.join(workdir, "bench.db"),
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(fake_llm_latency),
+        "WARMUP_ON_BOOT": "0",
+        "MOM_CACHE_DIR": os.path.join(workdir, "cache", "mom"),
+        "ASR_CACHE_DIR": os.path.join(workdir, "cache", "asr"),
+        "ACCESS_LOG_SAMPLE": "0",
+    }
+    for k, v in env.items():
+        os.environ.setdefault(k, v)
+    if BACKEND not in sys.path:
+        sys.path.insert(0, BACKEND)
+    os.chdir(workdir)
+    return workdir
+
+
+def load_app():
+    import main
+    return main.app
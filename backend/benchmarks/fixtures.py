@@ -0,0 +1,130 @@
+# backend/benchmarks/fixtures.py
+"""
+Deterministic fixture corpora, generated once and reused:
+
+- text PDFs of 1 / 10 / 100 / 1000 pages (PyMuPDF)
+- PNG / JPEG images at a few resolutions (Pillow)
+- "speech" WAVs: a glottal pulse train with drifting pitch through vowel-like
+  formant filters, in syllable-rate bursts separated by pauses. Not words, but
+  it has the spectral shape and speech/silence structure VAD and the decoder
+  see in real recordings.
+
+    python -m benchmarks.fixtures --dir cache/bench_fixtures --pages 1 10 100 1000
+"""
+import argparse
+import os
+import wave
+
+import numpy as np
+
+PDF_PAGES = (1, 10, 100, 1000)
+IMAGE_SIZES = ((640, 480), (1920, 1080), (4000, 3000))
+WAV_SECONDS = (10, 60)
+RATE = 16000
+
+_WORDS = ("meeting project release backend frontend decision action owner deadline budget review "
+          "design api database latency throughput customer report quarter plan risk").split()
+_VOWELS = ((730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240), (530, 1840, 2480), (570, 840, 2410))
+
+
+def make_pdf(path: str, pages: int, seed: int = 0):
+    import fitz
+
+    rng = np.random.default_rng(seed)
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page(width=595, height=842)  # A4
+        page.insert_text((56, 60), f"Benchmark document - page {n + 1} of {pages}", fontsize=14)
+        lines = [" ".join(rng.choice(_WORDS, 12)) for _ in range(40)]
+        page.insert_text((56, 90), "\n".join(lines), fontsize=10)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def make_image(path: str, size, seed: int = 0):
+    from PIL import Image
+
+    w, h = size
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    rgb = np.stack([np.broadcast_to(x, (h, w)), np.broadcast_to(y, (h, w)), (x + y) / 2 % 256], axis=-1)
+    rgb = np.clip(rgb + rng.normal(0, 12, rgb.shape), 0, 255).astype(np.uint8)
+    Image.fromarray(rgb, "RGB").save(path, quality=90) if path.endswith(".jpg") else Image.fromarray(rgb, "RGB").save(path)
+
+
+def _resonate(signal: np.ndarray, freq: float, bw: float = 90.0) -> np.ndarray:
+    """Two-pole resonator (formant filter), applied as a convolution with its impulse response."""
+    r = np.exp(-np.pi * bw / RATE)
+    theta = 2 * np.pi * freq / RATE
+    n = np.arange(int(RATE * 0.04))
+    h = r ** n * np.sin((n + 1) * theta) / np.sin(theta)
+    return np.convolve(signal, h)[:len(signal)]
+
+
+def synth_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    out = np.zeros(int(seconds * RATE), dtype=np.float32)
+    t = 0
+    while t < len(out):
+        # a "phrase": 3-8 syllables, then a pause
+        for _ in range(rng.integers(3, 9)):
+            n = int(RATE * rng.uniform(0.12, 0.28))
+            f0 = rng.uniform(100, 190) * np.linspace(1.05, 0.95, n)
+            phase = np.cumsum(f0 / RATE)
+            pulses = (np.diff(np.floor(phase), prepend=0) > 0).astype(np.float64)
+            voiced = sum(_resonate(pulses, f) for f in _VOWELS[rng.integers(len(_VOWELS))])
+            env = np.hanning(n)
+            seg = (voiced * env).astype(np.float32)
+            end = min(t + n, len(out))
+            out[t:end] += seg[:end - t]
+            t = end
+        t += int(RATE * rng.uniform(0.3, 1.2))
+    out += rng.normal(0, 0.002, len(out)).astype(np.float32)
+    return 0.6 * out / (np.abs(out).max() or 1)
+
+
+def make_wav(path: str, seconds: float, seed: int = 0):
+    pcm = (synth_speech(seconds, seed) * 32767).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+
+
+def build_corpus(directory: str, pdf_pages=PDF_PAGES, image_sizes=IMAGE_SIZES, wav_seconds=WAV_SECONDS) -> dict:
+    """Create missing fixtures; returns {"pdf": {pages: path}, "image": {"WxH.ext": path}, "wav": {sec: path}}."""
+    os.makedirs(directory, exist_ok=True)
+    corpus = {"pdf": {}, "image": {}, "wav": {}}
+    for pages in pdf_pages:
+        path = os.path.join(directory, f"doc_{pages}p.pdf")
+        if not os.path.exists(path):
+            make_pdf(path, pages, seed=pages)
+        corpus["pdf"][pages] = path
+    for w, h in image_sizes:
+        for ext in ("png", "jpg"):
+            path = os.path.join(directory, f"img_{w}x{h}.{ext}")
+            if not os.path.exists(path):
+                make_image(path, (w, h), seed=w)
+            corpus["image"][f"{w}x{h}.{ext}"] = path
+    for sec in wav_seconds:
+        path = os.path.join(directory, f"speech_{sec:g}s.wav")
+        if not os.path.exists(path):
+            make_wav(path, sec, seed=int(sec))
+        corpus["wav"][sec] = path
+    return corpus
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dir", default="cache/bench_fixtures")
+    ap.add_argument("--pages", type=int, nargs="+", default=list(PDF_PAGES))
+    ap.add_argument("--wav-seconds", type=float, nargs="+", default=list(WAV_SECONDS))
+    args = ap.parse_args()
+    corpus = build_corpus(args.dir, args.pages, IMAGE_SIZES, args.wav_seconds)
+    for kind, items in corpus.items():
+        for key, path in items.items():
+            print(f"{kind:6} {str(key):>14}  {os.path.getsize(path) / 1024:10.1f} KB  {path}")
+
+
+if __name__ == "__main__":
+    main()
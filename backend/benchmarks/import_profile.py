@@ -0,0 +1,68 @@
+# backend/benchmarks/import_profile.py
+"""
+Import-time profile of the API process (what a cold start pays before serving).
+
+    python -m benchmarks.import_profile --top 25
+    python -m benchmarks.import_profile --json > import_profile.json
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter with the
+background warm-up disabled and reports the slowest modules by cumulative and
+by self time, plus the wall time of the whole import.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("PyPDF2", "pdf2docx", "fitz", "google.generativeai", "faster_whisper", "fpdf", "numpy", "pandas", "pptx")
+
+
+def profile(target: str = "main") -> dict:
+    env = {**os.environ, "WARMUP_ON_BOOT": "0"}
+    code = f"import {target}, sys, json; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=BACKEND, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr[-2000:])
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    eager_heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {"target": target, "wall_sec": round(wall, 3), "modules": modules, "eager_heavy_modules": eager_heavy}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--target", default="main")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    report = profile(args.target)
+    by_cum = sorted(report["modules"], key=lambda m: -m["cumulative_ms"])[:args.top]
+    by_self = sorted(report["modules"], key=lambda m: -m["self_ms"])[:args.top]
+    if args.json:
+        print(json.dumps({**report, "modules": None, "top_cumulative": by_cum, "top_self": by_self}, indent=2))
+        return
+
+    print(f"import {report['target']}: {report['wall_sec']:.2f}s wall (interpreter start included)")
+    print(f"heavy modules imported eagerly: {', '.join(report['eager_heavy_modules']) or 'none'}\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for m in by_cum:
+        print(f"{m['cumulative_ms']:>14.1f} {m['self_ms']:>9.1f}  {m['module']}")
+    print(f"\n{'self ms':>14}  module")
+    for m in by_self:
+        print(f"{m['self_ms']:>14.1f}  {m['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# backend/benchmarks/load.py
+"""
+In-process concurrent load generator.
+
+`concurrency` asyncio workers share one httpx.AsyncClient on an ASGITransport
+(no sockets, no server) and pick requests round-robin from a weighted mix
+until `duration` seconds pass. Per-route latency percentiles, throughput and
+error counts come back as a dict. Endpoints still run their blocking work on
+the threadpool, so CPU-bound routes contend exactly as they would under uvicorn.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.stats import summarize
+
+# (route label, weight, build() -> (method, url, kwargs))
+Request = Tuple[str, int, Callable[[], Tuple[str, str, dict]]]
+
+
+def default_mix(corpus: dict) -> List[Request]:
+    """Light reads, a small and a mid-size PDF job, and the fake-LLM MOM path."""
+    small = min(corpus["pdf"])
+    mid = sorted(corpus["pdf"])[min(1, len(corpus["pdf"]) - 1)]
+    pdfs = {p: open(corpus["pdf"][p], "rb").read() for p in {small, mid}}
+    counter = itertools.count()
+    return [
+        ("GET /health", 4, lambda: ("get", "/health", {})),
+        ("GET /applications", 2, lambda: ("get", "/applications", {})),
+        ("POST /convert/pdf-to-text", 3, lambda: (
+            "post", "/convert/pdf-to-text", {"files": {"file": ("s.pdf", pdfs[small], "application/pdf")}})),
+        ("POST /convert/pdf-split", 1, lambda: (
+            "post", "/convert/pdf-split",
+            {"files": {"file": ("m.pdf", pdfs[mid], "application/pdf")}, "data": {"pages": "1"}})),
+        ("POST /ai/mom-generator", 1, lambda: (
+            "post", "/ai/mom-generator", {"data": {"transcript": f"load test {next(counter)}: agreed on owners."}})),
+    ]
+
+
+async def _run(app, mix: List[Request], concurrency: int, duration: float) -> dict:
+    import httpx
+
+    schedule = itertools.cycle([r for r in mix for _ in range(r[1])])
+    latencies: Dict[str, List[float]] = {r[0]: [] for r in mix}
+    errors: Dict[str, int] = {r[0]: 0 for r in mix}
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                 timeout=None) as client:
+        async def worker():
+            while time.perf_counter() < deadline:
+                label, _, build = next(schedule)
+                method, url, kwargs = build()
+                t0 = time.perf_counter()
+                try:
+                    r = await client.request(method.upper(), url, **kwargs)
+                    failed = r.status_code >= 400
+                except Exception:
+                    failed = True
+                latencies[label].append(time.perf_counter() - t0)
+                errors[label] += failed
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    routes = {
+        label: {**summarize(xs), "rps": round(len(xs) / elapsed, 2), "errors": errors[label]}
+        for label, xs in latencies.items()
+    }
+    total = sum(len(xs) for xs in latencies.values())
+    return {
+        "concurrency": concurrency,
+        "duration_sec": round(elapsed, 2),
+        "requests": total,
+        "rps": round(total / elapsed, 2),
+        "errors": sum(errors.values()),
+        "routes": routes,
+    }
+
+
+def run(app, mix: List[Request], concurrency: int = 8, duration: float = 10.0) -> dict:
+    logging.getLogger("httpx").setLevel(logging.WARNING)   # one INFO line per request otherwise
+    return asyncio.run(_run(app, mix, concurrency, duration))
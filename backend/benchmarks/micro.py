@@ -0,0 +1,128 @@
+# backend/benchmarks/micro.py
+"""
+Micro-benchmarks: every converter endpoint (and the Whisper path) called
+in-process through TestClient against each fixture size, `repeat` times.
+
+Caches are defeated so every repeat measures the cold path: the transcript
+cache is cleared before each ASR call and each MOM request gets a unique
+transcript. ASR runs with a stub model by default (upload + ffmpeg decode +
+VAD / chunking, not Whisper itself); pass whisper_model="tiny" etc. to time a
+real model if it's available locally.
+"""
+import os
+import shutil
+import time
+from types import SimpleNamespace
+
+from benchmarks.stats import summarize
+
+PDF = "application/pdf"
+DOCX_MAX_PAGES = int(os.getenv("BENCH_DOCX_MAX_PAGES", "10"))       # pdf2docx is ~0.3 s/page; cap it
+IMAGE_MAX_PAGES = int(os.getenv("BENCH_IMAGE_MAX_PAGES", "100"))
+MOM_LINE = "The team reviewed the release plan, agreed on owners and set the date. "
+
+
+class StubWhisper:
+    """Same call shape as WhisperModel; one segment per call, no inference."""
+
+    def transcribe(self, audio, beam_size=1, vad_filter=True, **_):
+        return iter([SimpleNamespace(start=0.0, end=len(audio) / 16000, text=" stub")]), None
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def pdf_cases(corpus: dict):
+    """(bench, size, build(i) -> (method, url, kwargs)) per fixture PDF."""
+    for pages, path in sorted(corpus["pdf"].items()):
+        data = _read(path)
+        upload = {"file": ("doc.pdf", data, PDF)}
+        yield "pdf-to-text", pages, lambda i, u=upload: ("post", "/convert/pdf-to-text", {"files": u})
+        yield "pdf-split", pages, lambda i, u=upload, p=pages: (
+            "post", "/convert/pdf-split", {"files": u, "data": {"pages": f"1-{max(1, p // 2)}"}})
+        yield "pdf-merge", pages, lambda i, d=data: (
+            "post", "/convert/pdf-merge", {"files": [("files", ("a.pdf", d, PDF)), ("files", ("b.pdf", d, PDF))]})
+        yield "pdf-lock", pages, lambda i, u=upload: (
+            "post", "/convert/pdf-lock", {"files": u, "data": {"password": "bench"}})
+        if pages <= IMAGE_MAX_PAGES:
+            yield "pdf-to-image", pages, lambda i, u=upload: ("post", "/convert/pdf-to-image", {"files": u})
+        if pages <= DOCX_MAX_PAGES:
+            yield "pdf-to-word", pages, lambda i, u=upload: ("post", "/convert/pdf-to-word", {"files": u})
+
+
+def unlock_cases(client, corpus: dict):
+    """pdf-unlock needs encrypted input: lock each fixture once through the API."""
+    for pages, path in sorted(corpus["pdf"].items()):
+        r = client.post("/convert/pdf-lock", files={"file": ("doc.pdf", _read(path), PDF)}, data={"password": "bench"})
+        if r.status_code != 200:
+            continue
+        upload = {"file": ("locked.pdf", r.content, PDF)}
+        yield "pdf-unlock", pages, lambda i, u=upload: (
+            "post", "/convert/pdf-unlock", {"files": u, "data": {"password": "bench"}})
+
+
+def mom_cases(corpus: dict):
+    for name, path in sorted(corpus["image"].items()):
+        if name.endswith(".jpg"):
+            data = _read(path)
+            yield "ai-mom-image", name, lambda i, d=data, n=name: (
+                "post", "/ai/mom-generator",
+                {"files": {"image": (n, d, "image/jpeg")}, "data": {"transcript": f"run {time.time_ns()} {i}"}})
+    for words in (500, 20000):
+        body = MOM_LINE * (words // 12)
+        yield "ai-mom-transcript", words, lambda i, b=body: (
+            "post", "/ai/mom-generator", {"data": {"transcript": f"run {time.time_ns()} {i}. {b}"}})
+
+
+def asr_cases(corpus: dict, whisper_model=None):
+    suffix = f"&model={whisper_model}" if whisper_model else ""
+    for sec, path in sorted(corpus["wav"].items()):
+        data = _read(path)
+        for mode in ("sequential", "parallel"):
+            yield f"transcribe-{mode}", sec, lambda i, d=data, m=mode: (
+                "post", f"/transcribe/local?mode={m}{suffix}", {"files": {"file": ("speech.wav", d, "audio/wav")}})
+
+
+def run(client, corpus: dict, repeat: int = 3, whisper_model=None, only=None) -> list:
+    import utils.speech_to_text as stt
+    from utils.audio_pipeline import FFMPEG
+    from utils.transcript_cache import asr_cache
+
+    cases = list(pdf_cases(corpus)) + list(unlock_cases(client, corpus)) + list(mom_cases(corpus))
+    if shutil.which(FFMPEG):
+        cases += list(asr_cases(corpus, whisper_model))
+    else:
+        print(f"[WARN] {FFMPEG} not found, skipping transcribe benchmarks")
+
+    default_model = stt.whisper_model
+    if whisper_model is None:
+        stt.whisper_model = StubWhisper()
+    try:
+        return _run_cases(cases, client, asr_cache, repeat, whisper_model, only)
+    finally:
+        stt.whisper_model = default_model
+
+
+def _run_cases(cases, client, asr_cache, repeat, whisper_model, only) -> list:
+    results = []
+    for name, size, build in cases:
+        if only and name not in only:
+            continue
+        times, status, out_bytes = [], None, 0
+        for i in range(repeat):
+            method, url, kwargs = build(i)
+            if name.startswith("transcribe"):
+                asr_cache.clear()
+            t0 = time.perf_counter()
+            r = getattr(client, method)(url, **kwargs)
+            times.append(time.perf_counter() - t0)
+            status, out_bytes = r.status_code, len(r.content)
+        row = {"bench": name, "size": size, "status": status, "bytes_out": out_bytes, **summarize(times)}
+        if name.startswith("transcribe"):
+            row["asr_model"] = whisper_model or "stub"
+            row["rtf"] = round(row["p50_ms"] / 1000 / float(size), 4)
+        results.append(row)
+        print(f"  {name:20} {str(size):>12}  p50 {row['p50_ms']:>10.1f} ms  [{status}]", flush=True)
+    return results
@@ -0,0 +1,91 @@
+# backend/benchmarks/run.py
+"""
+Full offline benchmark run: generate fixtures, micro-benchmark every converter
+and the ASR path, then a concurrent load test. Writes one JSON file to diff
+between commits with benchmarks.compare.
+
+    python -m benchmarks.run --quick --out bench-before.json
+    git checkout other-branch
+    python -m benchmarks.run --quick --out bench-after.json
+    python -m benchmarks.compare bench-before.json bench-after.json
+
+Runs without network: SQLite, the fake LLM backend (FAKE_LLM_LATENCY) and a
+stub Whisper model unless --whisper-model names one that's cached locally.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+QUICK = {"pdf_pages": (1, 10, 100), "wav_seconds": (10,), "repeat": 3, "duration": 5}
+FULL = {"pdf_pages": (1, 10, 100, 1000), "wav_seconds": (10, 60, 600), "repeat": 5, "duration": 30}
+
+
+def _git_sha(cwd: str) -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    size = ap.add_mutually_exclusive_group()
+    size.add_argument("--quick", action="store_true", help="small corpus, short load test (default)")
+    size.add_argument("--full", action="store_true", help="1000-page PDFs, 10 min audio, 30 s load test")
+    ap.add_argument("--out", default="bench-results.json")
+    ap.add_argument("--workdir", default=None, help="fixtures + scratch DB/caches (default: temp dir)")
+    ap.add_argument("--only", nargs="*", help="micro-benchmark names to run (e.g. pdf-split transcribe-parallel)")
+    ap.add_argument("--repeat", type=int)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float)
+    ap.add_argument("--no-load", action="store_true", help="skip the load test")
+    ap.add_argument("--whisper-model", default=None, help="time a real Whisper tier instead of the stub")
+    ap.add_argument("--llm-latency", type=float, default=0.05, help="fake LLM delay per call (seconds)")
+    args = ap.parse_args(argv)
+    preset = FULL if args.full else QUICK
+    out = os.path.abspath(args.out)
+
+    from benchmarks.env import BACKEND, load_app, setup_offline
+    workdir = setup_offline(args.workdir, args.llm_latency)
+
+    from benchmarks import fixtures, load, micro
+    from fastapi.testclient import TestClient
+
+    print(f"[Bench] fixtures -> {workdir}")
+    corpus = fixtures.build_corpus(os.path.join(workdir, "fixtures"), pdf_pages=preset["pdf_pages"],
+                                   wav_seconds=preset["wav_seconds"])
+    app = load_app()
+    report = {
+        "git_sha": _git_sha(BACKEND),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "preset": "full" if args.full else "quick",
+        "llm_latency_sec": args.llm_latency,
+    }
+    with TestClient(app) as client:
+        print("[Bench] micro-benchmarks")
+        report["micro"] = micro.run(client, corpus, repeat=args.repeat or preset["repeat"],
+                                    whisper_model=args.whisper_model, only=args.only)
+        if not args.no_load:
+            duration = args.duration or preset["duration"]
+            print(f"[Bench] load: {args.concurrency} workers for {duration:g}s")
+            report["load"] = load.run(app, load.default_mix(corpus), args.concurrency, duration)
+            for route, row in report["load"]["routes"].items():
+                print(f"  {route:28} p50 {row.get('p50_ms', 0):>8.1f}  p95 {row.get('p95_ms', 0):>8.1f}  "
+                      f"p99 {row.get('p99_ms', 0):>8.1f} ms  {row['rps']:>7.1f} req/s  err {row['errors']}")
+
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"[Bench] wrote {out}")
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(main() and 0)
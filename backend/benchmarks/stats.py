@@ -0,0 +1,29 @@
+# backend/benchmarks/stats.py
+import math
+import statistics
+from typing import List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float]) -> dict:
+    """Seconds in, milliseconds out."""
+    xs = sorted(latencies)
+    if not xs:
+        return {"n": 0}
+    ms = lambda v: round(v * 1000, 3)  # noqa: E731
+    return {
+        "n": len(xs),
+        "min_ms": ms(xs[0]),
+        "mean_ms": ms(statistics.fmean(xs)),
+        "p50_ms": ms(percentile(xs, 50)),
+        "p95_ms": ms(percentile(xs, 95)),
+        "p99_ms": ms(percentile(xs, 99)),
+        "max_ms": ms(xs[-1]),
+    }
@@ -0,0 +1,23 @@
+# Tests run offline: throwaway SQLite file (unless TEST_DATABASE_URL points elsewhere),
+# the fake LLM backend and a temp cache dir. Must run before `database`/`main` are imported.
+import os, tempfile
+
+_tmp = tempfile.mkdtemp(prefix="minapps_test_")
+
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "sqlite:///" + os.path.join(_tmp, "test.db"))
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("MOM_CACHE_DIR", os.path.join(_tmp, "mom_cache"))
+os.environ.setdefault("ASR_CACHE_DIR", os.path.join(_tmp, "asr_cache"))
+os.environ.setdefault("WARMUP_ON_BOOT", "0")
+os.environ.setdefault("PROFILE_ADMIN_TOKEN", "test-profile-token")
+os.environ.setdefault("PROFILE_DIR", os.path.join(_tmp, "profiles"))
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_tmp, "uploads"))
+os.environ.setdefault("DOC_DIR", os.path.join(_tmp, "docs"))
+os.environ.setdefault("THUMB_DIR", os.path.join(_tmp, "thumbs"))
+os.environ.setdefault("TASK_DIR", os.path.join(_tmp, "tasks"))
+os.environ.setdefault("ARTIFACT_DIR", os.path.join(_tmp, "artifacts"))
+os.environ.setdefault("FAIR_SHARE", "0")   # test_fair_share.py mounts the middleware on its own app
+
+import migrate   # schema once per session; main no longer migrates on import
+
+migrate.upgrade_to_head()
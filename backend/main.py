@@ -1,31 +1,66 @@
-from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, BackgroundTasks, Form
+from fastapi import FastAPI, Depends, HTTPException, File, UploadFile, BackgroundTasks, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import os, io, uuid, shutil, asyncio, html, tempfile, wave, struct
+import os, io, uuid, shutil, asyncio, html, tempfile, wave, struct, hashlib, json
 from pathlib import Path
 
-import google.generativeai as genai
-from faster_whisper import WhisperModel
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
-from pdf2docx import Converter
-from pptx import Presentation
-import pandas as pd
-
-import models, schemas, database
+import models, schemas, database, migrate
+from utils import lazy_imports
+from utils.lazy_imports import lazy
 from routers.pdf_to_image import router as pdf_image_router
-from routers.auth import router as auth_router
-from routers.user_data import router as user_data_router
+if database.ASYNC_DB:
+    from routers.auth_async import router as auth_router
+    from routers.user_data_async import router as user_data_router
+else:
+    from routers.auth import router as auth_router
+    from routers.user_data import router as user_data_router
+from routers.suggestions import router as suggestions_router
+from routers.mom_history import router as mom_history_router
+from routers.mom_generator import router as meeting_mom_router
+from routers.profiles import router as profiles_router
+from routers.uploads import router as uploads_router, upload_input, upload_inputs
+from routers.documents import router as documents_router
+from routers.tasks import router as tasks_router
+from routers.artifacts import router as artifacts_router, artifact_download
+from routers.auth import get_optional_user
+from utils.catalog_cache import CatalogCache
+from utils.http_headers import accepts_gzip, etag_matches
+from utils import metrics
+from utils.metrics import MetricsMiddleware
+from utils.profiling import ProfilingMiddleware, profiling_enabled, stage
+from utils.disk_cache import DiskCache
+from utils.llm import get_llm_backend
+from utils.mom_history import save_mom
+from utils.media_prep import prepare_media, RemoteFileCache
+from utils.mom_mapreduce import map_reduce_mom, estimate_tokens, MOM_LONG_THRESHOLD_TOKENS
+from utils.single_flight import SingleFlight
+from utils.resumable_upload import upload_store
+from utils.doc_sessions import documents
+from utils.thumbnails import thumbnails
+from utils.page_spec import PageSpecError, compile_pages
+from utils import task_queue
+from utils.artifacts import artifacts
+from utils.fair_share import FAIR_SHARE, FairShareMiddleware, build_scheduler
+from utils.pdf_split_many import SplitError, plan_file, splitter
+from utils.pdf_optimize import PDF_OPT_DPI, PDF_OPT_QUALITY, optimize_file, optimize_pdf
+from utils.audio_pipeline import AudioDecodeError, ASR_WORKERS
+from utils.speech_to_text import (
+    load_whisper, ensure_whisper, is_default, resolve_model, transcribe_with, WHISPER_BEAM,
+    registry as whisper_registry,
+)
+from utils.transcript_cache import asr_cache, asr_flights, fingerprint, transcript_key
+
+# Heavy tool modules: imported on first use or by the background warm-up (see /ready)
+PyPDF2 = lazy("PyPDF2", "pdf")
+pdf2docx = lazy("pdf2docx", "pdf_to_word")
 
 # ---- Environment Variables ----
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
-WHISPER_BEAM = int(os.getenv("WHISPER_BEAM", "1"))
-WHISPER_COMPUTE = os.getenv("WHISPER_COMPUTE", "cpu")
 
-genai.configure(api_key=GEMINI_API_KEY)
+genai = lazy("google.generativeai", "llm", on_import=lambda m: m.configure(api_key=GEMINI_API_KEY))
 
 # ------------------------ FastAPI App ------------------------
 app = FastAPI(title="My Applications - MOM API", version="0.1.0")
@@ -37,6 +72,12 @@ origins = [
     "http://localhost:3000",
     # "https://my-applications-mocha.vercel.app",  # optional fixed prod
 ]
+# Per-user/IP token buckets + fair queue per cost class (utils/fair_share.py); added before CORS so
+# it runs inside it and 429s still carry the CORS headers the browser needs to read them
+fair_share = build_scheduler()
+if FAIR_SHARE:
+    app.add_middleware(FairShareMiddleware, scheduler=fair_share)
+
 # ---- CORS ----
 app.add_middleware(
     CORSMiddleware,
@@ -44,6 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Content-Location"],   # stable download URL of converted files (routers/artifacts.py)
 )
 
 # COEP-friendly: CORP on all responses
@@ -53,25 +95,12 @@ async def add_corp_header(request, call_next):
     resp.headers["Cross-Origin-Resource-Policy"] = "cross-origin"
     return resp
 
-# (Optional) debug to verify origin reaches the app
-@app.middleware("http")
-async def log_origin(request, call_next):
-    print("[CORS] Origin:", request.headers.get("origin"))
-    return await call_next(request)
-
-# Optimized Whisper Load (SIRF EK BAAR)
-whisper_model: Optional[WhisperModel] = None
-try:
-    whisper_model = WhisperModel(
-        WHISPER_MODEL, 
-        device="cpu", 
-        compute_type="int8",
-        cpu_threads=1, # Free tier memory protection
-        num_workers=1
-    )
-    print(f"[Whisper] Loaded model='{WHISPER_MODEL}' in Low-Power mode")
-except Exception as e:
-    print(f"[WARN] Faster-Whisper init failed: {e}")
+# Per-route latency / status / bytes + sampled JSON access logs (origin included); see GET /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Per-request profiling (X-Profile: <PROFILE_ADMIN_TOKEN>); not installed at all unless the token is set
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
 
 # ---- Helper functions ----
 def _write_silence_wav(path, duration_sec=0.5, rate=16000):
@@ -80,16 +109,77 @@ def _write_silence_wav(path, duration_sec=0.5, rate=16000):
         w.setnchannels(1); w.setsampwidth(2); w.setframerate(rate)
         w.writeframes(struct.pack("<h", 0) * nframes)
 
-@app.on_event("startup")
-async def preload_whisper():
-    if whisper_model:
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-        _write_silence_wav(tmp.name, 0.5)
+def _warm_whisper(model):
+    """One real decode so the first user request doesn't pay for lazy init."""
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+    tmp.close()
+    _write_silence_wav(tmp.name, 0.5)
+    try:
+        segments, _ = model.transcribe(tmp.name, beam_size=WHISPER_BEAM)
+        list(segments)  # segments are lazy; decoding happens on iteration
+    finally:
+        os.remove(tmp.name)
+
+whisper_registry.warmup = _warm_whisper   # every model is warmed before first use
+
+# extra tiers to have resident at boot, e.g. WHISPER_PRELOAD=base,small
+WHISPER_PRELOAD = [m.strip() for m in os.getenv("WHISPER_PRELOAD", "").split(",") if m.strip()]
+
+def preload_whisper():
+    """Default model (SIRF EK BAAR, see utils/speech_to_text.py) + WHISPER_PRELOAD tiers, loaded and warmed."""
+    if load_whisper() is None:
+        raise RuntimeError("default Whisper model failed to load")
+    print("[Whisper preload] Warm-up done")
+    for tier in WHISPER_PRELOAD:
         try:
-            whisper_model.transcribe(tmp.name, beam_size=WHISPER_BEAM)
-            print("[Whisper preload] Warm-up done")
-        finally:
-            os.remove(tmp.name)
+            whisper_registry.get(*resolve_model(tier))
+        except Exception as e:
+            print(f"[WARN] Whisper preload of '{tier}' failed: {e}")
+
+lazy("faster_whisper", "asr")
+lazy_imports.on_warm("asr", preload_whisper)
+
+# Nothing heavy happens before the port is bound: warm-up runs in a background
+# thread after startup, most-used subsystems first. WARMUP_ON_BOOT=0 disables it.
+WARMUP_ON_BOOT = os.getenv("WARMUP_ON_BOOT", "1") == "1"
+WARMUP_ORDER = ["pdf", "asr", "llm", "pdf_to_word", "mom_pdf"]
+
+@app.on_event("startup")
+async def start_warmup():
+    if WARMUP_ON_BOOT:
+        lazy_imports.start_background_warmup(WARMUP_ORDER)
+
+@app.on_event("startup")
+async def evict_idle_whispers():
+    async def loop():
+        while True:
+            await asyncio.sleep(60)
+            whisper_registry.evict_idle()
+    asyncio.create_task(loop())
+
+@app.on_event("startup")
+async def expire_uploads():
+    async def loop():
+        while True:
+            await asyncio.sleep(600)
+            removed = await asyncio.to_thread(upload_store.cleanup)
+            if removed:
+                print(f"[Uploads] Expired {removed} resumable upload(s)")
+            removed = await asyncio.to_thread(documents.cleanup)
+            if removed:
+                print(f"[Documents] Expired {removed} stored document(s)")
+            removed = await asyncio.to_thread(artifacts.cleanup)
+            if removed:
+                print(f"[Artifacts] Expired {removed} download(s)")
+            removed = await asyncio.to_thread(task_queue.purge, database.engine)
+            if removed:
+                print(f"[Tasks] Purged {removed} finished task(s)")
+    asyncio.create_task(loop())
+
+@app.on_event("shutdown")
+async def stop_thumbnail_workers():
+    thumbnails.shutdown()
+    splitter.shutdown()
 
 # ---- mounts, DB, routers (NO ellipsis) ----
 for d in ["uploads", "output", "temp_uploads", "temp_mom"]:
@@ -100,80 +190,307 @@ app.mount("/output",       StaticFiles(directory="output",       check_dir=False
 app.mount("/temp_uploads", StaticFiles(directory="temp_uploads", check_dir=False), name="temp_uploads")
 app.mount("/temp_mom",     StaticFiles(directory="temp_mom",     check_dir=False), name="temp_mom")
 
-models.Base.metadata.create_all(bind=database.engine)
+# Schema is owned by Alembic (migrations/), applied by `python migrate.py` before uvicorn starts (render.yaml,
+# Dockerfile). DB_AUTO_MIGRATE=1 also upgrades on import, for a single-process dev server.
+if os.getenv("DB_AUTO_MIGRATE", "0") == "1":
+    migrate.upgrade_to_head()
+lazy_imports.mark_ready("db")
 app.include_router(pdf_image_router)
 app.include_router(auth_router)
 app.include_router(user_data_router)
+app.include_router(suggestions_router)
+app.include_router(mom_history_router)
+app.include_router(meeting_mom_router)
+app.include_router(profiles_router)
+app.include_router(uploads_router)
+app.include_router(documents_router)
+app.include_router(tasks_router)
+app.include_router(artifacts_router)
 get_db = database.get_db
 
 # ---- Gemini Logic ----
-def pick_gemini_model():
-    model_name = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
-    return genai.GenerativeModel(model_name)
+MOM_PROMPT = "Convert the following into a clean corporate MOM with Headers: TITLE, AGENDA, SUMMARY, DECISIONS, ACTION ITEMS."
+MOM_TIMEOUT_SEC = float(os.getenv("MOM_TIMEOUT_SEC", "120"))
+
+# Same prompt + transcript + attachments + model => same MOM; don't pay Gemini twice
+mom_cache = DiskCache(
+    os.getenv("MOM_CACHE_DIR", "cache/mom"),
+    ttl=float(os.getenv("MOM_CACHE_TTL_SEC", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("MOM_CACHE_MAX_MB", "64")) * 1024 * 1024,
+)
+mom_flights = SingleFlight()
 
-def _upload_to_gemini(upload: UploadFile):
+def _spool_upload(upload: UploadFile):
+    """Copy an upload to a temp file, hashing it on the way. Returns (path, sha256)."""
     suffix = Path(upload.filename or "").suffix
+    digest = hashlib.sha256()
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        shutil.copyfileobj(upload.file, tmp)
-        tmp_path = tmp.name
+        while chunk := upload.file.read(1024 * 1024):
+            digest.update(chunk)
+            tmp.write(chunk)
+    return tmp.name, digest.hexdigest()
+
+def mom_cache_key(prompt: str, transcript: str, attachment_hashes: List[str], model_name: str, mode: str = "single") -> str:
+    payload = json.dumps([prompt, transcript, attachment_hashes, model_name, mode], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# content hash -> uploaded handles; re-generating for the same media skips the upload
+remote_files = RemoteFileCache()
+
+async def _attachment_handles(llm, path: str, digest: str, kind: str) -> list:
+    key = f"{llm.name}:{digest}"
+    handles = remote_files.get(key)
+    if handles is not None:
+        return handles
+
+    workdir = tempfile.mkdtemp(prefix="mom_media_")
+    try:
+        # video -> 16 kHz mono audio + keyframes, image -> downscaled JPEG
+        files = await asyncio.to_thread(prepare_media, path, kind, workdir)
+        handles = list(await asyncio.gather(*[asyncio.to_thread(llm.upload_file, f) for f in files]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    for old in remote_files.put(key, handles):
+        try:
+            await asyncio.to_thread(llm.delete_file, old)
+        except Exception:
+            pass
+    return handles
+
+async def _generate_mom(llm, transcript: Optional[str], attachments: list, long_mode: bool = False, on_progress=None) -> str:
+    """attachments: [(path, sha256, kind)]"""
+    try:
+        uploaded_files = []
+        for path, digest, kind in attachments:
+            uploaded_files.extend(await _attachment_handles(llm, path, digest, kind))
+
+        if long_mode:
+            # chunks summarised in parallel, attachments join the final reduce call
+            return await map_reduce_mom(llm, transcript, attachments=uploaded_files, on_progress=on_progress)
+
+        parts = [MOM_PROMPT]
+        if transcript: parts.append(f"Transcript: {transcript}")
+        parts.extend(uploaded_files)
+        # Increased timeout to 120s for large transcripts
+        return await asyncio.wait_for(asyncio.to_thread(llm.generate, parts), timeout=MOM_TIMEOUT_SEC)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="MOM generation timed out")
+
+def _save_mom_history(user_id: int, mode: str, transcript: Optional[str], mom: str, cache_key: str) -> int:
+    db = database.SessionLocal()
     try:
-        return genai.upload_file(path=tmp_path)
+        return save_mom(db, user_id=user_id, mode=mode, transcript=transcript or "", mom=mom, cache_key=cache_key).id
     finally:
-        os.remove(tmp_path)
+        db.close()
 
-# ---- Whisper init ----
-whisper_model: Optional[WhisperModel] = None
-try:
-    whisper_model = WhisperModel(WHISPER_MODEL, device=WHISPER_COMPUTE, compute_type="int8")
-    print(f"[Whisper] Loaded model='{WHISPER_MODEL}' device='{WHISPER_COMPUTE}'")
-except Exception as e:
-    whisper_model = None
-    print(f"[WARN] Faster-Whisper init failed: {e}")
+def _ndjson(event: dict) -> bytes:
+    return (json.dumps(event) + "\n").encode("utf-8")
 
+async def _mom_progress_stream(run, cleanup):
+    """NDJSON: {"event": "progress", ...} per chunk, then {"event": "done", "mom": ...} or {"event": "error", ...}."""
+    events: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(run(events.put_nowait))
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(events.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield _ndjson({"event": "progress", **getter.result()})
+            else:
+                getter.cancel()
+        while not events.empty():
+            yield _ndjson({"event": "progress", **events.get_nowait()})
+        try:
+            yield _ndjson({"event": "done", **task.result()})
+        except HTTPException as e:
+            yield _ndjson({"event": "error", "status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            yield _ndjson({"event": "error", "status": 500, "detail": str(e)})
+    finally:
+        if not task.done():
+            task.cancel()
+        cleanup()
 
 # ------------------------ ROUTES ------------------------
+def _page_spec(pages: Optional[str]):
+    """Syntax-check a page selection before any upload is read (see utils/page_spec.py)."""
+    try:
+        return compile_pages(pages)
+    except PageSpecError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _resolve_pages(spec, count: int):
+    try:
+        return spec.resolve(count)
+    except PageSpecError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @app.get("/health")
 def health(): return {"status": "ok"}
 
+# ---- Metrics (Prometheus text format) ----
+# temp_* is the per-request spool dirs (temp_merge_*, temp_splitmany_*, temp_pdf2word_*, ...) as one series
+TEMP_DIRS = ["uploads", "output", "temp_uploads", "temp_mom", "cache", "temp_*"]
+_thread_limiter = None   # anyio's default to_thread limiter (sync endpoints run there)
+
+@app.on_event("startup")
+async def capture_thread_limiter():
+    global _thread_limiter
+    from anyio import to_thread
+    _thread_limiter = to_thread.current_default_thread_limiter()
+
+def _threadpool_stats():
+    if _thread_limiter is None:
+        return {}
+    st = _thread_limiter.statistics()
+    return {("busy",): st.borrowed_tokens, ("queued",): st.tasks_waiting, ("limit",): st.total_tokens}
+
+def _db_pool_stats():
+    out = {}
+    for kind, snap in database.pool_stats().items():
+        if kind in ("sync", "async"):
+            for field in ("in_use", "peak_in_use", "size", "checked_in", "overflow", "checkouts", "timeouts"):
+                if field in snap:
+                    out[(kind, field)] = snap[field]
+    return out
+
+metrics.REGISTRY.gauge("threadpool_tasks", "Worker-thread slots busy / requests queued for one", ("state",), _threadpool_stats)
+metrics.REGISTRY.gauge("single_flight_in_flight", "Deduplicated jobs currently running", ("job",),
+                       lambda: {("mom",): mom_flights.in_flight(), ("asr",): asr_flights.in_flight()})
+metrics.REGISTRY.gauge("db_pool", "SQLAlchemy pool usage", ("engine", "field"), _db_pool_stats)
+metrics.REGISTRY.gauge("temp_disk_bytes", "Bytes under scratch/cache directories", ("dir",), metrics.DirSizes(TEMP_DIRS))
+metrics.REGISTRY.gauge("doc_sessions", "Parsed documents held open by the document session API", ("field",),
+                       lambda: {(k,): v for k, v in documents.stats().items()})
+metrics.REGISTRY.gauge("fair_share_slots", "Worker slots per cost class: busy / queued requests", ("cost_class", "state"),
+                       lambda: {(c, k): v for c, q in fair_share.stats().items() for k, v in q.items()})
+metrics.REGISTRY.gauge("whisper_models_loaded_mb", "Resident Whisper models (estimated MB)", ("model", "compute_type"),
+                       lambda: {(m["model"], m["compute_type"]): m["memory_mb"] for m in whisper_registry.stats()["loaded"]})
+
+@app.get("/metrics")
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+def ready(subsystem: Optional[str] = None):
+    """Warm state per subsystem; 503 until everything asked about is warm (probe-friendly)."""
+    report = lazy_imports.readiness()
+    if subsystem:
+        state = report["subsystems"].get(subsystem)
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"Unknown subsystem '{subsystem}'")
+        ok = state["state"] == "ready"
+    else:
+        ok = report["ready"]
+    return JSONResponse(report, status_code=200 if ok else 503)
+
+@app.get("/ready/imports")
+def ready_imports(): return {"imports": lazy_imports.import_profile()}
+
+@app.get("/health/db-pool")
+def health_db_pool(): return database.pool_stats()
+
 @app.get("/")
 def root():
     return {"status": "ok", "service": "my-applications"}
 
+# ---- Applications catalog (served from an in-memory snapshot) ----
+def _load_catalog():
+    db = database.SessionLocal()
+    try:
+        return [
+            schemas.ApplicationRead.model_validate(a).model_dump()
+            for a in db.query(models.Application).order_by(models.Application.id).all()
+        ]
+    finally:
+        db.close()
+
+catalog = CatalogCache(_load_catalog)
+
 @app.get("/applications", response_model=List[schemas.ApplicationRead])
-def read_applications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(models.Application).offset(skip).limit(limit).all()
+def read_applications(
+    request: Request,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    skip: int = Query(0, ge=0),  # legacy; prefer after_id
+):
+    page = catalog.page(after_id=after_id, limit=limit, skip=skip)
+    headers = {
+        "ETag": page.etag,
+        "Cache-Control": "public, max-age=60",
+        "Vary": "Accept-Encoding",
+        "X-Catalog-Version": str(catalog.version),
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), [page.etag]):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(page.gzipped, media_type="application/json", headers=headers)
+    return Response(page.body, media_type="application/json", headers=headers)
 
 @app.post("/applications", response_model=schemas.ApplicationRead)
 def create_application(application: schemas.ApplicationCreate, db: Session = Depends(get_db)):
-    db_application = models.Application(**application.dict())
+    db_application = models.Application(**application.model_dump())
     db.add(db_application); db.commit(); db.refresh(db_application)
+    catalog.invalidate()
     return db_application
 
 @app.post("/transcribe/local")
-async def transcribe_local(file: UploadFile = File(...)):
-    if whisper_model is None:
+async def transcribe_local(
+    file: UploadFile = Depends(upload_input()),
+    mode: str = Query("auto"),    # auto | sequential | parallel (VAD + batched windows)
+    model: Optional[str] = Query(None),         # tiny | base | small | medium | large (default: WHISPER_MODEL)
+    compute_type: Optional[str] = Query(None),  # int8 | int8_float32 | float32 ...
+):
+    if mode not in ("auto", "sequential", "parallel"):
+        raise HTTPException(status_code=400, detail="mode must be auto, sequential or parallel")
+    parallel = mode == "parallel" or (mode == "auto" and ASR_WORKERS > 1)
+    try:
+        model_name, compute = resolve_model(model, compute_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # retries / re-runs of the same recording: answer from disk before any decode
+    digest = await asyncio.to_thread(fingerprint, file.file)
+    key = transcript_key(digest, f"{model_name}/{compute}", WHISPER_BEAM, parallel)
+    hit = await asyncio.to_thread(asr_cache.get, key)
+    if hit is not None:
+        return JSONResponse(hit, headers={"X-ASR-Cache": "hit", "X-Whisper-Model": model_name})
+
+    if is_default(model_name, compute) and await asyncio.to_thread(ensure_whisper) is None:
         raise HTTPException(status_code=500, detail="Whisper not loaded")
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
+
+    # audio or video, any length: ffmpeg pipe -> 16 kHz PCM chunks -> whisper (no temp WAV)
+    async def run():
+        result = await asyncio.to_thread(transcribe_with, model_name, compute, file.file, WHISPER_BEAM, parallel)
+        await asyncio.to_thread(asr_cache.set, key, result)
+        return result
+
     try:
-        segments, _ = whisper_model.transcribe(tmp_path, beam_size=WHISPER_BEAM, vad_filter=True)
-        text = "".join(seg.text for seg in segments).strip()
-        return {"text": text}
-    finally:
-        os.remove(tmp_path)
+        result = await asr_flights.do(key, run)
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=f"Whisper model '{model_name}' unavailable: {e}")
+    return JSONResponse(result, headers={"X-ASR-Cache": "miss", "X-Whisper-Model": model_name})
+
+@app.get("/whisper/models")
+def whisper_models():
+    """Loaded models with load time / memory, the RAM budget and the selectable tiers."""
+    return whisper_registry.stats()
 
 # ------------------ PDF SPLIT ------------------
 @app.post("/convert/pdf-split")
 def split_pdf(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    pages: str = Form(...)
+    file: UploadFile = Depends(upload_input()),
+    pages: str = Form(...),
+    optimize: bool = Form(False),   # dedupe / recompress / downsample the output (see /convert/pdf-optimize)
 ):
     if not pages.strip():
         raise HTTPException(status_code=400, detail="Pages are required")
+    spec = _page_spec(pages)
 
     temp_dir = f"temp_{uuid.uuid4()}"
     os.makedirs(temp_dir, exist_ok=True)
@@ -182,60 +499,103 @@ def split_pdf(
     output_path = os.path.join(temp_dir, "split.pdf")
 
     try:
-        with open(input_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        reader = PdfReader(input_path)
-        writer = PdfWriter()
-
-        selected_pages = set()
-        for part in pages.split(","):
-            part = part.strip()
-            if not part:
-                continue
-            if "-" in part:
-                start, end = part.split("-")
-                for i in range(int(start), int(end) + 1):
-                    selected_pages.add(i)
-            else:
-                selected_pages.add(int(part))
+        with stage("spool"):
+            with open(input_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
 
-        for page_num in sorted(selected_pages):
-            if 1 <= page_num <= len(reader.pages):
-                writer.add_page(reader.pages[page_num - 1])
+        with stage("parse"):
+            reader = PyPDF2.PdfReader(input_path)
+        writer = PyPDF2.PdfWriter()
+        selected = _resolve_pages(spec, len(reader.pages))
 
-        if len(writer.pages) == 0:
-            raise HTTPException(status_code=400, detail="No valid pages selected")
+        with stage("convert"):
+            for i in selected:
+                writer.add_page(reader.pages[i])
 
-        with open(output_path, "wb") as f:
-            writer.write(f)
+        with stage("write"):
+            with open(output_path, "wb") as f:
+                writer.write(f)
+
+        headers = {}
+        if optimize:
+            with stage("optimize"):
+                headers = _optimize_headers(optimize_file(output_path))
 
         background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
 
-        return FileResponse(output_path, filename="split.pdf", media_type="application/pdf")
+        return FileResponse(output_path, filename="split.pdf", media_type="application/pdf", headers=headers)
+
+    except HTTPException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ------------------ PDF SPLIT (many outputs) ------------------
+@app.post("/convert/pdf-split-many")
+async def split_pdf_many(
+    file: UploadFile = Depends(upload_input()),
+    mode: str = Form("every"),              # every | pages | bookmarks
+    every: int = Form(1, ge=1),             # pages per file for mode=every
+    level: int = Form(1, ge=1),             # deepest bookmark level that starts a file
+    pages: Optional[str] = Form(None),      # limit every/pages to this selection
+):
+    """One ZIP of many PDFs, streamed as the parts are built (see utils/pdf_split_many.py)."""
+    temp_dir = f"temp_splitmany_{uuid.uuid4()}"
+    os.makedirs(temp_dir, exist_ok=True)
+    input_path = os.path.join(temp_dir, "source.pdf")
+
+    def prepare():
+        with stage("spool"):
+            with open(input_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+        with stage("parse"):
+            return plan_file(input_path, mode, every, level, pages)
 
+    try:
+        parts = await asyncio.to_thread(prepare)
+    except SplitError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=e.status, detail=e.detail)
     except Exception as e:
         shutil.rmtree(temp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    def stream():
+        try:
+            yield from splitter.iter_zip(input_path, parts)
+        except Exception as e:   # headers are already sent: re-raise so the server aborts the connection
+            print(f"[WARN] pdf-split-many failed after streaming started: {e}")
+            raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return StreamingResponse(stream(), media_type="application/zip", headers={
+        "Content-Disposition": 'attachment; filename="split.zip"', "X-Parts": str(len(parts))})
+
 # ------------------ PDF LOCK ------------------
 @app.post("/convert/pdf-lock")
 async def lock_pdf(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    password: str = Form(...)
+    file: UploadFile = Depends(upload_input()),
+    password: str = Form(...),
+    pages: Optional[str] = Form(None),   # lock only these pages into the output (default: all)
 ):
+    spec = _page_spec(pages)
     output_path = f"locked_{uuid.uuid4()}.pdf"
     try:
-        reader = PdfReader(file.file)
-        writer = PdfWriter()
-        for page in reader.pages:
-            writer.add_page(page)
+        reader = PyPDF2.PdfReader(file.file)
+        writer = PyPDF2.PdfWriter()
+        for i in _resolve_pages(spec, len(reader.pages)):
+            writer.add_page(reader.pages[i])
         writer.encrypt(password)
         with open(output_path, "wb") as f:
             writer.write(f)
         background_tasks.add_task(os.remove, output_path)
         return FileResponse(output_path, filename="locked.pdf", media_type="application/pdf")
+    except HTTPException:
+        raise
     except Exception as e:
         try:
             if os.path.exists(output_path):
@@ -248,17 +608,17 @@ async def lock_pdf(
 @app.post("/convert/pdf-unlock")
 async def unlock_pdf(
     background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
+    file: UploadFile = Depends(upload_input()),
     password: str = Form(...)
 ):
     output_path = f"unlocked_{uuid.uuid4()}.pdf"
     try:
-        reader = PdfReader(file.file)
+        reader = PyPDF2.PdfReader(file.file)
         if reader.is_encrypted:
             ok = reader.decrypt(password)
             if ok == 0:
                 raise HTTPException(status_code=400, detail="Wrong password or corrupted PDF")
-        writer = PdfWriter()
+        writer = PyPDF2.PdfWriter()
         for page in reader.pages:
             writer.add_page(page)
         with open(output_path, "wb") as f:
@@ -282,49 +642,74 @@ async def unlock_pdf(
 
 # ------------------ PDF TO TEXT ------------------
 @app.post("/convert/pdf-to-text")
-async def pdf_to_text(file: UploadFile = File(...)):
+async def pdf_to_text(file: UploadFile = Depends(upload_input()), pages: Optional[str] = Form(None)):
+    spec = _page_spec(pages)
     try:
         pdf_bytes = await file.read()
-        reader = PdfReader(io.BytesIO(pdf_bytes))
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
         extracted_text = []
-        for page in reader.pages:
-            extracted_text.append(page.extract_text() or "")
+        for i in _resolve_pages(spec, len(reader.pages)):   # only the selected pages are parsed
+            extracted_text.append(reader.pages[i].extract_text() or "")
         return {"text": "\n".join(extracted_text).strip()}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # ------------------ PDF MERGE ------------------
 @app.post("/convert/pdf-merge")
 async def pdf_merge(
-    background_tasks: BackgroundTasks,
-    files: List[UploadFile] = File(...)
+    request: Request,
+    files: List[UploadFile] = Depends(upload_inputs()),
+    optimize: bool = Form(False),
+    pages: Optional[List[str]] = Form(None),   # one selection per input, in order ("" = all)
 ):
     if not files or len(files) < 2:
         raise HTTPException(status_code=400, detail="Please upload at least 2 PDF files")
 
+    if pages and len(pages) != len(files):
+        raise HTTPException(status_code=400, detail="Send one pages value per file")
+    specs = [_page_spec(p) for p in (pages or [None] * len(files))]
+
     temp_dir = f"temp_merge_{uuid.uuid4()}"
     os.makedirs(temp_dir, exist_ok=True)
 
-    merger = PdfMerger()
     output_path = os.path.join(temp_dir, "merged.pdf")
 
+    def merge():
+        paths = []
+        with stage("spool"):
+            for f in files:
+                file_path = os.path.join(temp_dir, f"{uuid.uuid4()}_{f.filename}")
+                with open(file_path, "wb") as buffer:
+                    shutil.copyfileobj(f.file, buffer)
+                paths.append(file_path)
+        merger = PyPDF2.PdfMerger()
+        try:
+            with stage("parse"):
+                for file_path, spec in zip(paths, specs):
+                    reader = PyPDF2.PdfReader(file_path)
+                    for r in _resolve_pages(spec, len(reader.pages)).as_tuples():
+                        merger.append(reader, pages=r)
+            with stage("write"):
+                with open(output_path, "wb") as out:
+                    merger.write(out)
+        finally:
+            merger.close()
+        if optimize:   # merged inputs usually repeat fonts and carry full-resolution scans
+            with stage("optimize"):
+                return _optimize_headers(optimize_file(output_path))
+        return {}
+
     try:
         for f in files:
             if f.content_type != "application/pdf":
                 raise HTTPException(status_code=400, detail=f"{f.filename} is not a PDF")
 
-            file_path = os.path.join(temp_dir, f"{uuid.uuid4()}_{f.filename}")
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(f.file, buffer)
-            merger.append(file_path)
-
-        with open(output_path, "wb") as out:
-            merger.write(out)
-
-        merger.close()
-        background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
-
-        return FileResponse(output_path, filename="merged.pdf", media_type="application/pdf")
+        headers = await asyncio.to_thread(merge)
+        response = await artifact_download(request, output_path, "merged.pdf", "application/pdf", headers)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return response
 
     except HTTPException:
         shutil.rmtree(temp_dir, ignore_errors=True)
@@ -333,9 +718,36 @@ async def pdf_merge(
         shutil.rmtree(temp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+# ------------------ PDF OPTIMIZE ------------------
+def _optimize_headers(report: dict) -> dict:
+    return {
+        "X-Size-Before": str(report["bytes_before"]),
+        "X-Size-After": str(report["bytes_after"]),
+        "X-Images-Downsampled": str(report["images_downsampled"]),
+    }
+
+@app.post("/convert/pdf-optimize")
+async def pdf_optimize(
+    file: UploadFile = Depends(upload_input()),
+    dpi: int = Form(PDF_OPT_DPI, ge=36, le=600),
+    quality: int = Form(PDF_OPT_QUALITY, ge=10, le=95),
+):
+    def run():
+        with stage("spool"):
+            data = file.file.read()
+        with stage("convert"):
+            return optimize_pdf(data, dpi=dpi, quality=quality)
+
+    try:
+        out, report = await asyncio.to_thread(run)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Cannot optimize PDF: {e}")
+    return Response(out, media_type="application/pdf", headers={
+        **_optimize_headers(report), "Content-Disposition": 'attachment; filename="optimized.pdf"'})
+
 # ------------------ PDF TO WORD ------------------
 @app.post("/convert/pdf-to-word")
-async def pdf_to_word(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def pdf_to_word(request: Request, file: UploadFile = Depends(upload_input())):
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Please upload a valid PDF file")
 
@@ -345,20 +757,25 @@ async def pdf_to_word(background_tasks: BackgroundTasks, file: UploadFile = File
     input_pdf_path = os.path.join(temp_dir, file.filename)
     output_docx_path = os.path.join(temp_dir, "converted.docx")
 
-    try:
-        with open(input_pdf_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        cv = Converter(input_pdf_path)
-        cv.convert(output_docx_path, start=0, end=None)
-        cv.close()
+    def convert():
+        with stage("spool"):
+            with open(input_pdf_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+        with stage("parse"):
+            cv = pdf2docx.Converter(input_pdf_path)
+        try:
+            with stage("convert"):   # pdf2docx parses layout and writes the .docx in one call
+                cv.convert(output_docx_path, start=0, end=None)
+        finally:
+            cv.close()
 
-        background_tasks.add_task(shutil.rmtree, temp_dir, ignore_errors=True)
-        return FileResponse(
-            output_docx_path,
-            filename="converted.docx",
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
+    try:
+        await asyncio.to_thread(convert)
+        response = await artifact_download(
+            request, output_docx_path, "converted.docx",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return response
     except Exception as e:
         shutil.rmtree(temp_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -366,30 +783,73 @@ async def pdf_to_word(background_tasks: BackgroundTasks, file: UploadFile = File
 # ------------------------ AI MOM (Gemini) ------------------------
 @app.post("/ai/mom-generator")
 async def ai_mom_generator(
+    response: Response,
     transcript: Optional[str] = Form(None),
-    video: Optional[UploadFile] = File(None),
-    image: Optional[UploadFile] = File(None),
+    video: Optional[UploadFile] = Depends(upload_input("video", required=False)),
+    image: Optional[UploadFile] = Depends(upload_input("image", required=False)),
+    mode: str = Form("auto"),     # auto | single | long (map-reduce over transcript chunks)
+    stream: bool = Form(False),   # NDJSON per-chunk progress events
+    user=Depends(get_optional_user),
 ):
     if not (transcript or video or image):
         raise HTTPException(status_code=400, detail="Missing input")
+    if mode not in ("auto", "single", "long"):
+        raise HTTPException(status_code=400, detail="mode must be auto, single or long")
+
+    long_mode = mode == "long" or (mode == "auto" and estimate_tokens(transcript or "") > MOM_LONG_THRESHOLD_TOKENS)
+    if long_mode and not transcript:
+        raise HTTPException(status_code=400, detail="Long mode needs a transcript")
+
+    llm = get_llm_backend()
+    spooled = []
+
+    def cleanup():
+        for path, _, _ in spooled: os.remove(path)
 
-    prompt = "Convert the following into a clean corporate MOM with Headers: TITLE, AGENDA, SUMMARY, DECISIONS, ACTION ITEMS."
-    parts = [prompt]
-    if transcript: parts.append(f"Transcript: {transcript}")
-    
-    uploaded_files = []
     try:
-        if image: 
-            img = _upload_to_gemini(image); parts.append(img); uploaded_files.append(img)
-        if video: 
-            vid = _upload_to_gemini(video); parts.append(vid); uploaded_files.append(vid)
+        for upload, kind in ((image, "image"), (video, "video")):
+            if upload:
+                spooled.append((*await asyncio.to_thread(_spool_upload, upload), kind))
+    except Exception:
+        cleanup()
+        raise
 
-        model = pick_gemini_model()
-        # Increased timeout to 120s for large transcripts
-        resp = await asyncio.wait_for(asyncio.to_thread(model.generate_content, parts), timeout=120)
-        return {"mom": resp.text}
+    key = mom_cache_key(MOM_PROMPT, transcript or "", [h for _, h, _ in spooled], llm.model_name,
+                        "long" if long_mode else "single")
+
+    user_id = user.id if user else None
+
+    async def run(on_progress=None):
+        hit = await asyncio.to_thread(mom_cache.get, key)
+        if hit:
+            mom, cache_status = hit["mom"], "HIT"
+        else:
+            async def produce():
+                mom = await _generate_mom(llm, transcript, spooled, long_mode, on_progress)
+                await asyncio.to_thread(mom_cache.set, key, {"mom": mom, "model": llm.model_name})
+                return mom
+
+            # identical requests already in flight share the one upstream call
+            mom, cache_status = await mom_flights.do(key, produce), "MISS"
+
+        record_id = None   # anonymous runs aren't kept: nobody could list or delete them
+        if user_id is not None:
+            record_id = await asyncio.to_thread(
+                _save_mom_history, user_id, "AI-long" if long_mode else "AI", transcript, mom, key
+            )
+        return {"mom": mom, "cache": cache_status, "record_id": record_id}
+
+    if stream:
+        return StreamingResponse(_mom_progress_stream(run, cleanup), media_type="application/x-ndjson",
+                                 headers={"X-MOM-Mode": "long" if long_mode else "single"})
+
+    try:
+        result = await run()
     finally:
-        for f in uploaded_files: genai.delete_file(f.name)
+        cleanup()
+    response.headers["X-MOM-Cache"] = result["cache"]
+    response.headers["X-MOM-Mode"] = "long" if long_mode else "single"
+    return {"mom": result["mom"], "record_id": result["record_id"]}
 
 # ------------------------ AI Models Catalog (debug) ------------------------
 @app.get("/ai/models")
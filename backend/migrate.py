@@ -0,0 +1,40 @@
+# migrate.py
+# Apply Alembic migrations up to head.  `python migrate.py` (the deploy / start step) or, in-process, upgrade_to_head()
+# (the app database, or another engine, e.g. the query-plan test database).
+# On Postgres the upgrade runs under a session advisory lock, so several nodes starting at once apply it one at a time.
+import os
+from alembic import command
+from alembic.config import Config
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MIGRATE_LOCK_ID = 0x6D696E61   # arbitrary, constant across processes
+
+def alembic_config() -> Config:
+    cfg = Config(os.path.join(HERE, "alembic.ini"))
+    cfg.set_main_option("script_location", os.path.join(HERE, "migrations"))
+    cfg.attributes["skip_logging"] = True
+    return cfg
+
+def upgrade_to_head(engine=None):
+    from sqlalchemy import text
+
+    if engine is None:
+        from database import engine
+    cfg = alembic_config()
+    cfg.attributes["engine"] = engine
+
+    if engine.dialect.name != "postgresql":
+        command.upgrade(cfg, "head")
+        return
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATE_LOCK_ID})
+        lock_conn.commit()   # session-level lock: held until unlocked, not just for this transaction
+        try:
+            command.upgrade(cfg, "head")
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATE_LOCK_ID})
+            lock_conn.commit()
+
+if __name__ == "__main__":
+    upgrade_to_head()
+    print("Database is at head revision.")
@@ -0,0 +1,138 @@
+"""baseline schema (what create_all used to build at import)
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+Idempotent: databases that were already built by create_all keep their
+tables, fresh ones get them created, and both end up stamped at 0001.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _missing(name: str) -> bool:
+    return not sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if _missing("applications"):
+        op.create_table(
+            "applications",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            sa.Column("name", sa.String(100), index=True),
+            sa.Column("category", sa.String(50)),
+            sa.Column("icon", sa.String(255)),
+            sa.Column("status", sa.String(20)),
+            sa.Column("url", sa.String(255)),
+        )
+
+    if _missing("suggestions"):
+        op.create_table(
+            "suggestions",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            sa.Column("text", sa.Text, nullable=False),
+            sa.Column("upvotes", sa.Integer),
+            sa.Column("downvotes", sa.Integer),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if _missing("votes"):
+        op.create_table(
+            "votes",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            sa.Column("suggestion_id", sa.Integer, sa.ForeignKey("suggestions.id"), index=True, nullable=False),
+            sa.Column("user_id", sa.String(36), index=True, nullable=False),
+            sa.Column("vote_type", sa.String(4), nullable=False),
+            sa.UniqueConstraint("suggestion_id", "user_id", name="uq_vote_suggestion_user"),
+        )
+
+    if _missing("pdf_files"):
+        op.create_table(
+            "pdf_files",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            sa.Column("filename", sa.String(255), unique=True, nullable=False),
+            sa.Column("content", sa.Text, nullable=False),
+            sa.Column("uploaded_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if _missing("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            sa.Column("name", sa.String(120), nullable=False),
+            sa.Column("email", sa.String(255), unique=True, index=True, nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    user_fk = lambda: sa.Column(  # noqa: E731
+        "user_id", sa.Integer, sa.ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+
+    if _missing("user_recent_activity"):
+        op.create_table(
+            "user_recent_activity",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            user_fk(),
+            sa.Column("tab", sa.String(80), nullable=False),
+            sa.Column("name", sa.String(120), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint("user_id", "tab", name="uq_recent_user_tab"),
+        )
+
+    if _missing("user_tool_usage"):
+        op.create_table(
+            "user_tool_usage",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            user_fk(),
+            sa.Column("tab", sa.String(80), nullable=False),
+            sa.Column("count", sa.Integer, nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint("user_id", "tab", name="uq_usage_user_tab"),
+        )
+
+    if _missing("user_favourites"):
+        op.create_table(
+            "user_favourites",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            user_fk(),
+            sa.Column("tab", sa.String(80), nullable=False),
+            sa.Column("name", sa.String(120), nullable=False),
+            sa.Column("icon", sa.String(255), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.UniqueConstraint("user_id", "tab", name="uq_fav_user_tab"),
+        )
+
+    if _missing("user_suggestions"):
+        op.create_table(
+            "user_suggestions",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            user_fk(),
+            sa.Column("tool_idea", sa.String(255), nullable=False),
+            sa.Column("note", sa.String(1000), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+
+    if _missing("mom_records"):
+        op.create_table(
+            "mom_records",
+            sa.Column("id", sa.Integer, primary_key=True, index=True),
+            sa.Column("mode", sa.String(20)),
+            sa.Column("transcript", sa.Text, nullable=False),
+            sa.Column("mom", sa.Text, nullable=False),
+            sa.Column("created_at", sa.DateTime, server_default=sa.func.now()),
+        )
+
+
+def downgrade():
+    for name in [
+        "mom_records", "user_suggestions", "user_favourites", "user_tool_usage",
+        "user_recent_activity", "users", "pdf_files", "votes", "suggestions", "applications",
+    ]:
+        op.drop_table(name)
@@ -0,0 +1,67 @@
+"""composite (user_id, sort key) indexes for dashboard queries + leaderboard index
+
+Revision ID: 0002_dashboard_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+Every /user/* read is `WHERE user_id = ? ORDER BY <key> DESC LIMIT n`.
+The old single-column user_id indexes forced a sort of all the user's rows;
+(user_id, key DESC) returns the first n rows straight off the index, and on
+Postgres INCLUDE makes most of them index-only. The composite indexes lead
+with user_id, so they also serve the FK/cascade lookups and replace the old ones.
+On Postgres the indexes are built CONCURRENTLY so big tables stay writable.
+"""
+from contextlib import nullcontext
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_dashboard_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # name, table, columns, postgres INCLUDE, replaces
+    ("ix_recent_user_created", "user_recent_activity", ["user_id", "created_at DESC"],
+     ["id", "tab", "name"], "ix_user_recent_activity_user_id"),
+    ("ix_usage_user_count", "user_tool_usage", ["user_id", "count DESC"],
+     ["id", "tab", "updated_at"], "ix_user_tool_usage_user_id"),
+    ("ix_fav_user_created", "user_favourites", ["user_id", "created_at DESC"],
+     ["id", "tab", "name", "icon"], "ix_user_favourites_user_id"),
+    ("ix_user_sugg_user_created", "user_suggestions", ["user_id", "created_at DESC"],
+     ["id", "tool_idea"], "ix_user_suggestions_user_id"),
+]
+
+
+def _is_pg() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    pg = _is_pg()
+    ctx = op.get_context()
+
+    with ctx.autocommit_block() if pg else nullcontext():
+        for name, table, cols, include, _ in INDEXES:
+            kw = {"postgresql_include": include, "postgresql_concurrently": True} if pg else {}
+            op.create_index(name, table, [sa.text(c) for c in cols], if_not_exists=True, **kw)
+
+        op.create_index(
+            "ix_suggestions_score_id", "suggestions",
+            [sa.text("(upvotes - downvotes) DESC"), sa.text("id DESC")],
+            if_not_exists=True,
+            **({"postgresql_concurrently": True} if pg else {}),
+        )
+
+        for _, table, _, _, old in INDEXES:
+            op.drop_index(old, table_name=table, if_exists=True,
+                          **({"postgresql_concurrently": True} if pg else {}))
+
+
+def downgrade():
+    for name, table, _, _, old in INDEXES:
+        op.create_index(old, table, ["user_id"], if_not_exists=True)
+        op.drop_index(name, table_name=table, if_exists=True)
+    op.drop_index("ix_suggestions_score_id", table_name="suggestions", if_exists=True)
+
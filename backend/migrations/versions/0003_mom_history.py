@@ -0,0 +1,39 @@
+"""MOM history: owner, summary columns, compressed transcripts
+
+Revision ID: 0003_mom_history
+Revises: 0002_dashboard_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_mom_history"
+down_revision = "0002_dashboard_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("mom_records") as batch:
+        batch.add_column(sa.Column("user_id", sa.Integer, nullable=True))
+        batch.add_column(sa.Column("title", sa.String(255), nullable=True))
+        batch.add_column(sa.Column("preview", sa.String(300), nullable=True))
+        batch.add_column(sa.Column("cache_key", sa.String(64), nullable=True))
+        batch.add_column(sa.Column("transcript_gz", sa.LargeBinary, nullable=True))
+        batch.add_column(sa.Column("transcript_chars", sa.Integer, nullable=False, server_default="0"))
+        batch.alter_column("transcript", existing_type=sa.Text, nullable=True)
+        batch.create_foreign_key("fk_mom_records_user_id", "users", ["user_id"], ["id"], ondelete="CASCADE")
+
+    op.create_index("ix_mom_user_id", "mom_records", [sa.text("user_id"), sa.text("id DESC")])
+    op.create_index("ix_mom_user_cache_key", "mom_records", ["user_id", "cache_key"])
+
+
+def downgrade():
+    op.drop_index("ix_mom_user_cache_key", table_name="mom_records")
+    op.drop_index("ix_mom_user_id", table_name="mom_records")
+    op.execute("DELETE FROM mom_records WHERE transcript IS NULL")
+    with op.batch_alter_table("mom_records") as batch:
+        batch.drop_constraint("fk_mom_records_user_id", type_="foreignkey")
+        batch.alter_column("transcript", existing_type=sa.Text, nullable=False)
+        for col in ("transcript_chars", "transcript_gz", "cache_key", "preview", "title", "user_id"):
+            batch.drop_column(col)
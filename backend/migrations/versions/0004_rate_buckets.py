@@ -0,0 +1,26 @@
+"""rate_buckets: token buckets shared by every node (FAIR_SHARE_BACKEND=db)
+
+Revision ID: 0004_rate_buckets
+Revises: 0003_mom_history
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_rate_buckets"
+down_revision = "0003_mom_history"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "rate_buckets",
+        sa.Column("bucket_key", sa.String(160), primary_key=True),
+        sa.Column("tokens", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.Float, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("rate_buckets")
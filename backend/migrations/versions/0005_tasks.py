@@ -0,0 +1,40 @@
+"""tasks: queue for standalone worker processes (python worker.py)
+
+Revision ID: 0005_tasks
+Revises: 0004_rate_buckets
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_tasks"
+down_revision = "0004_rate_buckets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("kind", sa.String(40), nullable=False),
+        sa.Column("status", sa.String(12), nullable=False),
+        sa.Column("params", sa.Text, nullable=False),
+        sa.Column("filename", sa.String(255), nullable=True),
+        sa.Column("result", sa.Text, nullable=True),
+        sa.Column("artifact", sa.String(255), nullable=True),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer, nullable=False, server_default="3"),
+        sa.Column("worker_id", sa.String(64), nullable=True),
+        sa.Column("created_at", sa.Float, nullable=False),
+        sa.Column("started_at", sa.Float, nullable=True),
+        sa.Column("heartbeat_at", sa.Float, nullable=True),
+        sa.Column("finished_at", sa.Float, nullable=True),
+    )
+    op.create_index("ix_tasks_status_created", "tasks", ["status", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_tasks_status_created", table_name="tasks")
+    op.drop_table("tasks")
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint, Index, LargeBinary, Float
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from database import Base
 
 
@@ -25,6 +25,17 @@ class Suggestion(Base):
 
     votes = relationship("Vote", back_populates="suggestion", cascade="all, delete-orphan")
 
+    @property
+    def score(self) -> int:
+        return (self.upvotes or 0) - (self.downvotes or 0)
+
+# Leaderboard keyset: ORDER BY (upvotes - downvotes) DESC, id DESC
+Index(
+    "ix_suggestions_score_id",
+    (Suggestion.upvotes - Suggestion.downvotes).desc(),
+    Suggestion.id.desc(),
+)
+
 class Vote(Base):
     __tablename__ = "votes"
 
@@ -65,7 +76,7 @@ class UserRecentActivity(Base):
     __tablename__ = "user_recent_activity"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     tab = Column(String(80), nullable=False)
     name = Column(String(120), nullable=False)
@@ -74,6 +85,8 @@ class UserRecentActivity(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "tab", name="uq_recent_user_tab"),
+        # WHERE user_id = ? ORDER BY created_at DESC LIMIT n -> index scan, no sort
+        Index("ix_recent_user_created", "user_id", created_at.desc(), postgresql_include=["id", "tab", "name"]),
     )
 
 
@@ -82,7 +95,7 @@ class UserToolUsage(Base):
     __tablename__ = "user_tool_usage"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     tab = Column(String(80), nullable=False)
     count = Column(Integer, default=0, nullable=False)
@@ -91,6 +104,7 @@ class UserToolUsage(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "tab", name="uq_usage_user_tab"),
+        Index("ix_usage_user_count", "user_id", count.desc(), postgresql_include=["id", "tab", "updated_at"]),
     )
 
 
@@ -99,7 +113,7 @@ class UserFavourite(Base):
     __tablename__ = "user_favourites"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     tab = Column(String(80), nullable=False)
     name = Column(String(120), nullable=False)
@@ -109,6 +123,7 @@ class UserFavourite(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "tab", name="uq_fav_user_tab"),
+        Index("ix_fav_user_created", "user_id", created_at.desc(), postgresql_include=["id", "tab", "name", "icon"]),
     )
 
 
@@ -117,20 +132,72 @@ class UserSuggestion(Base):
     __tablename__ = "user_suggestions"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     tool_idea = Column(String(255), nullable=False)
     note = Column(String(1000), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("ix_user_sugg_user_created", "user_id", created_at.desc(), postgresql_include=["id", "tool_idea"]),
+    )
+
 
 
 class MomRecord(Base):
     __tablename__ = "mom_records"
     id = Column(Integer, primary_key=True, index=True)
-    mode = Column(String(20), default="AI")     # "AI" or "Classic"
-    transcript = Column(Text, nullable=False)
-    mom = Column(Text, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    mode = Column(String(20), default="AI")     # "AI", "AI-long" or "Classic"
+    title = Column(String(255), nullable=True)
+    preview = Column(String(300), nullable=True)
+    cache_key = Column(String(64), nullable=True)
+
+    # Heavy columns are deferred: history listings never load them.
+    # Small transcripts stay in `transcript`, large ones go zlib-compressed into `transcript_gz`.
+    transcript = deferred(Column(Text, nullable=True))
+    transcript_gz = deferred(Column(LargeBinary, nullable=True))
+    transcript_chars = Column(Integer, default=0, nullable=False)
+    mom = deferred(Column(Text, nullable=False))
+
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        # history: WHERE user_id = ? AND id < ? ORDER BY id DESC LIMIT n
+        Index("ix_mom_user_id", "user_id", id.desc()),
+        Index("ix_mom_user_cache_key", "user_id", "cache_key"),
+    )
+
+
+class RateBucket(Base):
+    """Shared token buckets for utils/fair_share.py (FAIR_SHARE_BACKEND=db); one row per (cost class, caller)."""
+    __tablename__ = "rate_buckets"
+    bucket_key = Column(String(160), primary_key=True)    # "<class>:user:<id>" / "<class>:ip:<addr>"
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)             # epoch seconds, database clock
+
+class Task(Base):
+    """Background job for `python worker.py` (utils/task_queue.py). Times are epoch seconds."""
+    __tablename__ = "tasks"
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(40), nullable=False)
+    status = Column(String(12), nullable=False, default="queued")   # queued | running | done | failed
+    params = Column(Text, nullable=False, default="{}")
+    filename = Column(String(255), nullable=True)
+    result = Column(Text, nullable=True)
+    artifact = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    worker_id = Column(String(64), nullable=True)
+    created_at = Column(Float, nullable=False)
+    started_at = Column(Float, nullable=True)
+    heartbeat_at = Column(Float, nullable=True)
+    finished_at = Column(Float, nullable=True)
+
+    __table_args__ = (
+        # claim: WHERE status = 'queued' ORDER BY created_at LIMIT 1 FOR UPDATE SKIP LOCKED
+        # reclaim: WHERE status = 'running' AND heartbeat_at < ?
+        Index("ix_tasks_status_created", "status", "created_at"),
+    )
@@ -0,0 +1,79 @@
+# routers/artifacts.py
+"""
+GET/HEAD /artifacts/{id}/{filename}: converted outputs kept ARTIFACT_TTL_SEC
+(utils/artifacts.py), so an interrupted download resumes with Range instead of
+converting again.
+
+- strong ETag (content SHA-256) and Last-Modified; If-None-Match /
+  If-Modified-Since answer 304
+- Range / If-Range (single and multi-range) from Starlette's FileResponse
+- the stored gzip variant for clients that accept it, unless a Range is asked
+  for (ranges always address the identity bytes)
+
+Conversion endpoints answer with the file itself, as before, plus
+Content-Location pointing here (artifact_download()).
+"""
+import asyncio
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from utils.artifacts import ArtifactError, artifacts
+from utils.http_headers import accepts_gzip, etag_matches
+
+router = APIRouter(prefix="/artifacts", tags=["Artifacts"])
+
+class _ArtifactFile(FileResponse):
+    chunk_size = 1024 * 1024   # fewer reads/sends than the 64 KB default when pathsend isn't available
+
+def _etag(meta: dict, encoding: Optional[str] = None) -> str:
+    return f'"{meta["sha256"]}.gz"' if encoding == "gzip" else f'"{meta["sha256"]}"'
+
+def _not_modified(request: Request, meta: dict) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return etag_matches(inm, [_etag(meta), _etag(meta, "gzip")])
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(meta["created_at"]) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def artifact_response(request: Request, meta: dict, headers: Optional[dict] = None,
+                      conditional: bool = True) -> Response:
+    encoding = None
+    if meta["gzip_size"] and "range" not in request.headers and accepts_gzip(request.headers.get("accept-encoding", "")):
+        encoding = "gzip"
+    common = {
+        "ETag": _etag(meta, encoding),
+        "Last-Modified": formatdate(meta["created_at"], usegmt=True),
+        "Cache-Control": f"private, max-age={max(0, int(meta['expires_at'] - time.time()))}",
+        "Content-Location": artifacts.url(meta),
+    }
+    if meta["gzip_size"]:
+        common["Vary"] = "Accept-Encoding"
+    if conditional and _not_modified(request, meta):
+        return Response(status_code=304, headers=common)
+    if encoding:
+        common["Content-Encoding"] = "gzip"
+    return _ArtifactFile(artifacts.file(meta, encoding), media_type=meta["media_type"], filename=meta["filename"],
+                         headers={**(headers or {}), **common})
+
+async def artifact_download(request: Request, path: str, filename: str, media_type: str,
+                            headers: Optional[dict] = None) -> Response:
+    """Keep a freshly converted file as an artifact and send it (the file at `path` is moved)."""
+    meta = await asyncio.to_thread(artifacts.put, path, filename, media_type)
+    return artifact_response(request, meta, headers, conditional=False)
+
+@router.api_route("/{artifact_id}/{filename}", methods=["GET", "HEAD"])
+async def get_artifact(artifact_id: str, filename: str, request: Request):
+    try:
+        meta = await asyncio.to_thread(artifacts.get, artifact_id)
+    except ArtifactError as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
+    return artifact_response(request, meta)
@@ -66,6 +66,20 @@ def get_current_user(
         raise HTTPException(status_code=401, detail="User not found")
     return user
 
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+def get_optional_user(
+    token: str | None = Depends(optional_oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Like get_current_user, but anonymous callers get None instead of a 401."""
+    if not token:
+        return None
+    data = decode_token(token)
+    if not data or not data.get("sub"):
+        return None
+    return db.query(models.User).filter(models.User.id == int(data["sub"])).first()
+
 @router.get("/me", response_model=schemas.UserOut)
 def me(current_user=Depends(get_current_user)):
     return current_user
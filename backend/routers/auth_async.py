@@ -0,0 +1,64 @@
+# Async twin of routers/auth.py (mounted when DB_ASYNC=1)
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models, schemas
+from database import get_async_db
+from routers.auth import oauth2_scheme
+from utils.security import hash_password, verify_password, create_access_token, decode_token
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+async def _user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(models.User).where(models.User.email == email))).scalar_one_or_none()
+
+@router.post("/signup", response_model=schemas.TokenResponse)
+async def signup(payload: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    email = payload.email.lower().strip()
+
+    if await _user_by_email(db, email):
+        raise HTTPException(status_code=409, detail="Email already registered")
+
+    if len(payload.password) < 6:
+        raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
+
+    # bcrypt is CPU-bound: keep it off the event loop
+    hashed = await asyncio.to_thread(hash_password, payload.password)
+    user = models.User(name=payload.name.strip(), email=email, hashed_password=hashed)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+
+    token = create_access_token({"sub": str(user.id), "email": user.email, "name": user.name})
+    return {"access_token": token, "token_type": "bearer", "user": user}
+
+@router.post("/login", response_model=schemas.TokenResponse)
+async def login(payload: schemas.UserLogin, db: AsyncSession = Depends(get_async_db)):
+    email = payload.email.lower().strip()
+
+    user = await _user_by_email(db, email)
+    if not user or not await asyncio.to_thread(verify_password, payload.password, user.hashed_password):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    token = create_access_token({"sub": str(user.id), "email": user.email, "name": user.name})
+    return {"access_token": token, "token_type": "bearer", "user": user}
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    data = decode_token(token)
+    if not data or not data.get("sub"):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = await db.get(models.User, int(data["sub"]))
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+@router.get("/me", response_model=schemas.UserOut)
+async def me(current_user=Depends(get_current_user)):
+    return current_user
@@ -0,0 +1,157 @@
+# routers/documents.py
+"""
+Document sessions: upload a PDF once (POST /documents -> doc_id), then split
+(to one file or many), lock, unlock, extract text, render images and merge by
+doc_id and page selection. The parsed document is reused across calls (utils/doc_sessions.py).
+Page-picker thumbnails are cached per (doc, page, size) and immutable.
+With "keep": true a result is stored as a new document (its info is returned
+instead of the file), so multi-step flows never leave the server.
+"""
+import asyncio
+import io
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+
+import schemas
+from routers.uploads import upload_input
+from utils import doc_sessions
+from utils.doc_sessions import DocumentError, documents
+from utils.fair_share import caller_key
+from utils.http_headers import etag_matches
+from utils.pdf_split_many import SplitError, plan, splitter
+from utils.thumbnails import FORMATS, snap_width, thumb_key, thumbnails
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+async def _run(fn, *args):
+    try:
+        return await asyncio.to_thread(fn, *args)
+    except (DocumentError, SplitError) as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
+
+def _on_doc(doc_id: str, op, *args):
+    with documents.lease(doc_id) as doc:
+        return op(doc, *args)
+
+def _owner(request: Request) -> str:
+    """Who holds a reference to a stored document: the user, else the client IP."""
+    return caller_key(request.scope)[0]
+
+def _store_bytes(data: bytes, owner: str) -> dict:
+    return documents.add(io.BytesIO(data), owner)
+
+async def _pdf_result(request: Request, data: bytes, keep: bool, filename: str):
+    if keep:
+        return await _run(_store_bytes, data, _owner(request))
+    return Response(data, media_type="application/pdf",
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@router.post("", status_code=201)
+async def create_document(request: Request, file: UploadFile = Depends(upload_input())):
+    return await _run(documents.add, file.file, _owner(request))
+
+@router.post("/merge")
+async def merge_documents(body: schemas.DocMerge, request: Request):
+    data = await _run(doc_sessions.merge, documents, [(p.doc_id, p.pages) for p in body.parts])
+    return await _pdf_result(request, data, body.keep, "merged.pdf")
+
+@router.get("/{doc_id}")
+async def document_info(doc_id: str):
+    return await _run(_on_doc, doc_id, doc_sessions.DocSession.info)
+
+@router.delete("/{doc_id}", status_code=204)
+async def delete_document(doc_id: str, request: Request):
+    """Drop the caller's reference; a document other callers also uploaded stays for them."""
+    await _run(documents.delete, doc_id, _owner(request))
+    return Response(status_code=204)
+
+@router.post("/{doc_id}/split")
+async def split_document(doc_id: str, body: schemas.DocPages, request: Request):
+    data = await _run(_on_doc, doc_id, doc_sessions.split, body.pages)
+    return await _pdf_result(request, data, body.keep, "split.pdf")
+
+def _plan_split(doc, body: schemas.DocSplitMany):
+    with doc.lock:
+        pdf = doc.fitz_doc
+        if pdf.needs_pass:
+            raise DocumentError(400, "Document is encrypted; unlock it first")
+        return plan(pdf, body.mode, body.every, body.level, body.pages)
+
+@router.post("/{doc_id}/split-many")
+async def split_document_many(doc_id: str, body: schemas.DocSplitMany):
+    """ZIP of many PDFs (every N pages / per page / per bookmark), streamed as they are built."""
+    parts = await _run(_on_doc, doc_id, _plan_split, body)
+
+    def stream():
+        try:
+            with documents.lease(doc_id) as doc:   # not evicted or expired while the ZIP is sent
+                yield from splitter.iter_zip(doc.path, parts)
+        except Exception as e:   # headers are already sent: re-raise so the server aborts the connection
+            print(f"[Documents] split-many of {doc_id} failed after streaming started: {e}")
+            raise
+
+    return StreamingResponse(stream(), media_type="application/zip", headers={
+        "Content-Disposition": 'attachment; filename="split.zip"', "X-Parts": str(len(parts))})
+
+@router.post("/{doc_id}/lock")
+async def lock_document(doc_id: str, body: schemas.DocLock, request: Request):
+    data = await _run(_on_doc, doc_id, doc_sessions.lock, body.password, body.pages)
+    return await _pdf_result(request, data, body.keep, "locked.pdf")
+
+@router.post("/{doc_id}/unlock")
+async def unlock_document(doc_id: str, body: schemas.DocUnlock, request: Request):
+    data = await _run(_on_doc, doc_id, doc_sessions.unlock, body.password)
+    return await _pdf_result(request, data, body.keep, "unlocked.pdf")
+
+@router.get("/{doc_id}/text")
+async def document_text(doc_id: str, pages: Optional[str] = Query(None)):
+    return await _run(_on_doc, doc_id, doc_sessions.text, pages)
+
+@router.get("/{doc_id}/images")
+async def document_images(doc_id: str, pages: Optional[str] = Query(None), dpi: int = Query(72, ge=36, le=300)):
+    data = await _run(_on_doc, doc_id, doc_sessions.images, pages, dpi)
+    return Response(data, media_type="application/zip",
+                    headers={"Content-Disposition": 'attachment; filename="pdf_images.zip"'})
+
+# ---------------- thumbnails ----------------
+THUMB_BATCH_MAX = 60
+IMMUTABLE = "public, max-age=31536000, immutable"   # doc_id is the content hash
+
+@router.get("/{doc_id}/thumbnails")
+async def document_thumbnails(
+    doc_id: str,
+    pages: Optional[str] = Query(None),
+    width: int = Query(160, ge=16, le=1024),
+    format: str = Query("webp", pattern="^(webp|jpeg)$"),
+    quality: int = Query(70, ge=10, le=95),
+):
+    """Render (in parallel) and cache one screenful of thumbnails; returns their URLs for lazy <img> loading."""
+    width = snap_width(width)
+    rendered = await _run(_on_doc, doc_id, thumbnails.render, pages, width, format, quality, THUMB_BATCH_MAX)
+    return {
+        "width": width,
+        "pages": [
+            {"page": i + 1, "bytes": len(data),
+             "url": f"{router.prefix}/{doc_id}/thumbnails/{i + 1}?width={width}&format={format}&quality={quality}"}
+            for i, data in rendered.items()
+        ],
+    }
+
+@router.get("/{doc_id}/thumbnails/{page}")
+async def document_thumbnail(
+    doc_id: str,
+    page: int,
+    width: int = Query(160, ge=16, le=1024),
+    format: str = Query("webp", pattern="^(webp|jpeg)$"),
+    quality: int = Query(70, ge=10, le=95),
+    if_none_match: Optional[str] = Header(None),
+):
+    width = snap_width(width)
+    etag = f'"{thumb_key(doc_id, page - 1, width, format, quality)}"'
+    headers = {"Cache-Control": IMMUTABLE, "ETag": etag}
+    if if_none_match and etag_matches(if_none_match, [etag]):
+        return Response(status_code=304, headers=headers)
+    rendered = await _run(_on_doc, doc_id, thumbnails.render, str(page), width, format, quality)
+    return Response(rendered[page - 1], media_type=FORMATS[format], headers=headers)
@@ -1,36 +1,33 @@
 # routers/mom_generator.py
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse, FileResponse
 import os
 import uuid
 import shutil
-from pydub import AudioSegment
-import speech_recognition as sr
-from fpdf import FPDF
+import asyncio
+
+from database import SessionLocal
+from routers.auth import get_optional_user
+from routers.uploads import upload_input
+from utils.artifacts import artifacts
+from utils.mom_history import save_mom
+from utils.audio_pipeline import AudioDecodeError
+from utils.lazy_imports import lazy
+from utils.speech_to_text import audio_to_text
+
+fpdf = lazy("fpdf", "mom_pdf")
 
 router = APIRouter()
 
 TEMP_DIR = "temp_mom"
 
-def extract_audio_from_video(video_path, audio_path):
-    """Convert video to WAV audio"""
-    try:
-        video = AudioSegment.from_file(video_path)
-        video.export(audio_path, format="wav")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Audio extraction failed: {e}")
-
-def transcribe_audio(audio_path):
-    """Offline speech-to-text using speech_recognition"""
-    recognizer = sr.Recognizer()
-    with sr.AudioFile(audio_path) as source:
-        audio = recognizer.record(source)
+def transcribe_video(video: UploadFile) -> str:
+    """Upload stream -> ffmpeg -> 16 kHz PCM chunks -> faster-whisper. Nothing decoded hits the disk."""
     try:
-        text = recognizer.recognize_sphinx(audio)  # offline using CMU Sphinx
-        return text
-    except sr.UnknownValueError:
-        return ""
-    except Exception as e:
+        return audio_to_text(video.file)
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Audio extraction failed: {e}")
+    except RuntimeError as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
 
 def generate_mom_text(transcript):
@@ -64,18 +61,26 @@ def generate_mom_text(transcript):
     return mom_text.strip()
 
 def create_pdf(mom_text, output_path):
-    pdf = FPDF()
+    pdf = fpdf.FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.set_font("Arial", size=12)
     for line in mom_text.split("\n"):
-        pdf.multi_cell(0, 8, line)
+        pdf.multi_cell(0, 8, line, new_x="LMARGIN", new_y="NEXT")
     pdf.output(output_path)
 
+def save_history(user_id: int, transcript: str, mom_text: str) -> int:
+    db = SessionLocal()
+    try:
+        return save_mom(db, user_id=user_id, mode="Classic", transcript=transcript, mom=mom_text).id
+    finally:
+        db.close()
+
 @router.post("/meeting-mom")
 async def meeting_mom(
-    video: UploadFile | None = File(None),
-    transcript: str | None = Form(None)
+    video: UploadFile | None = Depends(upload_input("video", required=False)),
+    transcript: str | None = Form(None),
+    user=Depends(get_optional_user),
 ):
     os.makedirs(TEMP_DIR, exist_ok=True)
     temp_id = str(uuid.uuid4())
@@ -85,15 +90,9 @@ async def meeting_mom(
     final_transcript = transcript or ""
 
     try:
-        # Step 1: if video uploaded, extract audio and transcribe
+        # Step 1: if video uploaded, transcribe it straight from the upload stream
         if video:
-            video_path = os.path.join(temp_path, video.filename)
-            audio_path = os.path.join(temp_path, "audio.wav")
-            with open(video_path, "wb") as f:
-                shutil.copyfileobj(video.file, f)
-
-            extract_audio_from_video(video_path, audio_path)
-            audio_transcript = transcribe_audio(audio_path)
+            audio_transcript = await asyncio.to_thread(transcribe_video, video)
             if audio_transcript.strip():
                 final_transcript = audio_transcript
 
@@ -102,13 +101,25 @@ async def meeting_mom(
 
         # Step 3: create PDF
         pdf_path = os.path.join(temp_path, "meeting_mom.pdf")
-        create_pdf(mom_text, pdf_path)
+        await asyncio.to_thread(create_pdf, mom_text, pdf_path)
+
+        # Step 4: keep it in the user's MOM history (signed-in users only)
+        record_id = None
+        if user:
+            record_id = await asyncio.to_thread(save_history, user.id, final_transcript, mom_text)
+
+        # served from the artifact store (routers/artifacts.py): resumable, with its TTL and size cap
+        artifact = await asyncio.to_thread(artifacts.put, pdf_path, "meeting_mom.pdf", "application/pdf")
 
         return {
             "mom": mom_text,
-            "pdf_path": pdf_path  # can be used to download if needed
+            "pdf_url": artifacts.url(artifact),
+            "record_id": record_id,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
         shutil.rmtree(temp_path, ignore_errors=True)
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,51 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, undefer
+
+import models, schemas
+from database import get_db
+from routers.auth import get_current_user
+from utils.mom_history import record_transcript
+
+router = APIRouter(prefix="/mom/history", tags=["MOM History"])
+
+@router.get("", response_model=list[schemas.MomSummaryOut])
+def list_history(
+    before_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Newest first. Pass the last `id` you got as `before_id` for the next page."""
+    q = db.query(models.MomRecord).filter(models.MomRecord.user_id == user.id)
+    if before_id is not None:
+        q = q.filter(models.MomRecord.id < before_id)
+    # transcript / transcript_gz / mom are deferred -> only the summary columns are read
+    return q.order_by(models.MomRecord.id.desc()).limit(limit).all()
+
+@router.get("/{record_id}", response_model=schemas.MomRecordOut)
+def get_history_record(record_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    rec = (
+        db.query(models.MomRecord)
+        .options(undefer(models.MomRecord.transcript), undefer(models.MomRecord.transcript_gz), undefer(models.MomRecord.mom))
+        .filter(models.MomRecord.id == record_id, models.MomRecord.user_id == user.id)
+        .first()
+    )
+    if not rec:
+        raise HTTPException(status_code=404, detail="MOM not found")
+    return {
+        "id": rec.id, "mode": rec.mode, "title": rec.title, "preview": rec.preview,
+        "transcript_chars": rec.transcript_chars, "created_at": rec.created_at,
+        "transcript": record_transcript(rec), "mom": rec.mom,
+    }
+
+@router.delete("/{record_id}")
+def delete_history_record(record_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    deleted = db.query(models.MomRecord).filter(
+        models.MomRecord.id == record_id, models.MomRecord.user_id == user.id
+    ).delete()
+    db.commit()
+    if not deleted:
+        raise HTTPException(status_code=404, detail="MOM not found")
+    return {"ok": True}
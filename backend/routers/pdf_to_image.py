@@ -1,14 +1,24 @@
-from fastapi import APIRouter, UploadFile, File
-from fastapi.responses import FileResponse
-import fitz  # PyMuPDF
+from fastapi import APIRouter, Depends, Form, HTTPException, Request, UploadFile
 import os
+import shutil
 import uuid
 import zipfile
 
+from routers.artifacts import artifact_download
+from routers.uploads import upload_input
+from utils.page_spec import PageSpecError, compile_pages
+from utils.lazy_imports import lazy
+
+fitz = lazy("fitz", "pdf")  # PyMuPDF
+
 router = APIRouter()
 
 @router.post("/convert/pdf-to-image")
-async def pdf_to_image(file: UploadFile = File(...)):
+async def pdf_to_image(request: Request, file: UploadFile = Depends(upload_input()), pages: str | None = Form(None)):
+    try:
+        spec = compile_pages(pages)
+    except PageSpecError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     temp_id = str(uuid.uuid4())
     temp_dir = f"temp_{temp_id}"
     os.makedirs(temp_dir, exist_ok=True)
@@ -20,8 +30,14 @@ async def pdf_to_image(file: UploadFile = File(...)):
 
     doc = fitz.open(pdf_path)
     image_files = []
-
-    for page_num in range(len(doc)):
+    try:
+        selected = spec.resolve(len(doc))
+    except PageSpecError as e:
+        doc.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for page_num in selected:   # pages are loaded (and rendered) only when selected
         page = doc.load_page(page_num)
         pix = page.get_pixmap()
         img_path = os.path.join(temp_dir, f"page_{page_num + 1}.png")
@@ -32,9 +48,8 @@ async def pdf_to_image(file: UploadFile = File(...)):
     with zipfile.ZipFile(zip_path, "w") as zipf:
         for img in image_files:
             zipf.write(img, os.path.basename(img))
+    doc.close()
 
-    return FileResponse(
-        zip_path,
-        media_type="application/zip",
-        filename="pdf_images.zip"
-    )
\ No newline at end of file
+    response = await artifact_download(request, zip_path, "pdf_images.zip", "application/zip")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    return response
\ No newline at end of file
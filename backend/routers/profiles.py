@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from utils.profiling import check_token, list_profiles, profile_path, profiling_enabled
+
+router = APIRouter(prefix="/admin/profiles", tags=["Profiling"])
+
+def require_profile_admin(x_profile_token: Optional[str] = Header(None)):
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not check_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("", dependencies=[Depends(require_profile_admin)])
+def list_request_profiles():
+    """Newest first: route, status, total time and per-stage timings of each captured request."""
+    return list_profiles()
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profile_admin)])
+def get_request_profile(profile_id: str):
+    path = profile_path(profile_id, "meta")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json")
+
+@router.get("/{profile_id}/speedscope", dependencies=[Depends(require_profile_admin)])
+def download_speedscope(profile_id: str):
+    """Open in https://www.speedscope.app"""
+    path = profile_path(profile_id, "speedscope")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.speedscope.json")
@@ -0,0 +1,121 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, delete, insert, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import models, schemas
+from database import get_db
+
+router = APIRouter(prefix="/suggestions", tags=["Suggestions"])
+
+VOTE_TYPES = ("up", "down")
+MAX_PAGE = 100
+
+_score = models.Suggestion.upvotes - models.Suggestion.downvotes
+
+
+def _insert_vote_ignoring_conflict(db: Session, suggestion_id: int, user_id: str, vote_type: str) -> bool:
+    """INSERT ... ON CONFLICT DO NOTHING. Returns True if a row was actually written."""
+    values = dict(suggestion_id=suggestion_id, user_id=user_id, vote_type=vote_type)
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(models.Vote).values(**values).on_conflict_do_nothing(
+            constraint="uq_vote_suggestion_user"
+        )
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(models.Vote).values(**values).on_conflict_do_nothing(
+            index_elements=["suggestion_id", "user_id"]
+        )
+    else:
+        stmt = insert(models.Vote).values(**values)
+    return db.execute(stmt).rowcount == 1
+
+
+def apply_vote(db: Session, suggestion_id: int, user_id: str, vote_type: str):
+    """
+    Toggle/switch a vote inside ONE transaction.
+
+    The counters are never read-modify-written in Python: every change is an
+    `UPDATE ... SET upvotes = upvotes + :d` issued only for the Vote rows this
+    transaction actually deleted or inserted, so concurrent voters can't lose
+    updates and the counters always match the votes table.
+    """
+    # 1) Remove any existing vote first. This is a write, so on SQLite it takes the
+    #    write lock up front (no deferred-read -> write upgrade deadlock), and on
+    #    Postgres it row-locks the old vote against a concurrent toggle by the same user.
+    previous = db.execute(
+        delete(models.Vote)
+        .where(models.Vote.suggestion_id == suggestion_id, models.Vote.user_id == user_id)
+        .returning(models.Vote.vote_type)
+    ).scalar_one_or_none()
+
+    up = down = 0
+    if previous == "up":
+        up -= 1
+    elif previous == "down":
+        down -= 1
+
+    # 2) Same button again = toggle off; otherwise (new or switched) write the vote.
+    if previous != vote_type:
+        if _insert_vote_ignoring_conflict(db, suggestion_id, user_id, vote_type):
+            if vote_type == "up":
+                up += 1
+            else:
+                down += 1
+
+    # 3) Adjust the denormalised counters atomically and read them back.
+    row = db.execute(
+        update(models.Suggestion)
+        .where(models.Suggestion.id == suggestion_id)
+        .values(
+            upvotes=models.Suggestion.upvotes + up,
+            downvotes=models.Suggestion.downvotes + down,
+        )
+        .returning(models.Suggestion)
+    ).scalar_one_or_none()
+
+    if row is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Suggestion not found")
+
+    db.commit()
+    return row
+
+
+# ---------------- LEADERBOARD ----------------
+@router.get("", response_model=list[schemas.SuggestionRead])
+def leaderboard(
+    limit: int = Query(20, ge=1, le=MAX_PAGE),
+    after_score: Optional[int] = None,
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Suggestions ranked by score (upvotes - downvotes), ties by newest id.
+    Keyset pagination: pass the `score` and `id` of the last row you got.
+    """
+    q = db.query(models.Suggestion)
+    if after_score is not None and after_id is not None:
+        q = q.filter(or_(_score < after_score, and_(_score == after_score, models.Suggestion.id < after_id)))
+    return q.order_by(_score.desc(), models.Suggestion.id.desc()).limit(limit).all()
+
+
+@router.post("", response_model=schemas.SuggestionRead)
+def create_suggestion(payload: schemas.SuggestionCreate, db: Session = Depends(get_db)):
+    row = models.Suggestion(text=payload.text.strip(), upvotes=0, downvotes=0)
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    return row
+
+
+# ---------------- VOTING ----------------
+@router.post("/{suggestion_id}/vote", response_model=schemas.SuggestionRead)
+def vote(suggestion_id: int, vote_type: str, user_id: str, db: Session = Depends(get_db)):
+    if vote_type not in VOTE_TYPES:
+        raise HTTPException(status_code=400, detail="vote_type must be 'up' or 'down'")
+    if not user_id or len(user_id) > 36:
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+    return apply_vote(db, suggestion_id, user_id, vote_type)
@@ -0,0 +1,67 @@
+# routers/tasks.py
+"""
+Queue heavy work for the standalone workers (python worker.py, utils/task_queue.py):
+
+    POST /tasks                  kind + params (JSON) + file / upload_id -> 202 {task_id}
+    GET  /tasks/{id}             queued | running | done | failed, result, error
+    GET  /tasks/{id}/artifact    the output file once done
+
+The web node only stores the input and inserts the row, so conversions and
+transcription no longer share its cores.
+"""
+import json
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+
+from database import engine
+from routers.uploads import upload_input
+from utils import task_queue
+from utils.task_handlers import HANDLERS
+
+router = APIRouter(prefix="/tasks", tags=["Tasks"])
+
+def _task(task_id: str) -> dict:
+    task = task_queue.get(engine, task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Unknown task_id")
+    return task
+
+@router.post("", status_code=202)
+def create_task(
+    kind: str = Form(...),
+    params: str = Form("{}"),
+    file: Optional[UploadFile] = Depends(upload_input(required=False)),
+):
+    if kind not in HANDLERS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(HANDLERS)}")
+    try:
+        parsed = json.loads(params or "{}")
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, dict):
+        raise HTTPException(status_code=400, detail="params must be a JSON object")
+    if file is None:
+        raise HTTPException(status_code=400, detail="'file' or 'upload_id' is required")
+    task_id = task_queue.enqueue(engine, kind, parsed, file.file, file.filename)
+    return {"task_id": task_id, "status": "queued", "location": f"{router.prefix}/{task_id}"}
+
+@router.get("/{task_id}")
+def task_status(task_id: str):
+    task = _task(task_id)
+    status = task_queue.public(task)
+    if task["artifact"]:
+        status["artifact_url"] = f"{router.prefix}/{task_id}/artifact"
+    return status
+
+@router.get("/{task_id}/artifact")
+def task_artifact(task_id: str):
+    task = _task(task_id)
+    if task["status"] != "done" or not task["artifact"]:
+        raise HTTPException(status_code=409, detail=f"Task is {task['status']}, no artifact")
+    path = task_queue.artifact_path(task)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Artifact expired")
+    return FileResponse(path, filename=task_queue.artifact_name(task))
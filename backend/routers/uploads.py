@@ -0,0 +1,130 @@
+# routers/uploads.py
+"""
+Resumable upload API (see utils/resumable_upload.py):
+
+    POST   /upload-sessions                 {"size", "filename", "content_type", "sha256"?} -> upload_id
+    PATCH  /upload-sessions/{id}            raw chunk; headers Upload-Offset + X-Chunk-SHA256
+    GET    /upload-sessions/{id}            received / missing byte ranges
+    POST   /upload-sessions/{id}/finalize   -> complete, whole-file sha256
+    DELETE /upload-sessions/{id}
+
+Conversion endpoints take `upload_id` (or `<field>_upload_id`) instead of the
+file part through the upload_input() / upload_inputs() dependencies, so one
+large upload can feed several tools.
+"""
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, File, Form, Header, HTTPException, Request, Response, UploadFile
+from starlette.datastructures import Headers
+
+import schemas
+from utils.fair_share import caller_key
+from utils.resumable_upload import UPLOAD_CHUNK_MAX_MB, UploadError, upload_store
+
+router = APIRouter(prefix="/upload-sessions", tags=["Uploads"])
+
+CHUNK_MAX_BYTES = UPLOAD_CHUNK_MAX_MB * 1024 * 1024
+
+async def _run(fn, *args):
+    try:
+        return await asyncio.to_thread(fn, *args)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
+
+def _offset_header(status: dict) -> dict:
+    return {"Upload-Offset": str(status["offset"])}
+
+@router.post("", status_code=201)
+async def create_upload(body: schemas.UploadCreate, request: Request, response: Response):
+    owner, _ = caller_key(request.scope)   # the user, else the client IP: what the per-caller quota counts
+    status = await _run(upload_store.create, body.size, body.filename, body.content_type, body.sha256, owner)
+    response.headers["Location"] = f"{router.prefix}/{status['upload_id']}"
+    response.headers["Upload-Chunk-Max"] = str(CHUNK_MAX_BYTES)
+    return status
+
+@router.get("/{upload_id}")
+async def upload_status(upload_id: str, response: Response):
+    status = await _run(upload_store.get, upload_id)
+    response.headers.update(_offset_header(status))
+    return status
+
+@router.patch("/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(...),
+    x_chunk_sha256: str = Header(...),
+):
+    declared = request.headers.get("content-length")
+    if declared and int(declared) > CHUNK_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Chunks are limited to {UPLOAD_CHUNK_MAX_MB} MB")
+    body = bytearray()
+    async for piece in request.stream():
+        body += piece
+        if len(body) > CHUNK_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Chunks are limited to {UPLOAD_CHUNK_MAX_MB} MB")
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty chunk")
+    status = await _run(upload_store.write_chunk, upload_id, upload_offset, bytes(body), x_chunk_sha256)
+    response.headers.update(_offset_header(status))
+    return status
+
+@router.post("/{upload_id}/finalize")
+async def finalize_upload(upload_id: str):
+    return await _run(upload_store.finalize, upload_id)
+
+@router.delete("/{upload_id}", status_code=204)
+async def delete_upload(upload_id: str):
+    await _run(upload_store.delete, upload_id)
+    return Response(status_code=204)
+
+# ---------------- conversion endpoints: file part or upload_id ----------------
+def _open_upload(upload_id: str) -> UploadFile:
+    try:
+        f, meta = upload_store.open(upload_id)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status, detail=e.detail)
+    return UploadFile(f, size=meta["size"], filename=meta["filename"],
+                      headers=Headers({"content-type": meta["content_type"]}))
+
+def upload_input(field: str = "file", required: bool = True):
+    """Dependency: the multipart `field`, or the finalized upload named by `upload_id` / `<field>_upload_id`."""
+    id_field = "upload_id" if field == "file" else f"{field}_upload_id"
+
+    def dependency(
+        file: Optional[UploadFile] = File(None, alias=field),
+        upload_id: Optional[str] = Form(None, alias=id_field),
+    ):
+        if file is not None and upload_id:
+            raise HTTPException(status_code=400, detail=f"Send either '{field}' or '{id_field}', not both")
+        if not upload_id:
+            if file is None and required:
+                raise HTTPException(status_code=400, detail=f"'{field}' or '{id_field}' is required")
+            yield file
+            return
+        upload = _open_upload(upload_id)
+        try:
+            yield upload
+        finally:
+            upload.file.close()
+
+    return dependency
+
+def upload_inputs(field: str = "files"):
+    """Dependency: the multipart list `field` followed by the uploads in `upload_ids`."""
+    def dependency(
+        files: Optional[List[UploadFile]] = File(None, alias=field),
+        upload_ids: Optional[List[str]] = Form(None),
+    ):
+        opened = []
+        try:
+            for upload_id in upload_ids or []:
+                opened.append(_open_upload(upload_id))
+            yield list(files or []) + opened
+        finally:
+            for upload in opened:
+                upload.file.close()
+
+    return dependency
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import models, schemas
 from database import get_db
@@ -6,6 +7,17 @@ from routers.auth import get_current_user
 
 router = APIRouter(prefix="/user", tags=["User Data"])
 
+def trim_stmt(model, user_id: int, keep: int):
+    """Ids past the newest `keep` rows; walks ix_*_user_created, so cost is O(keep), not O(history)."""
+    return select(
+        select(model.id)
+        .where(model.user_id == user_id)
+        .order_by(model.created_at.desc())
+        .offset(keep)
+        .subquery()
+        .c.id
+    )
+
 # ---------------- RECENT ----------------
 @router.get("/recent", response_model=list[schemas.RecentOut])
 def get_recent(db: Session = Depends(get_db), user=Depends(get_current_user)):
@@ -28,19 +40,13 @@ def add_recent(payload: schemas.RecentCreate, db: Session = Depends(get_db), use
 
     row = models.UserRecentActivity(user_id=user.id, tab=payload.tab, name=payload.name)
     db.add(row)
-    db.commit()
+    db.flush()
 
     # Keep only last 5
-    rows = (
-        db.query(models.UserRecentActivity)
-        .filter(models.UserRecentActivity.user_id == user.id)
-        .order_by(models.UserRecentActivity.created_at.desc())
-        .all()
-    )
-    if len(rows) > 5:
-        for r in rows[5:]:
-            db.delete(r)
-        db.commit()
+    db.query(models.UserRecentActivity).filter(
+        models.UserRecentActivity.id.in_(trim_stmt(models.UserRecentActivity, user.id, 5))
+    ).delete(synchronize_session=False)
+    db.commit()
 
     return (
         db.query(models.UserRecentActivity)
@@ -144,20 +150,13 @@ def add_user_suggestion(payload: schemas.UserSuggestionCreate, db: Session = Dep
         note=(payload.note.strip() if payload.note else None),
     )
     db.add(row)
-    db.commit()
-
-    rows = (
-        db.query(models.UserSuggestion)
-        .filter(models.UserSuggestion.user_id == user.id)
-        .order_by(models.UserSuggestion.created_at.desc())
-        .all()
-    )
+    db.flush()
 
     # keep only 20
-    if len(rows) > 20:
-        for r in rows[20:]:
-            db.delete(r)
-        db.commit()
+    db.query(models.UserSuggestion).filter(
+        models.UserSuggestion.id.in_(trim_stmt(models.UserSuggestion, user.id, 20))
+    ).delete(synchronize_session=False)
+    db.commit()
 
     return (
         db.query(models.UserSuggestion)
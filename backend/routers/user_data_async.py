@@ -0,0 +1,145 @@
+# Async twin of routers/user_data.py (mounted when DB_ASYNC=1)
+from fastapi import APIRouter, Depends
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models, schemas
+from database import get_async_db
+from routers.auth_async import get_current_user
+from routers.user_data import trim_stmt
+
+router = APIRouter(prefix="/user", tags=["User Data"])
+
+async def _all(db: AsyncSession, stmt):
+    return (await db.execute(stmt)).scalars().all()
+
+# ---------------- RECENT ----------------
+def _recent(user_id: int):
+    return (
+        select(models.UserRecentActivity)
+        .where(models.UserRecentActivity.user_id == user_id)
+        .order_by(models.UserRecentActivity.created_at.desc())
+    )
+
+@router.get("/recent", response_model=list[schemas.RecentOut])
+async def get_recent(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    return await _all(db, _recent(user.id).limit(5))
+
+@router.post("/recent", response_model=list[schemas.RecentOut])
+async def add_recent(payload: schemas.RecentCreate, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    # Remove existing same tab (so it moves to top)
+    await db.execute(delete(models.UserRecentActivity).where(
+        models.UserRecentActivity.user_id == user.id,
+        models.UserRecentActivity.tab == payload.tab
+    ))
+    db.add(models.UserRecentActivity(user_id=user.id, tab=payload.tab, name=payload.name))
+    await db.flush()
+
+    # Keep only last 5
+    await db.execute(delete(models.UserRecentActivity).where(
+        models.UserRecentActivity.id.in_(trim_stmt(models.UserRecentActivity, user.id, 5))
+    ))
+    await db.commit()
+
+    return await _all(db, _recent(user.id).limit(5))
+
+@router.delete("/recent")
+async def clear_recent(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    await db.execute(delete(models.UserRecentActivity).where(models.UserRecentActivity.user_id == user.id))
+    await db.commit()
+    return {"ok": True}
+
+
+# ---------------- USAGE ----------------
+@router.get("/usage", response_model=list[schemas.UsageOut])
+async def get_usage(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    return await _all(
+        db,
+        select(models.UserToolUsage)
+        .where(models.UserToolUsage.user_id == user.id)
+        .order_by(models.UserToolUsage.count.desc())
+        .limit(50)
+    )
+
+@router.post("/usage")
+async def bump_usage(payload: schemas.RecentCreate, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    row = (await db.execute(
+        select(models.UserToolUsage)
+        .where(models.UserToolUsage.user_id == user.id, models.UserToolUsage.tab == payload.tab)
+    )).scalar_one_or_none()
+    if row:
+        row.count += 1
+    else:
+        db.add(models.UserToolUsage(user_id=user.id, tab=payload.tab, count=1))
+    await db.commit()
+    return {"ok": True}
+
+@router.delete("/usage")
+async def clear_usage(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    await db.execute(delete(models.UserToolUsage).where(models.UserToolUsage.user_id == user.id))
+    await db.commit()
+    return {"ok": True}
+
+
+# ---------------- FAVOURITES ----------------
+def _favourites(user_id: int):
+    return (
+        select(models.UserFavourite)
+        .where(models.UserFavourite.user_id == user_id)
+        .order_by(models.UserFavourite.created_at.desc())
+    )
+
+@router.get("/favourites", response_model=list[schemas.FavouriteOut])
+async def get_favourites(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    return await _all(db, _favourites(user.id))
+
+@router.post("/favourites", response_model=list[schemas.FavouriteOut])
+async def toggle_favourite(payload: schemas.FavouriteCreate, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    existing = (await db.execute(select(models.UserFavourite).where(
+        models.UserFavourite.user_id == user.id,
+        models.UserFavourite.tab == payload.tab
+    ))).scalar_one_or_none()
+
+    if existing:
+        await db.delete(existing)
+    else:
+        db.add(models.UserFavourite(user_id=user.id, tab=payload.tab, name=payload.name, icon=payload.icon))
+    await db.commit()
+
+    return await _all(db, _favourites(user.id))
+
+
+# ---------------- SUGGESTIONS (Suggestion Box) ----------------
+def _suggestions(user_id: int):
+    return (
+        select(models.UserSuggestion)
+        .where(models.UserSuggestion.user_id == user_id)
+        .order_by(models.UserSuggestion.created_at.desc())
+    )
+
+@router.get("/suggestions", response_model=list[schemas.UserSuggestionOut])
+async def get_user_suggestions(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    return await _all(db, _suggestions(user.id).limit(20))
+
+@router.post("/suggestions", response_model=list[schemas.UserSuggestionOut])
+async def add_user_suggestion(payload: schemas.UserSuggestionCreate, db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    db.add(models.UserSuggestion(
+        user_id=user.id,
+        tool_idea=payload.toolIdea.strip(),
+        note=(payload.note.strip() if payload.note else None),
+    ))
+    await db.flush()
+
+    # keep only 20
+    await db.execute(delete(models.UserSuggestion).where(
+        models.UserSuggestion.id.in_(trim_stmt(models.UserSuggestion, user.id, 20))
+    ))
+    await db.commit()
+
+    return await _all(db, _suggestions(user.id).limit(20))
+
+@router.delete("/suggestions")
+async def clear_user_suggestions(db: AsyncSession = Depends(get_async_db), user=Depends(get_current_user)):
+    await db.execute(delete(models.UserSuggestion).where(models.UserSuggestion.user_id == user.id))
+    await db.commit()
+    return {"ok": True}
@@ -1,6 +1,6 @@
 # schemas.py
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
 # --- Applications ---
@@ -31,6 +31,7 @@ class SuggestionRead(SuggestionBase):
     id: int
     upvotes: int
     downvotes: int
+    score: int
     created_at: datetime
 
     class Config:
@@ -104,3 +105,52 @@ class UserSuggestionOut(BaseModel):
     created_at: datetime
     class Config:
         from_attributes = True
+
+
+# --- MOM history ---
+class MomSummaryOut(BaseModel):
+    id: int
+    mode: Optional[str]
+    title: Optional[str]
+    preview: Optional[str]
+    transcript_chars: int
+    created_at: Optional[datetime]
+    class Config:
+        from_attributes = True
+
+class MomRecordOut(MomSummaryOut):
+    transcript: str
+    mom: str
+
+# --- Resumable uploads ---
+class UploadCreate(BaseModel):
+    size: int = Field(gt=0)
+    filename: str = ""
+    content_type: str = "application/octet-stream"
+    sha256: Optional[str] = Field(None, pattern=r"^[0-9a-fA-F]{64}$")  # whole file, checked on finalize
+
+# --- Document sessions ---
+class DocPages(BaseModel):
+    pages: Optional[str] = None      # "1-3,5"; empty = all
+    keep: bool = False               # store the result as a new document instead of returning it
+
+class DocLock(DocPages):
+    password: str = Field(min_length=1)
+
+class DocUnlock(BaseModel):
+    password: str
+    keep: bool = False
+
+class DocSplitMany(BaseModel):
+    mode: Literal["every", "pages", "bookmarks"] = "every"
+    every: int = Field(1, ge=1)      # pages per file for mode=every
+    level: int = Field(1, ge=1)      # deepest bookmark level that starts a file
+    pages: Optional[str] = None      # limit every/pages to this selection
+
+class DocMergePart(BaseModel):
+    doc_id: str
+    pages: Optional[str] = None
+
+class DocMerge(BaseModel):
+    parts: list[DocMergePart] = Field(min_length=1)
+    keep: bool = False
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from main import app, catalog
+from database import engine
+import models
+
+models.Base.metadata.create_all(bind=engine)
+
+client = TestClient(app)
+
+def test_catalog_snapshot_etag_and_keyset():
+    first = client.get("/applications?limit=500")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    # Unchanged catalog -> 304 from memory
+    again = client.get("/applications?limit=500", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    version = catalog.version
+    created = client.post("/applications", json={"name": "QR Code", "category": "Utility", "icon": "qr.webp", "url": "#"})
+    assert created.status_code == 200
+    new_id = created.json()["id"]
+
+    fresh = client.get("/applications?limit=500", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert catalog.version == version + 1
+    assert new_id in [a["id"] for a in fresh.json()]
+
+    # after_id pages never overlap
+    page = client.get(f"/applications?after_id={new_id - 1}&limit=1").json()
+    assert [a["id"] for a in page] == [new_id]
+    assert client.get(f"/applications?after_id={new_id}").json() == []
+
+def test_catalog_conditional_and_gzip_negotiation():
+    etag = client.get("/applications").headers["etag"]
+    # exact tag match only: a tag that merely contains ours (or is contained in it) is a miss
+    assert client.get("/applications", headers={"If-None-Match": f'"x{etag[1:]}'}).status_code == 200
+    assert client.get("/applications", headers={"If-None-Match": etag[:-2] + '"'}).status_code == 200
+    assert client.get("/applications", headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/applications", headers={"If-None-Match": "*"}).status_code == 304
+
+    refused = client.get("/applications", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert "content-encoding" not in refused.headers
+    refused.json()
+    gz = client.get("/applications", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert gz.headers["content-encoding"] == "gzip"
@@ -0,0 +1,89 @@
+import io
+import os
+import time
+
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfWriter
+
+from main import app
+from utils.artifacts import ArtifactError, ArtifactStore, artifacts
+
+client = TestClient(app)
+
+def _pdf_bytes(pages: int = 2) -> bytes:
+    w = PdfWriter()
+    for _ in range(pages):
+        w.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def test_converted_file_resumes_from_its_artifact_url():
+    files = [("files", (f"{i}.pdf", _pdf_bytes(), "application/pdf")) for i in range(2)]
+    r = client.post("/convert/pdf-merge", files=files)
+    assert r.status_code == 200 and r.headers["accept-ranges"] == "bytes"
+    url, full = r.headers["content-location"], r.content
+
+    part = client.get(url, headers={"Range": "bytes=100-"})
+    assert part.status_code == 206 and full[:100] + part.content == full
+    assert part.headers["content-range"] == f"bytes 100-{len(full) - 1}/{len(full)}"
+
+    etag = r.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": r.headers["last-modified"]}).status_code == 304
+    stale = client.get(url, headers={"Range": "bytes=100-", "If-Range": '"old"'})
+    assert stale.status_code == 200 and stale.content == full
+    assert client.head(url).headers["content-length"] == str(len(full))
+
+def test_text_artifacts_are_served_precompressed():
+    body = ("minutes of the meeting\n" * 400).encode()
+    meta = artifacts.put_bytes(body, "mom.txt", "text/plain")
+    assert meta["gzip_size"] and meta["gzip_size"] < len(body) // 10
+    url = artifacts.url(meta)
+
+    gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip" and gz.content == body   # httpx decodes it
+    assert "Accept-Encoding" in gz.headers["vary"] and gz.headers["etag"].endswith('.gz"')
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.content == body
+    ranged = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+    assert ranged.status_code == 206 and ranged.content == body[:10]      # ranges address identity bytes
+    assert client.get(url, headers={"If-None-Match": gz.headers["etag"]}).status_code == 304
+
+    assert artifacts.put_bytes(_pdf_bytes(), "a.pdf", "application/pdf")["gzip_size"] is None
+
+def test_expired_and_unknown_artifacts():
+    meta = artifacts.put_bytes(b"x", "a.txt", "text/plain", ttl=-1)
+    assert client.get(artifacts.url(meta)).status_code == 410
+    assert client.get("/artifacts/" + "0" * 32 + "/a.txt").status_code == 404
+    assert client.get("/artifacts/nope/a.txt").status_code == 404
+
+    old = artifacts.put_bytes(b"y", "b.txt", "text/plain", ttl=1)
+    assert artifacts.cleanup(now=time.time() + 5) >= 1
+    assert client.get(artifacts.url(old)).status_code == 404
+
+def test_store_evicts_oldest_artifacts_over_budget(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=250, max_entries=3)
+    first = store.put_bytes(b"a" * 100, "a.bin", "application/octet-stream")
+    second = store.put_bytes(b"b" * 100, "b.bin", "application/octet-stream")
+    third = store.put_bytes(b"c" * 100, "c.bin", "application/octet-stream")   # 300 bytes > 250
+    try:
+        store.get(first["id"])
+        assert False, "the oldest artifact should have been evicted"
+    except ArtifactError as e:
+        assert e.status == 404
+    assert store.get(second["id"]) and store.get(third["id"])
+
+    restarted = ArtifactStore(str(tmp_path), max_bytes=0, max_entries=2)   # index rebuilt from the sidecars
+    fourth = restarted.put_bytes(b"%PDF-1.4 d", "d.pdf", "application/pdf")
+    assert {m.name for m in tmp_path.glob("*.json")} == {f"{third['id']}.json", f"{fourth['id']}.json"}
+
+def test_meeting_mom_pdf_lives_only_in_the_artifact_store():
+    from routers.mom_generator import TEMP_DIR
+
+    before = set(os.listdir(TEMP_DIR)) if os.path.isdir(TEMP_DIR) else set()
+    body = client.post("/meeting-mom", data={"transcript": "Backend APIs done."}).json()
+    assert "pdf_path" not in body
+    r = client.get(body["pdf_url"])
+    assert r.status_code == 200 and r.content.startswith(b"%PDF")
+    assert set(os.listdir(TEMP_DIR)) == before              # no second copy left in temp_mom
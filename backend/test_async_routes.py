@@ -0,0 +1,35 @@
+import uuid
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import database, models
+from routers.auth_async import router as auth_router
+from routers.user_data_async import router as user_data_router
+
+models.Base.metadata.create_all(bind=database.engine)
+
+app = FastAPI()
+app.include_router(auth_router)
+app.include_router(user_data_router)
+client = TestClient(app)
+
+def test_async_auth_and_dashboard_routes():
+    email = f"{uuid.uuid4().hex[:8]}@example.com"
+    r = client.post("/auth/signup", json={"name": "Async", "email": email, "password": "secret123"})
+    assert r.status_code == 200, r.text
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    assert client.get("/auth/me", headers=headers).json()["email"] == email
+
+    for i in range(7):
+        client.post("/user/recent", json={"tab": f"tool-{i}", "name": f"Tool {i}"}, headers=headers)
+    recent = client.get("/user/recent", headers=headers).json()
+    assert len(recent) == 5
+
+    client.post("/user/usage", json={"tab": "pdf", "name": ""}, headers=headers)
+    client.post("/user/usage", json={"tab": "pdf", "name": ""}, headers=headers)
+    assert client.get("/user/usage", headers=headers).json() == [{"tab": "pdf", "count": 2}]
+
+    stats = database.pool_stats()
+    assert stats["async"]["checkouts"] > 0
+    assert stats["async"]["in_use"] == 0
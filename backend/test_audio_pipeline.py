@@ -0,0 +1,167 @@
+import io
+import shutil
+import tempfile
+import threading
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import utils.speech_to_text as stt
+from main import app
+from utils.audio_pipeline import (
+    FFMPEG, SAMPLE_RATE, iter_pcm_chunks, iter_speech_chunks, pack_regions, transcribe_parallel, transcribe_stream,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which(FFMPEG) is None, reason="ffmpeg not installed")
+
+client = TestClient(app)
+
+def _wav_bytes(seconds: float, rate: int = 44100, pauses=()) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    pcm = (np.sin(2 * np.pi * 440 * t) * 12000).astype("<i2")
+    for start, end in pauses:
+        pcm[int(start * rate):int(end * rate)] = 0
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+class RecordingModel:
+    """Stands in for WhisperModel: one segment per chunk, remembers what it was fed."""
+
+    def __init__(self):
+        self.fed = []
+
+    def transcribe(self, audio, beam_size=1, vad_filter=True):
+        self.fed.append(audio)
+        dur = len(audio) / SAMPLE_RATE
+        return iter([SimpleNamespace(start=0.0, end=dur, text=f" chunk{len(self.fed)}")]), None
+
+@pytest.mark.parametrize("kind", ["path", "pipe", "fd"])
+def test_pcm_chunks_are_bounded_and_resampled(kind):
+    data = _wav_bytes(7.0)
+    with tempfile.NamedTemporaryFile(suffix=".wav") as f:
+        f.write(data); f.flush()
+        source = {"path": f.name, "pipe": io.BytesIO(data), "fd": open(f.name, "rb")}[kind]
+        chunks = list(iter_pcm_chunks(source, chunk_seconds=2))
+
+    assert [len(c) for c in chunks[:-1]] == [2 * SAMPLE_RATE] * 3
+    assert abs(sum(len(c) for c in chunks) - 7 * SAMPLE_RATE) < SAMPLE_RATE // 100
+    assert all(c.dtype == np.float32 and np.abs(c).max() <= 1.0 for c in chunks)
+
+def test_transcribe_stream_cuts_chunks_at_pauses():
+    model = RecordingModel()
+    wav = _wav_bytes(5.0, pauses=[(1.5, 1.8), (3.5, 3.8)])
+    result = transcribe_stream(model, io.BytesIO(wav), chunk_seconds=2)
+    assert result["text"] == "chunk1 chunk2 chunk3"
+    starts = [s["start"] for s in result["segments"]]
+    assert starts[0] == 0.0 and 1.5 < starts[1] < 1.8 and 3.5 < starts[2] < 3.8   # not 2.0 / 4.0, mid-word
+    assert sum(len(a) for a in model.fed) == pytest.approx(5 * SAMPLE_RATE, abs=SAMPLE_RATE // 100)
+    assert result["duration"] == pytest.approx(5.0, abs=0.01)
+
+def test_speech_chunks_tile_the_recording():
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, 9 * SAMPLE_RATE).astype(np.float32)
+    audio[int(3.4 * SAMPLE_RATE):int(3.6 * SAMPLE_RATE)] = 0
+    chunks = list(iter_speech_chunks(audio, chunk_seconds=4, search_seconds=1))
+    assert np.array_equal(np.concatenate([c for c, _ in chunks]), audio)
+    assert [round(o * SAMPLE_RATE) for _, o in chunks] == [0, len(chunks[0][0]), len(chunks[0][0]) + len(chunks[1][0])]
+    assert 3.4 < chunks[1][1] <= 3.6
+
+def test_transcribe_local_takes_audio_without_temp_wav(monkeypatch):
+    model = RecordingModel()
+    monkeypatch.setattr(stt, "whisper_model", model)
+    r = client.post("/transcribe/local", files={"file": ("clip.wav", _wav_bytes(3.0), "audio/wav")})
+    assert r.status_code == 200
+    assert r.json()["text"] == "chunk1"
+
+    bad = client.post("/transcribe/local", files={"file": ("x.wav", b"not audio", "audio/wav")})
+    assert bad.status_code == 400
+
+def test_pack_regions_respects_window():
+    sr = SAMPLE_RATE
+    regions = [(0, 5 * sr), (6 * sr, 20 * sr), (21 * sr, 40 * sr), (80 * sr, 81 * sr)]
+    assert pack_regions(regions, window_seconds=30) == [
+        [(0, 5 * sr), (6 * sr, 20 * sr)], [(21 * sr, 40 * sr), (80 * sr, 81 * sr)],   # 19 s and 20 s of speech
+    ]
+
+class WindowModel:
+    """Thread-safe stand-in: one segment per window, text encodes its length."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio, beam_size=1, vad_filter=True):
+        dur = len(audio) / SAMPLE_RATE
+        time.sleep(0.01)
+        with self.lock:
+            self.seconds += dur
+        return iter([SimpleNamespace(start=0.0, end=dur, text=f" w{dur:g}")]), None
+
+def test_transcribe_parallel_drops_silence_and_orders_segments():
+    audio = np.zeros(60 * SAMPLE_RATE, dtype=np.float32)
+    # speech at 1-3 s and 10-11 s in every 20 s chunk
+    vad = lambda a: [(1 * SAMPLE_RATE, 3 * SAMPLE_RATE), (10 * SAMPLE_RATE, 11 * SAMPLE_RATE)]  # noqa: E731
+    model = WindowModel()
+    result = transcribe_parallel(model, audio, workers=4, chunk_seconds=20, vad=vad)
+
+    assert result["duration"] == 60.0
+    assert result["speech"] == pytest.approx(9.0)          # 3 chunks x (2 s + 1 s); the 7 s gaps are never decoded
+    assert model.seconds == pytest.approx(9.0)
+    assert [(s["start"], s["end"]) for s in result["segments"]] == [(1.0, 11.0), (21.0, 31.0), (41.0, 51.0)]
+    assert result["text"] == "w3 w3 w3"
+
+class WordModel:
+    """One segment per second of (concatenated) window audio."""
+
+    def transcribe(self, audio, beam_size=1, vad_filter=True):
+        n = round(len(audio) / SAMPLE_RATE)
+        return iter([SimpleNamespace(start=float(i), end=i + 1.0, text=f" s{i}") for i in range(n)]), None
+
+def test_transcribe_parallel_maps_window_time_back_to_the_recording():
+    audio = np.zeros(20 * SAMPLE_RATE, dtype=np.float32)
+    vad = lambda a: [(2 * SAMPLE_RATE, 4 * SAMPLE_RATE), (9 * SAMPLE_RATE, 10 * SAMPLE_RATE)]  # noqa: E731
+    result = transcribe_parallel(WordModel(), audio, workers=2, chunk_seconds=20, vad=vad)
+    # window second 2 is the first second of the second slice: 9 s, not 4 s
+    assert [(s["start"], s["end"]) for s in result["segments"]] == [(2.0, 3.0), (3.0, 4.0), (9.0, 10.0)]
+
+def test_transcribe_local_parallel_mode(monkeypatch):
+    import utils.audio_pipeline as ap
+    monkeypatch.setattr(stt, "whisper_model", WindowModel())
+    monkeypatch.setattr(ap, "speech_regions", lambda a: [(0, len(a))])
+    r = client.post("/transcribe/local?mode=parallel", files={"file": ("clip.wav", _wav_bytes(3.0), "audio/wav")})
+    assert r.status_code == 200
+    assert r.json()["text"] == "w3" and r.json()["speech"] == pytest.approx(3.0, abs=0.01)
+
+def test_transcribe_local_repeat_is_served_from_cache(monkeypatch):
+    model = RecordingModel()
+    monkeypatch.setattr(stt, "whisper_model", model)
+    audio = _wav_bytes(2.5)
+    first = client.post("/transcribe/local?mode=sequential", files={"file": ("a.wav", audio, "audio/wav")})
+    assert first.headers["X-ASR-Cache"] == "miss"
+
+    monkeypatch.setattr(stt, "whisper_model", None)   # a hit must not need the model at all
+    again = client.post("/transcribe/local?mode=sequential", files={"file": ("retry.wav", audio, "audio/wav")})
+    assert again.status_code == 200 and again.headers["X-ASR-Cache"] == "hit"
+    assert again.json() == first.json()
+    assert len(model.fed) == 1
+
+    assert stt.transcribe_cached(io.BytesIO(audio), parallel=False) == (first.json(), True)
+
+def test_transcribe_local_picks_model_tier(monkeypatch):
+    built = []
+    small = RecordingModel()
+    monkeypatch.setattr(stt.registry, "loader", lambda name, ct: built.append((name, ct)) or small)
+    monkeypatch.setattr(stt.registry, "warmup", None)
+    r = client.post("/transcribe/local?mode=sequential&model=small",
+                    files={"file": ("m.wav", _wav_bytes(1.5), "audio/wav")})
+    assert r.status_code == 200 and r.headers["X-Whisper-Model"] == "small.en"
+    assert built == [("small.en", "int8")] and len(small.fed) == 1
+    assert any(m["model"] == "small.en" for m in client.get("/whisper/models").json()["loaded"])
+
+    assert client.post("/transcribe/local?model=huge", files={"file": ("m.wav", b"x", "audio/wav")}).status_code == 400
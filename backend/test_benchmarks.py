@@ -0,0 +1,45 @@
+import shutil
+
+from fastapi.testclient import TestClient
+
+from benchmarks import compare, fixtures, load, micro
+from benchmarks.stats import percentile, summarize
+from main import app
+from utils.audio_pipeline import FFMPEG
+
+client = TestClient(app)
+
+def test_percentile_nearest_rank():
+    xs = sorted(range(1, 101))
+    assert percentile(xs, 50) == 50
+    assert percentile(xs, 95) == 95
+    assert percentile(xs, 99) == 99
+    assert percentile([7], 99) == 7
+    assert summarize([0.001, 0.002, 0.003])["p50_ms"] == 2.0
+
+def test_micro_runs_offline(tmp_path):
+    corpus = fixtures.build_corpus(str(tmp_path), pdf_pages=(2,), image_sizes=((64, 48),), wav_seconds=(2,))
+    rows = micro.run(client, corpus, repeat=1, only={"pdf-split", "pdf-unlock", "ai-mom-transcript", "transcribe-parallel"})
+    by_name = {r["bench"]: r for r in rows}
+    has_ffmpeg = shutil.which(FFMPEG) is not None   # micro.run skips the ASR cases without it
+    assert set(by_name) == {"pdf-split", "pdf-unlock", "ai-mom-transcript"} | ({"transcribe-parallel"} if has_ffmpeg else set())
+    assert all(r["status"] == 200 for r in rows)
+    if has_ffmpeg:
+        assert by_name["transcribe-parallel"]["asr_model"] == "stub"
+
+def test_load_reports_percentiles_per_route():
+    mix = [("GET /health", 2, lambda: ("get", "/health", {})),
+           ("GET /missing", 1, lambda: ("get", "/no-such-route", {}))]
+    report = load.run(app, mix, concurrency=4, duration=0.5)
+    assert report["requests"] > 0 and report["rps"] > 0
+    health, missing = report["routes"]["GET /health"], report["routes"]["GET /missing"]
+    assert health["errors"] == 0 and health["p50_ms"] <= health["p99_ms"]
+    assert missing["errors"] == missing["n"] > 0
+
+def test_compare_flags_regressions():
+    before = {"micro": [{"bench": "pdf-split", "size": 10, "n": 3, "p50_ms": 100.0}],
+              "load": {"routes": {"GET /health": {"n": 9, "p95_ms": 10.0, "rps": 100.0}}}}
+    after = {"micro": [{"bench": "pdf-split", "size": 10, "n": 3, "p50_ms": 130.0}],
+             "load": {"routes": {"GET /health": {"n": 9, "p95_ms": 10.5, "rps": 70.0}}}}
+    flagged = {(name, metric) for name, metric, *_, bad in compare.compare(before, after, 10) if bad}
+    assert flagged == {("pdf-split [10]", "p50_ms"), ("GET /health", "rps")}
@@ -0,0 +1,92 @@
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfReader, PdfWriter
+
+from main import app
+from utils.doc_sessions import documents
+
+client = TestClient(app)
+
+def _pdf_bytes(pages: int = 4) -> bytes:
+    w = PdfWriter()
+    for _ in range(pages):
+        w.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def _pages(content: bytes) -> int:
+    return len(PdfReader(io.BytesIO(content)).pages)
+
+def _create(data: bytes) -> dict:
+    r = client.post("/documents", files={"file": ("d.pdf", data, "application/pdf")})
+    assert r.status_code == 201
+    return r.json()
+
+def test_upload_once_then_many_operations_parse_once():
+    info = _create(_pdf_bytes(4))
+    doc_id = info["doc_id"]
+    assert info["pages"] == 4 and not info["encrypted"]
+    opens = documents.opens
+
+    r = client.post(f"/documents/{doc_id}/split", json={"pages": "2-3"})
+    assert r.status_code == 200 and _pages(r.content) == 2
+    r = client.get(f"/documents/{doc_id}/text", params={"pages": "1,4"})
+    assert [p["page"] for p in r.json()["pages"]] == [1, 4]
+    r = client.get(f"/documents/{doc_id}/images", params={"pages": "1"})
+    assert zipfile.ZipFile(io.BytesIO(r.content)).namelist() == ["page_1.png"]
+    r = client.post("/documents/merge", json={"parts": [{"doc_id": doc_id, "pages": "1"}, {"doc_id": doc_id}]})
+    assert _pages(r.content) == 5
+
+    assert documents.opens == opens          # every call reused the open session
+    assert _create(_pdf_bytes(4))["doc_id"] == doc_id   # same bytes, same document
+
+def test_lock_keep_then_unlock():
+    doc_id = _create(_pdf_bytes(3))["doc_id"]
+    locked = client.post(f"/documents/{doc_id}/lock", json={"password": "pw", "pages": "1-2", "keep": True}).json()
+    assert locked["encrypted"] and locked["pages"] is None
+
+    assert client.post(f"/documents/{locked['doc_id']}/split", json={"pages": "1"}).status_code == 400
+    assert client.post(f"/documents/{locked['doc_id']}/unlock", json={"password": "nope"}).status_code == 400
+    r = client.post(f"/documents/{locked['doc_id']}/unlock", json={"password": "pw"})
+    assert r.status_code == 200 and _pages(r.content) == 2
+
+def test_bad_requests():
+    doc_id = _create(_pdf_bytes(2))["doc_id"]
+    assert client.post(f"/documents/{doc_id}/split", json={"pages": "3"}).status_code == 400
+    assert client.post(f"/documents/{doc_id}/split", json={"pages": "x"}).status_code == 400
+    assert client.get("/documents/" + "0" * 64).status_code == 404
+    assert client.get("/documents/not-an-id/text").status_code == 404
+    assert client.post("/documents", files={"file": ("d.pdf", b"not a pdf", "application/pdf")}).status_code == 400
+    assert client.delete(f"/documents/{doc_id}").status_code == 204
+    assert client.get(f"/documents/{doc_id}").status_code == 404
+
+def test_delete_drops_only_the_callers_reference():
+    data = _pdf_bytes(5)
+    doc_id = _create(data)["doc_id"]
+    other = TestClient(app, client=("203.0.113.9", 5000))   # another anonymous caller
+    assert other.post("/documents", files={"file": ("d.pdf", data, "application/pdf")}).json()["doc_id"] == doc_id
+
+    assert client.delete(f"/documents/{doc_id}").status_code == 204
+    assert client.delete(f"/documents/{doc_id}").status_code == 404       # nothing left to drop for this caller
+    assert other.get(f"/documents/{doc_id}").json()["pages"] == 5         # still there for the other uploader
+    assert other.delete(f"/documents/{doc_id}").status_code == 204
+    assert client.get(f"/documents/{doc_id}").status_code == 404
+
+def test_delete_waits_for_running_leases(tmp_path):
+    from utils.doc_sessions import DocumentError, DocumentStore, split
+
+    store = DocumentStore(str(tmp_path))
+    doc_id = store.add(io.BytesIO(_pdf_bytes(3)), "ip:a")["doc_id"]
+    with store.lease(doc_id) as doc:
+        doc._reader = None                 # as if the reader had not been built yet
+        store.delete(doc_id, "ip:a")
+        assert _pages(split(doc, "1-2")) == 2   # the lease still reads an open document
+        try:
+            with store.lease(doc_id):
+                assert False, "deleted documents take no new leases"
+        except DocumentError as e:
+            assert e.status == 404
+    assert doc.buffer.closed and not any(tmp_path.iterdir())
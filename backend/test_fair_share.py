@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from models import RateBucket
+from utils.fair_share import (FairQueue, FairShare, FairShareError, FairShareMiddleware, SqlTokenBuckets,
+                              TokenBuckets, classify, parse_limits)
+from utils.security import create_access_token
+
+def test_classify_and_limits():
+    assert classify("POST", "/convert/pdf-to-word") == "ocr"
+    assert classify("POST", "/convert/pdf-merge") == "pdf"
+    assert classify("GET", "/documents/abc/thumbnails") == "light"
+    assert classify("POST", "/transcribe/local") == "asr"
+    assert classify("POST", "/tasks") == "pdf" and classify("GET", "/tasks/abc") == "light"
+    limits = parse_limits("asr=0.1/3/1, pdf=5")
+    assert limits["asr"] == (0.1, 3, 1) and limits["pdf"][0] == 5.0 and limits["pdf"][1:] == (30, 4)
+
+def test_token_bucket_burst_then_refill():
+    buckets = TokenBuckets()
+    assert [buckets.take("k", 1.0, 2, now=0) for _ in range(2)] == [0.0, 0.0]
+    assert buckets.take("k", 1.0, 2, now=0) == pytest.approx(1.0)
+    assert buckets.take("k", 1.0, 2, now=1.0) == 0.0
+    assert buckets.take("other", 1.0, 2, now=1.0) == 0.0
+
+def test_shared_buckets_on_sql(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rl.db'}")
+    RateBucket.__table__.create(engine)
+    node_a, node_b = SqlTokenBuckets(engine), SqlTokenBuckets(engine)
+    assert node_a.take("pdf:ip:1", 0.01, 2) == 0.0
+    assert node_b.take("pdf:ip:1", 0.01, 2) == 0.0
+    assert node_a.take("pdf:ip:1", 0.01, 2) > 50      # both nodes drew from the same bucket
+    assert node_b.take("pdf:ip:2", 0.01, 2) == 0.0
+
+def _grant_order(weights: dict, arrivals: list) -> list:
+    async def scenario():
+        queue, order = FairQueue(1), []
+        await queue.acquire("batch")
+
+        async def job(key):
+            await queue.acquire(key, weights.get(key, 1))
+            order.append(key)
+            await asyncio.sleep(0)
+            queue.release(key)
+
+        tasks = []
+        for key in arrivals:
+            tasks.append(asyncio.create_task(job(key)))
+            await asyncio.sleep(0)
+        queue.release("batch")
+        await asyncio.gather(*tasks)
+        assert queue.stats() == {"busy": 0, "waiting": 0, "callers_waiting": 0}
+        return order
+
+    return asyncio.run(scenario())
+
+def test_round_robin_across_callers():
+    arrivals = ["batch"] * 4 + ["interactive"]
+    assert _grant_order({}, arrivals) == ["batch", "interactive", "batch", "batch", "batch"]
+    assert _grant_order({"batch": 2}, arrivals) == ["batch", "batch", "interactive", "batch", "batch"]
+
+def test_one_caller_cannot_take_every_slot():
+    async def scenario():
+        queue = FairQueue(3, max_waiting=1)
+        await queue.acquire("batch")
+        await queue.acquire("batch")
+        waiting = asyncio.create_task(queue.acquire("batch"))
+        await asyncio.sleep(0)
+        with pytest.raises(FairShareError) as e:
+            await queue.acquire("batch")
+        assert e.value.status == 429
+        assert await queue.acquire("interactive", timeout=1) == 0.0   # third slot was kept free
+        with pytest.raises(FairShareError) as e:
+            await queue.acquire("late", timeout=0.05)
+        assert e.value.status == 503
+        queue.release("batch")
+        await waiting
+        assert queue.stats()["busy"] == 3
+
+    asyncio.run(scenario())
+
+def test_middleware_rate_limits_per_caller():
+    app = FastAPI()
+    app.add_middleware(FairShareMiddleware, scheduler=FairShare(
+        limits={"light": (0.001, 2, 0), "pdf": (0.001, 1, 1)}))
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.post("/convert/x")
+    def convert():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert [client.get("/ping").status_code for _ in range(3)] == [200, 200, 429]
+    r = client.get("/ping")
+    assert r.status_code == 429 and int(r.headers["retry-after"]) > 1 and "light" in r.json()["detail"]
+
+    user = {"Authorization": f"Bearer {create_access_token({'sub': '7'})}"}
+    assert client.get("/ping", headers=user).status_code == 200     # own bucket, not the shared IP's
+    assert client.post("/convert/x").status_code == 200
+    assert client.post("/convert/x").status_code == 429             # classes have separate buckets
+
+def test_main_app_behind_the_proxy_limits_each_client():
+    """The real app with admission on, fronted the way render.yaml runs it (uvicorn proxy headers)."""
+    from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+
+    import main
+
+    scheduler = FairShare(parse_limits("pdf=0.001/2/2"))
+    served = ProxyHeadersMiddleware(FairShareMiddleware(main.app, scheduler), trusted_hosts="*")
+    proxy = TestClient(served, client=("10.0.0.1", 443))   # every request arrives from the proxy's address
+
+    def merge(ip):
+        return proxy.post("/convert/pdf-merge", headers={"X-Forwarded-For": ip}, files=[])
+
+    assert [merge("198.51.100.1").status_code for _ in range(2)] == [400, 400]   # admitted, then the route's 400
+    limited = merge("198.51.100.1")
+    assert limited.status_code == 429 and int(limited.headers["retry-after"]) > 0
+    assert merge("198.51.100.2").status_code == 400          # a different visitor has a bucket of its own
+    assert proxy.get("/health", headers={"X-Forwarded-For": "198.51.100.1"}).status_code == 200   # light class
+    assert scheduler.stats()["pdf"]["busy"] == 0
@@ -0,0 +1,105 @@
+import io
+import re
+import threading
+
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfWriter
+
+from main import app
+from utils import metrics
+from utils.llm import FakeGeminiBackend
+
+client = TestClient(app)
+
+def _scrape() -> dict:
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    samples = {}
+    for line in r.text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def _pdf_bytes() -> bytes:
+    w = PdfWriter()
+    w.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def test_counter_is_exact_across_threads():
+    c = metrics.Counter("test_sharded_total", "test", ("k",))
+    h = metrics.Histogram("test_sharded_seconds", "test", buckets=(0.5, 1))
+
+    def work():
+        for i in range(5000):
+            c.inc(k="a")
+            h.observe(0.7)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert c.value(k="a") == 40000
+    lines = h.render()
+    assert 'test_sharded_seconds_bucket{le="0.5"} 0' in lines
+    assert 'test_sharded_seconds_bucket{le="1"} 40000' in lines
+    assert "test_sharded_seconds_count 40000" in lines
+
+def test_routes_latency_and_conversion_bytes():
+    before = _scrape()
+    for _ in range(3):
+        client.get("/health")
+    pdf = _pdf_bytes()
+    assert client.post("/convert/pdf-to-text", files={"file": ("a.pdf", pdf, "application/pdf")}).status_code == 200
+    client.get("/no/such/route")
+
+    after = _scrape()
+    key = 'http_requests_total{route="/health",method="GET",status="200"}'
+    assert after[key] - before.get(key, 0) == 3
+    assert after['http_request_duration_seconds_count{route="/health",method="GET"}'] >= 3
+    assert after['http_requests_total{route="unmatched",method="GET",status="404"}'] >= 1
+    assert after['conversion_bytes_in_total{route="/convert/pdf-to-text"}'] >= len(pdf)
+    assert after['conversion_bytes_out_total{route="/convert/pdf-to-text"}'] > 0
+    assert after["http_requests_in_flight"] == 1   # the scrape itself
+    assert any(k.startswith("db_pool{") for k in after)
+    assert any(k.startswith("temp_disk_bytes{") for k in after)
+
+def test_llm_and_asr_metrics():
+    llm = FakeGeminiBackend(latency=0)
+    llm.generate(["prompt", "text"])
+    metrics.observe_asr("tiny.en", "sequential", 2.0, 20.0)
+
+    samples = _scrape()
+    assert samples['llm_request_duration_seconds_count{backend="fake",op="generate"}'] >= 1
+    assert samples['asr_real_time_factor_bucket{model="tiny.en",mode="sequential",le="0.1"}'] >= 1
+    assert samples['asr_audio_seconds_total{model="tiny.en"}'] >= 20
+
+def test_llm_errors_are_counted():
+    class Broken(FakeGeminiBackend):
+        @metrics.timed_llm("generate")
+        def generate(self, parts):
+            raise TimeoutError("upstream")
+
+    try:
+        Broken(latency=0).generate(["x"])
+    except TimeoutError:
+        pass
+    assert metrics.llm_errors.value(backend="fake", op="generate", error="TimeoutError") >= 1
+
+def test_access_log_is_sampled_json(capsys):
+    mw = metrics.MetricsMiddleware(app, sample=0.0, slow_sec=999)
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": [(b"origin", b"http://localhost:5173")]}
+    mw._record(scope, {"status": 200, "in": 0, "out": 2, "ttfb": 0.001}, 0.002)
+    assert capsys.readouterr().out == ""
+    mw._record(scope, {"status": 503, "in": 0, "out": 2, "ttfb": 0.001}, 0.002)
+    out = capsys.readouterr().out
+    assert re.search(r'"status":503', out) and '"origin":"http://localhost:5173"' in out
+
+def test_temp_disk_gauge_sums_spool_dirs(tmp_path):
+    for name, size in (("temp_merge_1", 100), ("temp_splitmany_2", 50), ("temp_mom", 7)):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "f").write_bytes(b"x" * size)
+    mom, spools = str(tmp_path / "temp_mom"), str(tmp_path / "temp_*")
+    sizes = metrics.DirSizes([mom, spools])()
+    assert sizes == {(mom,): 7, (spools,): 150}   # temp_mom is counted once, under its own label
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+import main
+from main import app
+from utils.disk_cache import DiskCache
+from utils.llm import FakeGeminiBackend, set_llm_backend
+from utils.media_prep import ffmpeg_available
+from utils.single_flight import SingleFlight
+
+client = TestClient(app)
+
+def test_repeat_mom_request_is_served_from_cache():
+    fake = FakeGeminiBackend(latency=0.01)
+    set_llm_backend(fake)
+
+    form = {"transcript": "Team agreed to ship API-3 on Monday."}
+    first = client.post("/ai/mom-generator", data=form)
+    assert first.status_code == 200
+    assert first.headers["x-mom-cache"] == "MISS"
+
+    again = client.post("/ai/mom-generator", data=form)
+    assert again.headers["x-mom-cache"] == "HIT"
+    assert again.json() == first.json()
+
+    # attachments are part of the key
+    with_image = client.post("/ai/mom-generator", data=form, files={"image": ("board.png", b"\x89PNG fake", "image/png")})
+    assert with_image.headers["x-mom-cache"] == "MISS"
+    assert fake.calls == 2 and fake.uploads == 1
+
+def test_concurrent_identical_requests_share_one_call():
+    fake = FakeGeminiBackend(latency=0.2)
+    flights = SingleFlight()
+
+    async def run():
+        async def produce():
+            return await asyncio.to_thread(fake.generate, [main.MOM_PROMPT, "same transcript"])
+        return await asyncio.gather(*[flights.do("k", produce) for _ in range(20)])
+
+    t0 = time.perf_counter()
+    results = asyncio.run(run())
+    assert len(set(results)) == 1
+    assert fake.calls == 1
+    assert time.perf_counter() - t0 < 1.0
+
+def test_leader_disconnect_does_not_fail_the_followers():
+    flights = SingleFlight()
+
+    async def run():
+        async def produce():
+            await asyncio.sleep(0.1)
+            return "mom"
+        leader = asyncio.create_task(flights.do("k", produce))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flights.do("k", produce)) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        leader.cancel()                       # the first client went away
+        results = await asyncio.gather(*followers)
+        return leader.cancelled(), results
+
+    cancelled, results = asyncio.run(run())
+    assert cancelled and results == ["mom"] * 3
+    assert flights.in_flight() == 0
+
+def test_upstream_timeout_maps_to_504(monkeypatch):
+    set_llm_backend(FakeGeminiBackend(latency=0.5))
+    monkeypatch.setattr(main, "MOM_TIMEOUT_SEC", 0.05)
+    r = client.post("/ai/mom-generator", data={"transcript": "slow upstream " + str(time.time())})
+    assert r.status_code == 504
+
+def test_disk_cache_ttl_and_lru(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=0, max_entries=2)
+    cache.set("a" * 64, {"v": 1})
+    cache.set("b" * 64, {"v": 2})
+    assert cache.get("a" * 64) == {"v": 1}  # a is now most recent
+    cache.set("c" * 64, {"v": 3})           # evicts b
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == {"v": 1}
+
+    expiring = DiskCache(str(tmp_path / "ttl"), ttl=0.05)
+    expiring.set("d" * 64, {"v": 4})
+    time.sleep(0.1)
+    assert expiring.get("d" * 64) is None
+
+def test_disk_cache_ttl_counts_from_write_after_restart(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=0.3, max_entries=2)
+    cache.set("a" * 64, {"v": 1})
+    cache.set("b" * 64, {"v": 2})
+    time.sleep(0.2)
+    assert cache.get("a" * 64) == {"v": 1}   # a hit must not restart the TTL
+
+    restarted = DiskCache(str(tmp_path), ttl=0.3, max_entries=2)
+    restarted.set("c" * 64, {"v": 3})         # LRU survives the restart: b goes, not a
+    assert restarted.get("b" * 64) is None
+    time.sleep(0.15)
+    assert restarted.get("a" * 64) is None    # 0.35 s since it was written
+    assert restarted.get("c" * 64) == {"v": 3}
+
+def test_same_media_is_uploaded_once_and_images_are_downscaled():
+    import io
+    from PIL import Image
+
+    fake = FakeGeminiBackend(latency=0)
+    set_llm_backend(fake)
+
+    buf = io.BytesIO()
+    Image.new("RGB", (4000, 3000), (200, 30, 30)).save(buf, "PNG")
+    png = buf.getvalue()
+
+    for i in range(3):
+        r = client.post("/ai/mom-generator", data={"transcript": f"pass {i}"},
+                        files={"image": ("whiteboard.png", png, "image/png")})
+        assert r.status_code == 200
+    assert fake.calls == 3       # different transcripts -> three generations
+    assert fake.uploads == 1     # ...but the image went up once
+
+def test_slim_image_caps_longest_side(tmp_path):
+    from PIL import Image
+    from utils.media_prep import IMAGE_MAX_SIDE, slim_image
+
+    src = tmp_path / "big.png"
+    Image.effect_noise((3200, 2400), 64).convert("RGB").save(src)
+    out = slim_image(str(src), str(tmp_path))
+    with Image.open(out) as img:
+        assert max(img.size) == IMAGE_MAX_SIDE
+    assert out != str(src)
+
+def _lavfi(tmp_path, name, *args):
+    import subprocess
+    from utils.media_prep import FFMPEG
+
+    out = str(tmp_path / name)
+    subprocess.run([FFMPEG, "-hide_banner", "-loglevel", "error", "-y", *args, out], check=True)
+    return out
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not installed")
+def test_slim_video_handles_audio_only_and_video_only(tmp_path):
+    from utils.media_prep import prepare_media, probe_streams
+
+    wav = _lavfi(tmp_path, "call.wav", "-f", "lavfi", "-i", "sine=f=440:d=3")
+    mp3 = _lavfi(tmp_path, "call.mp3", "-f", "lavfi", "-i", "sine=d=3", "-f", "lavfi", "-i", "color=s=64x64:d=1",
+                 "-map", "0", "-map", "1", "-c:v", "mjpeg", "-disposition:v", "attached_pic")
+    mp4 = _lavfi(tmp_path, "screen.mp4", "-f", "lavfi", "-i", "testsrc=d=3:s=320x240", "-c:v", "mpeg4")
+    assert probe_streams(wav) == {"audio"}
+    assert probe_streams(mp3) == {"audio"}   # cover art is not a video track
+    assert probe_streams(mp4) == {"video"}
+
+    for src, expect in ((wav, ["audio.ogg"]), (mp3, ["audio.ogg"]), (mp4, ["frame_01.jpg"])):
+        workdir = tmp_path / os.path.basename(src).replace(".", "_")
+        workdir.mkdir()
+        files = prepare_media(src, "video", str(workdir))
+        assert [os.path.basename(f) for f in files] == expect   # slimmed, not the original
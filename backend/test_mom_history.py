@@ -0,0 +1,68 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import database
+from main import app
+from utils.llm import FakeGeminiBackend, set_llm_backend
+
+client = TestClient(app)
+
+def _login():
+    email = f"{uuid.uuid4().hex[:8]}@example.com"
+    r = client.post("/auth/signup", json={"name": "Mom", "email": email, "password": "secret123"})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+def test_generated_moms_are_kept_and_listed_without_transcripts():
+    set_llm_backend(FakeGeminiBackend(latency=0))
+    headers = _login()
+
+    long_transcript = "Priya will finish the docs by Friday. " * 400
+    ids = []
+    for text in ["Short sync about API-3.", long_transcript, "Retro notes."]:
+        r = client.post("/ai/mom-generator", data={"transcript": text, "mode": "single"}, headers=headers)
+        assert r.status_code == 200
+        ids.append(r.json()["record_id"])
+
+    # same input again -> same history entry, no duplicate
+    again = client.post("/ai/mom-generator", data={"transcript": "Retro notes.", "mode": "single"}, headers=headers)
+    assert again.json()["record_id"] == ids[-1]
+
+    statements = []
+    listener = lambda conn, cur, stmt, *a: statements.append(stmt)  # noqa: E731
+    event.listen(database.engine, "before_cursor_execute", listener)
+    try:
+        page1 = client.get("/mom/history?limit=2", headers=headers).json()
+    finally:
+        event.remove(database.engine, "before_cursor_execute", listener)
+    history_sql = [s for s in statements if "FROM mom_records" in s]
+    assert history_sql and not any("transcript_gz" in s or "mom_records.mom " in s for s in history_sql)
+
+    assert [m["id"] for m in page1] == ids[:0:-1]
+    page2 = client.get(f"/mom/history?limit=2&before_id={page1[-1]['id']}", headers=headers).json()
+    assert [m["id"] for m in page2] == [ids[0]]
+    assert page1[1]["title"] == "Meeting Minutes"
+
+    full = client.get(f"/mom/history/{ids[1]}", headers=headers).json()
+    assert full["transcript"] == long_transcript
+    assert full["transcript_chars"] == len(long_transcript)
+    assert "SUMMARY" in full["mom"]
+
+    # other users can't read it
+    assert client.get(f"/mom/history/{ids[1]}", headers=_login()).status_code == 404
+
+def test_anonymous_moms_are_not_stored():
+    import models
+
+    set_llm_backend(FakeGeminiBackend(latency=0))
+    db = database.SessionLocal()
+    try:
+        before = db.query(models.MomRecord).count()
+        r = client.post("/ai/mom-generator", data={"transcript": f"Anonymous sync {uuid.uuid4()}", "mode": "single"})
+        assert r.status_code == 200
+        assert r.json()["record_id"] is None
+        assert db.query(models.MomRecord).count() == before
+        assert db.query(models.MomRecord).filter(models.MomRecord.user_id.is_(None)).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from main import app
+from utils.llm import FakeGeminiBackend, set_llm_backend
+from utils.mom_mapreduce import chunk_transcript, estimate_tokens, map_reduce_mom
+
+client = TestClient(app)
+
+def _meeting(sentences: int) -> str:
+    return " ".join(f"Speaker {i % 4} said item {i} is on track for release {i // 10}." for i in range(sentences))
+
+def test_chunks_are_bounded_overlapping_and_complete():
+    text = _meeting(400)
+    chunks = chunk_transcript(text, max_tokens=300, overlap_tokens=40)
+    assert len(chunks) > 5
+    assert all(estimate_tokens(c) <= 300 for c in chunks)
+    # consecutive chunks share their boundary sentence(s)
+    assert chunks[1].split(".")[0] in chunks[0]
+    assert "item 0 " in chunks[0] and "item 399 " in chunks[-1]
+
+def test_run_on_text_without_punctuation_is_still_chunked():
+    chunks = chunk_transcript("word " * 5000, max_tokens=200, overlap_tokens=0)
+    assert all(estimate_tokens(c) <= 200 for c in chunks)
+
+def test_latency_scales_with_chunks_over_concurrency():
+    fake = FakeGeminiBackend(latency=0.1)
+    text = _meeting(160)
+    n = len(chunk_transcript(text, max_tokens=200, overlap_tokens=0))
+    assert n >= 8
+
+    t0 = time.perf_counter()
+    asyncio.run(map_reduce_mom(fake, text, concurrency=n, chunk_tokens=200, overlap_tokens=0))
+    elapsed = time.perf_counter() - t0
+
+    assert fake.calls == n + 1
+    # one parallel map round + one reduce, far below n sequential calls
+    assert elapsed < 0.1 * n / 2
+
+def test_long_mode_streams_per_chunk_progress():
+    set_llm_backend(FakeGeminiBackend(latency=0.01))
+    r = client.post("/ai/mom-generator", data={"transcript": _meeting(3000), "mode": "long", "stream": "true"})
+    assert r.status_code == 200
+    assert r.headers["x-mom-mode"] == "long"
+
+    events = [json.loads(line) for line in r.text.splitlines() if line]
+    start = events[0]
+    assert start["stage"] == "start"
+    maps = [e for e in events if e.get("stage") == "map"]
+    assert len(maps) == start["total"] and maps[-1]["done"] == start["total"]
+    assert events[-1]["event"] == "done" and "SUMMARY" in events[-1]["mom"]
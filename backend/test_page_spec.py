@@ -0,0 +1,76 @@
+import io
+import time
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfReader, PdfWriter
+
+from main import app
+from utils.page_spec import PageSpecError, compile_pages, select
+
+client = TestClient(app)
+
+def _pdf_bytes(pages: int) -> bytes:
+    w = PdfWriter()
+    for n in range(pages):
+        w.add_blank_page(width=100 + n, height=100)   # width tells pages apart
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def _widths(content: bytes) -> list:
+    return [int(p.mediabox.width) - 100 for p in PdfReader(io.BytesIO(content)).pages]
+
+@pytest.mark.parametrize("spec, expected", [
+    ("1-3,7", [0, 1, 2, 6]),
+    ("odd", [0, 2, 4, 6, 8]),
+    ("even:2", [1, 5, 9]),
+    ("last", [9]),
+    ("-2", [8]),
+    ("-3..last", [7, 8, 9]),
+    ("8-", [7, 8, 9]),
+    ("10-1:3", [9, 6, 3, 0]),
+    ("3,1,3", [2, 0, 2]),
+    ("1-100000000", list(range(10))),
+    ("", list(range(10))),
+    ("2, 50", [1]),
+])
+def test_compiler(spec, expected):
+    assert list(select(spec, 10)) == expected
+
+def test_huge_ranges_stay_small():
+    t0 = time.perf_counter()
+    sel = select("1-100000000,5-999999999:7", 10)
+    assert time.perf_counter() - t0 < 0.01
+    assert len(sel.ranges) == 2 and len(sel) == 11
+
+@pytest.mark.parametrize("spec", ["x", "0", "1-0", "1-3:0", "1-2-3", ",".join(["1"] * 1001)])
+def test_bad_syntax(spec):
+    with pytest.raises(PageSpecError):
+        compile_pages(spec)
+
+def test_routes_accept_selections():
+    data = _pdf_bytes(6)
+    pdf = ("d.pdf", data, "application/pdf")
+
+    r = client.post("/convert/pdf-split", files={"file": pdf}, data={"pages": "1-100000000:2"})
+    assert _widths(r.content) == [0, 2, 4]
+    assert client.post("/convert/pdf-split", files={"file": pdf}, data={"pages": "9"}).status_code == 400
+    assert client.post("/convert/pdf-split", files={"file": pdf}, data={"pages": "a-b"}).status_code == 400
+
+    r = client.post("/convert/pdf-lock", files={"file": pdf}, data={"password": "pw", "pages": "last"})
+    locked = PdfReader(io.BytesIO(r.content))
+    locked.decrypt("pw")
+    assert len(locked.pages) == 1
+
+    r = client.post("/convert/pdf-to-text", files={"file": pdf}, data={"pages": "even"})
+    assert r.status_code == 200
+
+    r = client.post("/convert/pdf-to-image", files={"file": pdf}, data={"pages": "-2..last"})
+    assert sorted(zipfile.ZipFile(io.BytesIO(r.content)).namelist()) == ["page_5.png", "page_6.png"]
+
+    r = client.post("/convert/pdf-merge", files=[("files", pdf), ("files", pdf)], data={"pages": ["6-4", "1"]})
+    assert _widths(r.content) == [5, 4, 3, 0]
+    r = client.post("/convert/pdf-merge", files=[("files", pdf), ("files", pdf)], data={"pages": ["1"]})
+    assert r.status_code == 400
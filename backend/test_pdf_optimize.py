@@ -0,0 +1,72 @@
+import io
+
+import fitz
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+from PyPDF2 import PdfReader
+
+from main import app
+from utils.pdf_optimize import optimize_pdf
+
+client = TestClient(app)
+
+def _scan_pdf_image() -> bytes:
+    rng = np.random.default_rng(1)
+    pixels = (rng.random((1200, 1600, 3)) * 60 + np.linspace(0, 180, 1600)[None, :, None]).astype("uint8")
+    png = io.BytesIO()
+    Image.fromarray(pixels).save(png, "PNG")
+    return png.getvalue()
+
+def _scan_pdf() -> bytes:
+    """One page with a 1600x1200 photo drawn 4 inches wide (~400 DPI)."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(fitz.Rect(72, 72, 360, 288), stream=_scan_pdf_image())
+    page.insert_text((72, 400), "quarterly report", fontname="helv")
+    return doc.tobytes()
+
+def test_downsamples_and_reports_sizes():
+    data = _scan_pdf()
+    out, report = optimize_pdf(data, dpi=100, quality=70)
+    assert report["images_downsampled"] == 1
+    assert report["bytes_after"] == len(out) < len(data) / 5
+    with fitz.open(stream=out) as doc:
+        assert doc.load_page(0).get_images(full=True)[0][2] <= 420   # ~100 DPI over 4 inches
+        assert "quarterly report" in doc.load_page(0).get_text()
+
+def test_optimize_endpoint_and_inline_flags():
+    data = _scan_pdf()
+    r = client.post("/convert/pdf-optimize", files={"file": ("s.pdf", data, "application/pdf")}, data={"dpi": "120"})
+    assert r.status_code == 200
+    assert int(r.headers["X-Size-Before"]) == len(data) > int(r.headers["X-Size-After"]) == len(r.content)
+
+    pdf = ("s.pdf", data, "application/pdf")
+    plain = client.post("/convert/pdf-merge", files=[("files", pdf), ("files", pdf)])
+    slim = client.post("/convert/pdf-merge", files=[("files", pdf), ("files", pdf)], data={"optimize": "true"})
+    assert "X-Size-Before" not in plain.headers
+    assert len(slim.content) < len(plain.content) / 5 and len(PdfReader(io.BytesIO(slim.content)).pages) == 2
+
+    r = client.post("/convert/pdf-split", files={"file": pdf}, data={"pages": "1", "optimize": "true"})
+    assert r.status_code == 200 and int(r.headers["X-Size-After"]) < int(r.headers["X-Size-Before"])
+
+def test_rejects_garbage():
+    r = client.post("/convert/pdf-optimize", files={"file": ("x.pdf", b"nope", "application/pdf")})
+    assert r.status_code == 400
+
+def test_undecodable_image_is_kept_and_the_rest_optimized():
+    doc = fitz.open(stream=_scan_pdf())
+    page = doc.load_page(0)
+    page.insert_image(fitz.Rect(72, 420, 360, 636), stream=_scan_pdf_image())
+    broken = page.get_images(full=True)[-1][0]
+    doc.update_stream(broken, b"\x00not a jpeg" * 800, compress=False)
+    doc.xref_set_key(broken, "Filter", "/DCTDecode")   # claims JPEG; Pillow can't identify it
+    data = doc.tobytes()
+
+    out, report = optimize_pdf(data, dpi=100, quality=70)
+    assert report["images_downsampled"] == 1 and len(out) < len(data)
+
+    pdf = ("s.pdf", data, "application/pdf")
+    assert client.post("/convert/pdf-optimize", files={"file": pdf}).status_code == 200
+    assert client.post("/convert/pdf-merge", files=[("files", pdf), ("files", pdf)],
+                       data={"optimize": "true"}).status_code == 200
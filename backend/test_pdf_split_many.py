@@ -0,0 +1,82 @@
+import io
+import zipfile
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfReader
+
+from main import app
+from utils.pdf_split_many import PdfSplitter, plan
+
+client = TestClient(app)
+
+def _pdf_bytes(pages: int, toc=None) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page(width=200, height=200).insert_text((20, 100), f"page {i + 1}")
+    if toc:
+        doc.set_toc(toc)
+    return doc.tobytes()
+
+def _zip(content: bytes) -> dict:
+    zf = zipfile.ZipFile(io.BytesIO(content))
+    assert zf.testzip() is None
+    return {name: len(PdfReader(io.BytesIO(zf.read(name))).pages) for name in zf.namelist()}
+
+def _split(data: bytes, **form):
+    return client.post("/convert/pdf-split-many", files={"file": ("d.pdf", data, "application/pdf")}, data=form)
+
+def test_every_n_pages_and_per_page():
+    r = _split(_pdf_bytes(10), mode="every", every="4")
+    assert r.status_code == 200 and r.headers["X-Parts"] == "3"
+    assert _zip(r.content) == {"part_1_p01-04.pdf": 4, "part_2_p05-08.pdf": 4, "part_3_p09-10.pdf": 2}
+
+    r = _split(_pdf_bytes(3), mode="pages", pages="odd")
+    assert _zip(r.content) == {"part_1_p1.pdf": 1, "part_2_p3.pdf": 1}
+
+def test_bookmarks_with_front_matter():
+    toc = [[1, "Intro", 2], [2, "Detail", 3], [1, "Part B: end/notes", 5]]
+    r = _split(_pdf_bytes(6, toc), mode="bookmarks")
+    assert _zip(r.content) == {"1_front matter.pdf": 1, "2_Intro.pdf": 3, "3_Part B_ end_notes.pdf": 2}
+
+    r = _split(_pdf_bytes(6, toc), mode="bookmarks", level="2")
+    assert sorted(_zip(r.content).values()) == [1, 1, 2, 2]
+
+def test_process_pool_matches_in_process(tmp_path):
+    path = tmp_path / "s.pdf"
+    path.write_bytes(_pdf_bytes(7))
+    with fitz.open(path) as src:
+        parts = plan(src, "every", every=2)
+    pooled = PdfSplitter(workers=2)
+    try:
+        built = dict(pooled.iter_parts(str(path), parts))
+    finally:
+        pooled.shutdown()
+    assert built.keys() == dict(PdfSplitter(workers=1).iter_parts(str(path), parts)).keys()
+    assert [len(PdfReader(io.BytesIO(built[name])).pages) for name, _ in parts] == [2, 2, 2, 1]
+
+def test_document_session_split_many():
+    doc_id = client.post("/documents", files={"file": ("d.pdf", _pdf_bytes(5), "application/pdf")}).json()["doc_id"]
+    r = client.post(f"/documents/{doc_id}/split-many", json={"mode": "every", "every": 2, "pages": "2-5"})
+    assert _zip(r.content) == {"part_1_p2-3.pdf": 2, "part_2_p4-5.pdf": 2}
+    assert client.post(f"/documents/{doc_id}/split-many", json={"mode": "bookmarks"}).status_code == 400
+
+def test_bad_requests():
+    assert _split(_pdf_bytes(2), mode="chapters").status_code == 400
+    assert _split(_pdf_bytes(2), mode="every", pages="9").status_code == 400
+    assert _split(b"not a pdf", mode="pages").status_code == 400
+
+def test_failure_mid_stream_aborts_instead_of_ending_cleanly(monkeypatch):
+    from utils.pdf_split_many import splitter
+
+    def broken_zip(path, parts):
+        yield b"PK\x03\x04 first part"
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(splitter, "iter_zip", broken_zip)
+    with pytest.raises(RuntimeError, match="disk full"):   # not a 200 with a truncated ZIP
+        _split(_pdf_bytes(4), mode="pages")
+    doc_id = client.post("/documents", files={"file": ("d.pdf", _pdf_bytes(3), "application/pdf")}).json()["doc_id"]
+    with pytest.raises(RuntimeError, match="disk full"):
+        client.post(f"/documents/{doc_id}/split-many", json={"mode": "pages"})
@@ -0,0 +1,75 @@
+import io
+import json
+
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfWriter
+
+from main import app
+from utils import profiling
+
+client = TestClient(app)
+TOKEN = profiling.PROFILE_ADMIN_TOKEN
+ADMIN = {"X-Profile-Token": TOKEN}
+
+def _pdf(pages: int) -> bytes:
+    w = PdfWriter()
+    for _ in range(pages):
+        w.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def test_unprofiled_request_leaves_no_trace():
+    assert profiling.stage("anything") is profiling._NULL
+    r = client.post("/convert/pdf-merge", files=[("files", ("a.pdf", _pdf(1), "application/pdf")),
+                                                 ("files", ("b.pdf", _pdf(1), "application/pdf"))])
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+
+    wrong = client.post("/convert/pdf-merge?profile=nope", files=[("files", ("a.pdf", _pdf(1), "application/pdf")),
+                                                                  ("files", ("b.pdf", _pdf(1), "application/pdf"))])
+    assert "x-profile-id" not in wrong.headers
+
+def test_profiled_merge_stores_stages_and_speedscope():
+    files = [("files", (f"{i}.pdf", _pdf(40), "application/pdf")) for i in range(3)]
+    r = client.post("/convert/pdf-merge", files=files, headers={"X-Profile": TOKEN})
+    assert r.status_code == 200
+    pid = r.headers["x-profile-id"]
+
+    meta = client.get(f"/admin/profiles/{pid}", headers=ADMIN).json()
+    stages = {s["stage"]: s for s in meta["stages"]}
+    assert {"upload", "spool", "parse", "write", "respond"} <= set(stages)
+    assert stages["parse"]["thread"] != "MainThread"          # ran in the executor, still attributed
+    assert meta["route"] == "/convert/pdf-merge" and meta["status"] == 200
+
+    scope = client.get(f"/admin/profiles/{pid}/speedscope", headers=ADMIN)
+    doc = json.loads(scope.content)
+    assert doc["$schema"].startswith("https://www.speedscope.app")
+    assert all(len(p["samples"]) == len(p["weights"]) for p in doc["profiles"])
+
+    assert any(p["id"] == pid for p in client.get("/admin/profiles", headers=ADMIN).json())
+
+def test_profile_admin_routes_need_token():
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    assert client.get("/admin/profiles/../../etc", headers=ADMIN).status_code == 404
+
+def _unrelated_busy_work(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+def test_profile_samples_only_the_requests_threads():
+    import threading
+
+    stop = threading.Event()
+    other = threading.Thread(target=_unrelated_busy_work, args=(stop,), name="other-request")
+    other.start()
+    try:
+        files = [("files", (f"{i}.pdf", _pdf(60), "application/pdf")) for i in range(3)]
+        r = client.post("/convert/pdf-merge", files=files, headers={"X-Profile": TOKEN})
+    finally:
+        stop.set()
+        other.join()
+    doc = json.loads(client.get(f"/admin/profiles/{r.headers['x-profile-id']}/speedscope", headers=ADMIN).content)
+    assert "_unrelated_busy_work" not in {f["name"] for f in doc["shared"]["frames"]}
+    assert not any(p["name"].startswith("other-request") for p in doc["profiles"])
+    assert any(p["samples"] for p in doc["profiles"])   # the request's own threads were sampled
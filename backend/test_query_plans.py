@@ -0,0 +1,170 @@
+"""
+Query-plan regression suite for the /user/* dashboard routes.
+
+Builds a separate database with the Alembic migrations production runs, seeds
+~PLAN_TEST_ROWS synthetic rows, drives every /user/* route through the real
+app, captures the SQL it sends and asserts via EXPLAIN that each statement is
+an index search with no sort step. The default 20k rows keep the normal run
+fast; PLAN_TEST_ROWS=1000000 is the full-size check. SQLite by default; set
+PLAN_TEST_DATABASE_URL to run the same checks on Postgres.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+import migrate
+import models
+from database import get_db
+from main import app
+from utils.security import create_access_token
+
+PLAN_ROWS = int(os.getenv("PLAN_TEST_ROWS", "20000"))
+PLAN_DB_URL = os.getenv("PLAN_TEST_DATABASE_URL") or "sqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="plan_test_"), "plans.db"
+)
+
+PER_USER = {"recent": 5, "usage": 30, "fav": 20, "sugg": 20}
+ROWS_PER_USER = 1 + sum(PER_USER.values())
+TABLES = {t.name for t in models.Base.metadata.sorted_tables}
+BATCH = 20_000
+
+
+def _batched(rows):
+    batch = []
+    for r in rows:
+        batch.append(r)
+        if len(batch) == BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _seed(engine, n_users: int):
+    t0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    ts = lambda u, i: t0 + timedelta(minutes=u, seconds=i)  # noqa: E731
+    user_ids = range(1, n_users + 1)
+
+    generators = [
+        (models.User, ({"id": u, "name": f"user{u}", "email": f"user{u}@plan.test", "hashed_password": "x"}
+                       for u in user_ids)),
+        (models.UserRecentActivity, ({"user_id": u, "tab": f"tool-{i}", "name": f"Tool {i}", "created_at": ts(u, i)}
+                                     for u in user_ids for i in range(PER_USER["recent"]))),
+        (models.UserToolUsage, ({"user_id": u, "tab": f"tool-{i}", "count": (u * 7 + i * 13) % 500, "updated_at": ts(u, i)}
+                                for u in user_ids for i in range(PER_USER["usage"]))),
+        (models.UserFavourite, ({"user_id": u, "tab": f"tool-{i}", "name": f"Tool {i}", "icon": None, "created_at": ts(u, i)}
+                                for u in user_ids for i in range(PER_USER["fav"]))),
+        (models.UserSuggestion, ({"user_id": u, "tool_idea": f"Idea {i}", "note": None, "created_at": ts(u, i)}
+                                 for u in user_ids for i in range(PER_USER["sugg"]))),
+    ]
+    with engine.begin() as conn:
+        for model, rows in generators:
+            for batch in _batched(rows):
+                conn.execute(insert(model), batch)
+        conn.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module")
+def plan_env():
+    engine = create_engine(PLAN_DB_URL)
+    models.Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    migrate.upgrade_to_head(engine)   # the indexes the revisions create, not create_all()'s
+    n_users = max(PLAN_ROWS // ROWS_PER_USER, 10)
+    _seed(engine, n_users)
+
+    Session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def _plan_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            captured.append((statement, parameters))
+
+    app.dependency_overrides[get_db] = _plan_db
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield engine, captured, n_users // 2
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+        app.dependency_overrides.pop(get_db, None)
+        engine.dispose()
+
+
+def _sqlite_problems(conn, statement, parameters):
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        words = detail.split()
+        if "TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif words[0] == "SCAN" and words[1] in TABLES:
+            problems.append(detail)
+    return plan, problems
+
+
+def _pg_problems(conn, statement, parameters):
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+    problems = []
+
+    def walk(node):
+        kind = node["Node Type"]
+        if kind in ("Sort", "Incremental Sort"):
+            problems.append(kind)
+        if kind == "Seq Scan" and node.get("Relation Name") in TABLES:
+            problems.append(f"Seq Scan on {node['Relation Name']}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return plan, problems
+
+
+def test_user_routes_use_index_scans_without_sorts(plan_env):
+    engine, captured, user_id = plan_env
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)})}
+
+    calls = [
+        ("GET", "/user/recent", None),
+        ("GET", "/user/usage", None),
+        ("GET", "/user/favourites", None),
+        ("GET", "/user/suggestions", None),
+        ("POST", "/user/recent", {"tab": "tool-new", "name": "New tool"}),
+        ("POST", "/user/usage", {"tab": "tool-3", "name": ""}),
+        ("POST", "/user/favourites", {"tab": "tool-2", "name": "Tool 2"}),
+        ("POST", "/user/suggestions", {"toolIdea": "Plan test idea"}),
+        ("DELETE", "/user/recent", None),
+        ("DELETE", "/user/usage", None),
+        ("DELETE", "/user/suggestions", None),
+    ]
+    for method, path, body in calls:
+        r = client.request(method, path, json=body, headers=headers)
+        assert r.status_code == 200, (path, r.text)
+
+    assert captured, "no SQL captured"
+    explain = _pg_problems if engine.dialect.name == "postgresql" else _sqlite_problems
+
+    failures = []
+    with engine.connect() as conn:
+        for statement, parameters in captured:
+            plan, problems = explain(conn, statement, parameters)
+            if problems:
+                failures.append(f"{statement}\n  -> {problems}\n  plan: {plan}")
+    assert not failures, "\n\n".join(failures)
@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.import_profile import profile
+from main import app
+from utils import lazy_imports
+
+client = TestClient(app)
+
+@pytest.fixture
+def scratch_subsystems():
+    """Subsystems a test registers are dropped afterwards, so /ready isn't left 503 for the session."""
+    names = []
+    yield names.append
+    with lazy_imports._lock:
+        for name in names:
+            lazy_imports._state.pop(name, None)
+            lazy_imports._warmers.pop(name, None)
+            for module, m in list(lazy_imports._modules.items()):
+                if m._subsystem == name:
+                    del lazy_imports._modules[module]
+
+def test_importing_main_leaves_heavy_modules_unloaded():
+    report = profile("main")
+    assert report["eager_heavy_modules"] == []
+
+def test_ready_reports_per_subsystem_state():
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/ready?subsystem=db").status_code == 200
+    assert client.get("/ready?subsystem=nope").status_code == 404
+
+    body = client.get("/ready").json()
+    assert {"db", "pdf", "asr", "llm", "pdf_to_word", "mom_pdf"} <= set(body["subsystems"])
+    assert body["subsystems"]["asr"]["state"] != "ready"     # warm-up is off in tests
+    assert "faster_whisper" in body["subsystems"]["asr"]["modules"]
+
+def test_warm_imports_modules_and_runs_warmers(scratch_subsystems):
+    scratch_subsystems("test_sub")
+    colorsys = lazy_imports.lazy("colorsys", "test_sub")
+    ran = []
+    lazy_imports.on_warm("test_sub", lambda: ran.append(colorsys.rgb_to_hsv(1, 0, 0)))
+    assert client.get("/ready?subsystem=test_sub").status_code == 503
+
+    lazy_imports.warm("test_sub")
+    assert ran == [(0.0, 1.0, 1.0)]
+    assert client.get("/ready?subsystem=test_sub").json()["subsystems"]["test_sub"]["state"] == "ready"
+    row = next(r for r in client.get("/ready/imports").json()["imports"] if r["module"] == "colorsys")
+    assert row["loaded"] and row["import_sec"] is not None
+
+def test_failed_warmup_is_reported(scratch_subsystems):
+    scratch_subsystems("broken_sub")
+    lazy_imports.on_warm("broken_sub", lambda: 1 / 0)
+    lazy_imports.warm("broken_sub")
+    state = client.get("/ready?subsystem=broken_sub")
+    assert state.status_code == 503
+    assert state.json()["subsystems"]["broken_sub"]["state"] == "failed"
+
+def test_failed_subsystem_is_ready_once_a_request_loads_it(scratch_subsystems, monkeypatch):
+    scratch_subsystems("retry_sub")
+    wave = lazy_imports.lazy("wave", "retry_sub")
+    with lazy_imports._lock:
+        lazy_imports._state["retry_sub"] = {"state": "failed", "error": "boom"}
+    assert wave.Error                                      # a request imports it on demand
+    assert client.get("/ready?subsystem=retry_sub").status_code == 200
+
+    from utils import speech_to_text
+    monkeypatch.setattr(speech_to_text, "whisper_model", None)
+    monkeypatch.setattr(speech_to_text.registry, "get", lambda *a, **k: object())
+    monkeypatch.setitem(lazy_imports._state, "asr", {"state": "failed", "error": "download timed out"})
+    assert speech_to_text.ensure_whisper() is not None    # loaded on demand by a request
+    assert client.get("/ready?subsystem=asr").status_code == 200
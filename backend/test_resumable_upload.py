@@ -0,0 +1,142 @@
+import hashlib
+import io
+
+from fastapi.testclient import TestClient
+from PyPDF2 import PdfReader, PdfWriter
+
+from main import app
+from utils.resumable_upload import UploadStore, UploadError
+
+client = TestClient(app)
+
+def _pdf_bytes(pages: int = 3) -> bytes:
+    w = PdfWriter()
+    for _ in range(pages):
+        w.add_blank_page(width=200, height=200)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def _patch(upload_id: str, offset: int, chunk: bytes, sha: str = None):
+    return client.patch(f"/upload-sessions/{upload_id}", content=chunk, headers={
+        "Upload-Offset": str(offset), "X-Chunk-SHA256": sha or hashlib.sha256(chunk).hexdigest()})
+
+def _upload(data: bytes, chunk: int = 100, **extra) -> str:
+    r = client.post("/upload-sessions", json={"size": len(data), "filename": "doc.pdf",
+                                              "content_type": "application/pdf", **extra})
+    assert r.status_code == 201
+    upload_id = r.json()["upload_id"]
+    # out of order on purpose: chunks land at their offsets in the preallocated file
+    for off in reversed(range(0, len(data), chunk)):
+        assert _patch(upload_id, off, data[off:off + chunk]).status_code == 200
+    return upload_id
+
+def test_chunks_resume_and_finalize():
+    data = _pdf_bytes()
+    r = client.post("/upload-sessions", json={"size": len(data), "filename": "doc.pdf", "content_type": "application/pdf",
+                                              "sha256": hashlib.sha256(data).hexdigest()})
+    upload_id = r.json()["upload_id"]
+
+    assert _patch(upload_id, 0, data[:100], sha="0" * 64).status_code == 400   # corrupted chunk rejected
+    assert _patch(upload_id, len(data) - 10, data[-20:]).status_code == 416    # past the declared size
+    r = _patch(upload_id, 0, data[:100])
+    assert r.headers["Upload-Offset"] == "100"
+
+    assert client.post(f"/upload-sessions/{upload_id}/finalize").status_code == 409
+    status = client.get(f"/upload-sessions/{upload_id}").json()
+    assert status["missing"] == [[100, len(data)]] and not status["complete"]
+
+    _patch(upload_id, 100, data[100:])
+    done = client.post(f"/upload-sessions/{upload_id}/finalize").json()
+    assert done["complete"] and done["sha256"] == hashlib.sha256(data).hexdigest()
+    assert _patch(upload_id, 0, data[:100]).status_code == 409
+
+def test_whole_file_checksum_checked_on_finalize():
+    data = _pdf_bytes()
+    upload_id = _upload(data, sha256="a" * 64)
+    r = client.post(f"/upload-sessions/{upload_id}/finalize")
+    assert r.status_code == 400 and "checksum" in r.json()["detail"]
+
+def test_one_upload_feeds_several_tools():
+    data = _pdf_bytes(3)
+    upload_id = _upload(data)
+    client.post(f"/upload-sessions/{upload_id}/finalize")
+
+    r = client.post("/convert/pdf-split", data={"upload_id": upload_id, "pages": "1-2"})
+    assert r.status_code == 200 and len(PdfReader(io.BytesIO(r.content)).pages) == 2
+
+    r = client.post("/convert/pdf-to-text", data={"upload_id": upload_id})
+    assert r.status_code == 200
+
+    r = client.post("/convert/pdf-merge", data={"upload_ids": [upload_id, upload_id]})
+    assert r.status_code == 200 and len(PdfReader(io.BytesIO(r.content)).pages) == 6
+
+    r = client.post("/convert/pdf-merge", files=[("files", ("a.pdf", data, "application/pdf"))],
+                    data={"upload_ids": [upload_id]})
+    assert r.status_code == 200 and len(PdfReader(io.BytesIO(r.content)).pages) == 6
+
+def test_upload_id_errors():
+    assert client.post("/convert/pdf-to-text", data={"upload_id": "nope"}).status_code == 404
+    assert client.post("/convert/pdf-to-text").status_code == 400
+
+    data = _pdf_bytes()
+    upload_id = _upload(data, chunk=len(data))
+    r = client.post("/convert/pdf-to-text", data={"upload_id": upload_id})   # not finalized yet
+    assert r.status_code == 409
+
+    r = client.post("/convert/pdf-to-text", data={"upload_id": upload_id},
+                    files={"file": ("d.pdf", data, "application/pdf")})
+    assert r.status_code == 400
+
+    assert client.delete(f"/upload-sessions/{upload_id}").status_code == 204
+    assert client.get(f"/upload-sessions/{upload_id}").status_code == 404
+
+def test_expired_uploads_are_cleaned_up(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1024, ttl=60)
+    status = store.create(10, "a.bin")
+    assert store.cleanup(now=status["expires_at"] - 1) == 0
+    assert store.cleanup(now=status["expires_at"] + 1) == 1
+    try:
+        store.create(2048)
+        assert False, "over the size limit"
+    except UploadError as e:
+        assert e.status == 413
+
+def test_reservations_are_capped_per_caller_and_overall(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=1000, quota_bytes=2400, max_open=3,
+                        caller_quota_bytes=1500, caller_max_open=2)
+
+    def refused(size, owner):
+        try:
+            store.create(size, owner=owner)
+        except UploadError as e:
+            return e.status
+        return None
+
+    a = [store.create(100, owner="ip:a")["upload_id"] for _ in range(2)]
+    assert refused(100, "ip:a") == 429                 # two unfinished sessions already
+    store.delete(a[0])
+    assert refused(1000, "ip:a") is None               # 100 + 1000 <= 1500
+    assert refused(500, "ip:a") == 429                 # caller's bytes: 1100 + 500 > 1500
+    b = store.create(100, owner="ip:b")["upload_id"]
+    assert refused(100, "ip:c") == 429                 # three unfinished sessions overall
+    store.delete(a[1])
+    store.delete(b)
+
+    done = store.create(500, owner="ip:c")["upload_id"]
+    store.write_chunk(done, 0, b"x" * 500, hashlib.sha256(b"x" * 500).hexdigest())
+    store.finalize(done)
+    assert store.usage() == {"bytes": 1500, "open": 1, "owner_bytes": 0, "owner_open": 0}
+    assert refused(1000, "ip:d") == 507                # finalized files still hold disk: 2500 > 2400
+    assert refused(900, "ip:d") is None
+
+def test_create_upload_counts_the_caller(monkeypatch):
+    from utils.resumable_upload import upload_store
+
+    monkeypatch.setattr(upload_store, "caller_max_open", upload_store.usage("ip:testclient")["owner_open"] + 1)
+    first = client.post("/upload-sessions", json={"size": 10, "filename": "a.bin"})
+    assert first.status_code == 201
+    second = client.post("/upload-sessions", json={"size": 10, "filename": "b.bin"})
+    assert second.status_code == 429
+    client.delete(f"/upload-sessions/{first.json()['upload_id']}")
+    assert client.post("/upload-sessions", json={"size": 10, "filename": "b.bin"}).status_code == 201
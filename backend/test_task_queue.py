@@ -0,0 +1,125 @@
+import io
+import os
+import time
+
+import fitz
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+
+import database
+from main import app
+from models import Task
+from utils import task_queue
+from utils.task_queue import TaskError
+from worker import Worker
+
+client = TestClient(app)
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'q.db'}")
+    Task.__table__.create(engine)
+    return engine
+
+def _age_heartbeat(engine, task_id, seconds=120):
+    with engine.begin() as conn:
+        conn.execute(update(Task.__table__).where(Task.__table__.c.id == task_id)
+                     .values(heartbeat_at=time.time() - seconds))
+
+def test_claims_are_exclusive_and_in_order(tmp_path):
+    engine = _engine(tmp_path)
+    first = task_queue.enqueue(engine, "a")
+    second = task_queue.enqueue(engine, "b")
+    assert task_queue.claim(engine, "w1", ["b"])["id"] == second
+    assert task_queue.claim(engine, "w2")["id"] == first
+    assert task_queue.claim(engine, "w3") is None
+    assert task_queue.heartbeat(engine, first, "w2") and not task_queue.heartbeat(engine, first, "w1")
+
+def test_stale_tasks_are_reclaimed_then_failed(tmp_path):
+    engine = _engine(tmp_path)
+    task_id = task_queue.enqueue(engine, "a", max_attempts=2)
+    task_queue.claim(engine, "dead")
+    _age_heartbeat(engine, task_id)
+    assert task_queue.reclaim(engine, stale_sec=60) == 1
+    assert task_queue.claim(engine, "w2")["attempts"] == 2
+    assert not task_queue.complete(engine, task_id, "dead", {"late": True})   # lost owner can't write
+
+    _age_heartbeat(engine, task_id)
+    task_queue.reclaim(engine, stale_sec=60)
+    task = task_queue.get(engine, task_id)
+    assert task["status"] == "failed" and "last attempt" in task["error"]
+
+def test_worker_retries_errors_but_not_bad_input(tmp_path):
+    engine = _engine(tmp_path)
+    calls = []
+
+    def flaky(path, params, out_dir):
+        calls.append(path)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        with open(f"{out_dir}/out.txt", "w") as f:
+            f.write(open(path).read().upper())
+        return {"n": params["n"]}, "out.txt"
+
+    def reject(path, params, out_dir):
+        raise TaskError("bad input")
+
+    worker = Worker(engine, handlers={"flaky": flaky, "reject": reject}, heartbeat_sec=0.01)
+    ok = task_queue.enqueue(engine, "flaky", {"n": 1}, io.BytesIO(b"hi"), "in.txt")
+    bad = task_queue.enqueue(engine, "reject", {}, io.BytesIO(b"x"))
+    while worker.run_once():
+        pass
+
+    done = task_queue.get(engine, ok)
+    assert done["status"] == "done" and done["attempts"] == 2 and task_queue.public(done)["result"] == {"n": 1}
+    assert open(task_queue.artifact_path(done)).read() == "HI"
+    failed = task_queue.get(engine, bad)
+    assert failed["status"] == "failed" and failed["attempts"] == 1 and failed["error"] == "bad input"
+
+def test_tasks_api_with_worker():
+    doc = fitz.open()
+    doc.new_page().insert_text((50, 100), "hello")
+    r = client.post("/tasks", data={"kind": "pdf-optimize", "params": '{"quality": 60}'},
+                    files={"file": ("a.pdf", doc.tobytes(), "application/pdf")})
+    assert r.status_code == 202
+    task_id = r.json()["task_id"]
+    assert client.get(f"/tasks/{task_id}").json()["status"] == "queued"
+    assert client.get(f"/tasks/{task_id}/artifact").status_code == 409
+
+    assert Worker(database.engine, kinds=["pdf-optimize"]).run_once()
+    status = client.get(f"/tasks/{task_id}").json()
+    assert status["status"] == "done" and status["result"]["quality"] == 60
+    r = client.get(status["artifact_url"])
+    assert r.status_code == 200 and r.content.startswith(b"%PDF")
+
+    assert client.post("/tasks", data={"kind": "nope"}).status_code == 400
+    assert client.post("/tasks", data={"kind": "pdf-optimize", "params": "[1]"},
+                       files={"file": ("a.pdf", b"x", "application/pdf")}).status_code == 400
+    assert client.get("/tasks/unknown").status_code == 404
+
+    r = client.post("/tasks", data={"kind": "pdf-optimize", "params": '{"dpi": "high"}'},
+                    files={"file": ("a.pdf", doc.tobytes(), "application/pdf")})
+    assert Worker(database.engine, kinds=["pdf-optimize"]).run_once()
+    failed = client.get(f"/tasks/{r.json()['task_id']}").json()
+    assert failed["status"] == "failed" and failed["attempts"] == 1   # bad params aren't retried
+
+def test_reclaimed_attempt_keeps_its_own_output_dir(tmp_path):
+    engine = _engine(tmp_path)
+    task_id = task_queue.enqueue(engine, "write", {}, io.BytesIO(b"x"))
+    lost = task_queue.claim(engine, "dead")
+    lost_dir = task_queue.out_dir(lost)
+    os.makedirs(lost_dir)
+    with open(os.path.join(lost_dir, "part.bin"), "wb") as f:   # the lost worker is still writing
+        f.write(b"old")
+    _age_heartbeat(engine, task_id)
+
+    def write(path, params, out_dir):
+        with open(os.path.join(out_dir, "out.txt"), "w") as f:
+            f.write("new")
+        return {}, "out.txt"
+
+    assert Worker(engine, handlers={"write": write}, heartbeat_sec=0.01).run_once()
+    done = task_queue.get(engine, task_id)
+    assert open(task_queue.artifact_path(done)).read() == "new"
+    assert task_queue.public(done)["artifact"] == "out.txt"
+    assert open(os.path.join(lost_dir, "part.bin"), "rb").read() == b"old"
+    assert not task_queue.complete(engine, task_id, "dead", {}, "part.bin", lost_dir)
@@ -0,0 +1,61 @@
+import io
+
+from fastapi.testclient import TestClient
+from PIL import Image
+from PyPDF2 import PdfWriter
+
+from main import app
+from utils.doc_sessions import DocumentStore
+from utils.disk_cache import BlobCache
+from utils.thumbnails import ThumbnailRenderer, thumbnails
+
+client = TestClient(app)
+
+def _pdf_bytes(pages: int) -> bytes:
+    w = PdfWriter()
+    for _ in range(pages):
+        w.add_blank_page(width=612, height=792)
+    buf = io.BytesIO()
+    w.write(buf)
+    return buf.getvalue()
+
+def _doc_id(pages: int = 5) -> str:
+    r = client.post("/documents", files={"file": ("d.pdf", _pdf_bytes(pages), "application/pdf")})
+    return r.json()["doc_id"]
+
+def test_batch_then_lazy_pages_from_cache():
+    doc_id = _doc_id(5)
+    r = client.get(f"/documents/{doc_id}/thumbnails", params={"pages": "1-3", "width": 150})
+    body = r.json()
+    assert body["width"] == 160 and [p["page"] for p in body["pages"]] == [1, 2, 3]
+
+    hits = thumbnails.cache.hits
+    r = client.get(body["pages"][1]["url"])
+    assert r.status_code == 200 and r.headers["content-type"] == "image/webp"
+    assert "immutable" in r.headers["cache-control"]
+    assert Image.open(io.BytesIO(r.content)).size[0] == 160
+    assert thumbnails.cache.hits == hits + 1     # rendered by the batch call, served from cache
+
+    r2 = client.get(body["pages"][1]["url"], headers={"If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304 and not r2.content
+
+def test_jpeg_and_errors():
+    doc_id = _doc_id(2)
+    r = client.get(f"/documents/{doc_id}/thumbnails/2", params={"format": "jpeg", "width": 96})
+    assert r.headers["content-type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(r.content)).format == "JPEG"
+    assert client.get(f"/documents/{doc_id}/thumbnails/3").status_code == 400
+    assert client.get(f"/documents/{doc_id}/thumbnails/1", params={"format": "gif"}).status_code == 422
+    assert client.get(f"/documents/{doc_id}/thumbnails", params={"pages": "1-2,1-2," * 20}).status_code == 400
+
+def test_process_pool_renders_in_parallel(tmp_path):
+    store = DocumentStore(str(tmp_path / "docs"))
+    renderer = ThumbnailRenderer(workers=2, cache=BlobCache(str(tmp_path / "thumbs")))
+    info = store.add(io.BytesIO(_pdf_bytes(4)))
+    try:
+        with store.lease(info["doc_id"]) as doc:
+            out = renderer.render(doc, "1-4", 96, "jpeg")
+        assert sorted(out) == [0, 1, 2, 3] and renderer._pool is not None
+        assert renderer.cache.stats()["entries"] == 4
+    finally:
+        renderer.shutdown()
@@ -3,6 +3,7 @@ from main import app, get_db
 from database import Base, engine, SessionLocal
 import models
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
@@ -66,6 +67,59 @@ def test_voting_flow():
 
     print("\nAll voting tests passed!")
 
+def test_concurrent_votes_on_hot_suggestion():
+    response = client.post("/suggestions", json={"text": "Hot suggestion"})
+    assert response.status_code == 200
+    suggestion_id = response.json()["id"]
+
+    voters = [str(uuid.uuid4()) for _ in range(300)]
+
+    def vote(user_id, vote_type):
+        r = client.post(f"/suggestions/{suggestion_id}/vote?vote_type={vote_type}&user_id={user_id}")
+        assert r.status_code == 200, r.text
+
+    # Round 1: everyone upvotes at once
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        list(pool.map(lambda u: vote(u, "up"), voters))
+
+    # Round 2: first 100 switch to down, next 50 toggle their upvote off, rest do nothing
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        list(pool.map(lambda u: vote(u, "down"), voters[:100]))
+        list(pool.map(lambda u: vote(u, "up"), voters[100:150]))
+
+    data = client.post(f"/suggestions/{suggestion_id}/vote?vote_type=up&user_id={voters[-1]}").json()
+    # voters[-1] just toggled off: 300 - 100 switched - 50 off - 1 = 149 up
+    assert data["upvotes"] == 149
+    assert data["downvotes"] == 100
+
+    db = SessionLocal()
+    try:
+        ups = db.query(models.Vote).filter_by(suggestion_id=suggestion_id, vote_type="up").count()
+        downs = db.query(models.Vote).filter_by(suggestion_id=suggestion_id, vote_type="down").count()
+    finally:
+        db.close()
+    assert (ups, downs) == (149, 100)
+
+def test_leaderboard_keyset_pagination():
+    ids = [client.post("/suggestions", json={"text": f"Rank {i}"}).json()["id"] for i in range(5)]
+    for i, sid in enumerate(ids):
+        for _ in range(i):
+            client.post(f"/suggestions/{sid}/vote?vote_type=up&user_id={uuid.uuid4()}")
+
+    seen = []
+    after = {}
+    while True:
+        page = client.get("/suggestions", params={"limit": 2, **after}).json()
+        if not page:
+            break
+        seen.extend(page)
+        after = {"after_score": page[-1]["score"], "after_id": page[-1]["id"]}
+
+    scores = [s["score"] for s in seen]
+    assert scores == sorted(scores, reverse=True)
+    assert len({s["id"] for s in seen}) == len(seen)
+    assert set(ids) <= {s["id"] for s in seen}
+
 if __name__ == "__main__":
     try:
         test_voting_flow()
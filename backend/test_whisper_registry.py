@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from utils.whisper_registry import WhisperRegistry, resolve
+
+
+class Loader:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, name, compute_type):
+        self.calls.append((name, compute_type))
+        time.sleep(self.delay)
+        return f"model:{name}:{compute_type}"
+
+
+def _registry(budget_mb=1000, **kw):
+    loader = Loader(**kw)
+    reg = WhisperRegistry(loader, budget_mb=budget_mb, idle_sec=60)
+    return reg, loader
+
+
+def test_resolve_tiers_and_rejects_unknown():
+    assert resolve("base", "int8") == ("base.en", "int8")
+    assert resolve("small.en", "float32") == ("small.en", "float32")
+    with pytest.raises(ValueError):
+        resolve("gigantic", "int8")
+    with pytest.raises(ValueError):
+        resolve("tiny", "int3")
+
+
+def test_lazy_load_once_under_concurrency():
+    reg, loader = _registry(delay=0.05)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(reg.get("base.en", "int8"))) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert loader.calls == [("base.en", "int8")]
+    assert set(out) == {"model:base.en:int8"}
+    assert reg.stats()["loaded"][0]["load_sec"] >= 0.05
+
+
+def test_lru_eviction_under_budget_skips_pinned_and_leased():
+    reg, loader = _registry(budget_mb=800)   # estimates: tiny 120, base 200, small 550
+    reg.get("tiny.en", "int8", pin=True)
+    reg.get("base.en", "int8")
+    with reg.lease("base.en", "int8"):
+        reg.get("small.en", "int8")           # 870 MB > budget, but base is in use
+        assert {m["model"] for m in reg.stats()["loaded"]} == {"tiny.en", "base.en", "small.en"}
+    reg.get("small.en", "float32")            # now base (LRU, unpinned, idle) goes first
+    loaded = {(m["model"], m["compute_type"]) for m in reg.stats()["loaded"]}
+    assert ("tiny.en", "int8") in loaded and ("base.en", "int8") not in loaded
+    assert reg.stats()["used_mb"] <= 800 + 550   # over only by what can't be evicted
+
+
+def test_idle_models_are_evicted_but_pinned_stay():
+    reg, _ = _registry()
+    reg.get("tiny.en", "int8", pin=True)
+    reg.get("base.en", "int8")
+    evicted = reg.evict_idle(now=time.monotonic() + 120)
+    assert evicted == [("base.en", "int8")]
+    assert [m["model"] for m in reg.stats()["loaded"]] == ["tiny.en"]
+
+
+def test_failed_load_is_not_cached():
+    calls = []
+
+    def flaky(name, compute_type):
+        calls.append(name)
+        if len(calls) == 1:
+            raise OSError("download failed")
+        return "ok"
+
+    reg = WhisperRegistry(flaky, budget_mb=1000)
+    with pytest.raises(RuntimeError):
+        reg.get("base.en", "int8")
+    assert reg.get("base.en", "int8") == "ok"
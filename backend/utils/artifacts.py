@@ -0,0 +1,212 @@
+# backend/utils/artifacts.py
+"""
+Generated files kept for a while under a stable URL, so a dropped download is
+resumed (or simply repeated) instead of converting again.
+
+put() moves a finished output into ARTIFACT_DIR as <id>.bin with a JSON
+sidecar, hashing it on the way: the SHA-256 is the strong ETag. Outputs of a
+compressible type (text, JSON, XML, NDJSON) also get an <id>.gz, written once
+here and kept only if it saves at least 10%, so serving them never compresses
+on the fly. Already-compressed containers (PDF, ZIP, DOCX) are stored as is.
+
+Artifacts expire ARTIFACT_TTL_SEC after creation, and the store holds at most
+ARTIFACT_MAX_MB / ARTIFACT_MAX_ENTRIES: put() drops the oldest artifacts first
+once either is exceeded (a per-process index of the sidecars, rebuilt from disk
+on first use, like DiskCache's). routers/artifacts.py serves
+them with Range / If-Range (Starlette's FileResponse, which also uses the
+server's zero-copy pathsend extension when it has one), conditional GETs and
+the gzip variant when the client accepts it.
+"""
+import gzip
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import threading
+import time
+from contextlib import nullcontext
+from typing import Optional
+from urllib.parse import quote
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "cache/artifacts")
+ARTIFACT_TTL_SEC = float(os.getenv("ARTIFACT_TTL_SEC", "3600"))
+ARTIFACT_GZIP_MIN_BYTES = int(os.getenv("ARTIFACT_GZIP_MIN_BYTES", "1024"))
+ARTIFACT_MAX_MB = int(os.getenv("ARTIFACT_MAX_MB", "2048"))
+ARTIFACT_MAX_ENTRIES = int(os.getenv("ARTIFACT_MAX_ENTRIES", "10000"))
+
+_COMPRESSIBLE = ("text/", "application/json", "application/xml", "application/x-ndjson", "application/javascript")
+
+
+class ArtifactError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def compressible(media_type: str) -> bool:
+    media_type = media_type.split(";")[0].strip().lower()
+    return media_type.startswith(_COMPRESSIBLE) or media_type.endswith(("+json", "+xml"))
+
+
+class ArtifactStore:
+    def __init__(self, directory: str = ARTIFACT_DIR, ttl: float = ARTIFACT_TTL_SEC,
+                 max_bytes: int = ARTIFACT_MAX_MB * 1024 * 1024, max_entries: int = ARTIFACT_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes      # 0 = unbounded
+        self.max_entries = max_entries  # 0 = unbounded
+        self._lock = threading.Lock()
+        self._index: Optional[dict] = None  # id -> [bytes on disk, created_at]
+        self._bytes = 0
+
+    def _path(self, artifact_id: str, ext: str) -> str:
+        if len(artifact_id) != 32 or not all(c in "0123456789abcdef" for c in artifact_id):
+            raise ArtifactError(404, "Unknown artifact")
+        return os.path.join(self.directory, f"{artifact_id}.{ext}")
+
+    @staticmethod
+    def _footprint(meta: dict) -> int:
+        return meta["size"] + (meta["gzip_size"] or 0)
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index, self._bytes = {}, 0
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                self._index[meta["id"]] = [self._footprint(meta), meta["created_at"]]
+            except (OSError, ValueError, KeyError):
+                continue
+            self._bytes += self._index[meta["id"]][0]
+
+    def _forget(self, artifact_id: str):
+        if self._index is not None:
+            entry = self._index.pop(artifact_id, None)
+            if entry:
+                self._bytes -= entry[0]
+
+    def _evict(self, keep: str):
+        over = lambda: (  # noqa: E731
+            (self.max_bytes and self._bytes > self.max_bytes)
+            or (self.max_entries and len(self._index) > self.max_entries)
+        )
+        if not over():
+            return
+        for artifact_id, _ in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            if artifact_id == keep:   # about to be served
+                continue
+            self._remove(artifact_id)
+            self._forget(artifact_id)
+            if not over():
+                break
+
+    def put(self, path: str, filename: str, media_type: str, ttl: Optional[float] = None) -> dict:
+        """Move `path` into the store; returns the artifact's metadata (see url())."""
+        os.makedirs(self.directory, exist_ok=True)
+        artifact_id = secrets.token_hex(16)
+        bin_path, gz_path = self._path(artifact_id, "bin"), self._path(artifact_id, "gz")
+        shutil.move(path, bin_path)
+
+        digest = hashlib.sha256()
+        size = os.path.getsize(bin_path)
+        gz = compressible(media_type) and size >= ARTIFACT_GZIP_MIN_BYTES
+        with open(bin_path, "rb") as src, (gzip.open(gz_path, "wb", compresslevel=6) if gz else nullcontext()) as out:
+            while block := src.read(1024 * 1024):
+                digest.update(block)
+                if out is not None:
+                    out.write(block)
+        gz_size = os.path.getsize(gz_path) if gz else None
+        if gz and gz_size > size * 0.9:
+            os.remove(gz_path)
+            gz_size = None
+
+        now = time.time()
+        meta = {
+            "id": artifact_id,
+            "filename": os.path.basename(filename),
+            "media_type": media_type,
+            "size": size,
+            "gzip_size": gz_size,
+            "sha256": digest.hexdigest(),
+            "created_at": now,
+            "expires_at": now + (self.ttl if ttl is None else ttl),
+        }
+        with open(self._path(artifact_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with self._lock:
+            self._load_index()   # a first load already reads this sidecar
+            self._forget(artifact_id)
+            self._index[artifact_id] = [self._footprint(meta), now]
+            self._bytes += self._footprint(meta)
+            self._evict(keep=artifact_id)
+        return meta
+
+    def put_bytes(self, data: bytes, filename: str, media_type: str, ttl: Optional[float] = None) -> dict:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = os.path.join(self.directory, f"{secrets.token_hex(8)}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self.put(tmp, filename, media_type, ttl)
+
+    def get(self, artifact_id: str) -> dict:
+        try:
+            with open(self._path(artifact_id, "json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ArtifactError(404, "Unknown artifact")
+        if meta["expires_at"] < time.time():
+            self.delete(artifact_id)
+            raise ArtifactError(410, "Artifact expired; run the conversion again")
+        return meta
+
+    def file(self, meta: dict, encoding: Optional[str] = None) -> str:
+        return self._path(meta["id"], "gz" if encoding == "gzip" else "bin")
+
+    @staticmethod
+    def url(meta: dict) -> str:
+        return f"/artifacts/{meta['id']}/{quote(meta['filename'])}"
+
+    def delete(self, artifact_id: str):
+        self._remove(artifact_id)
+        with self._lock:
+            self._forget(artifact_id)
+
+    def _remove(self, artifact_id: str):
+        for ext in ("bin", "gz", "json"):
+            try:
+                os.remove(self._path(artifact_id, ext))
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp") and now - entry.stat().st_mtime > 3600:
+                os.remove(entry.path)
+            elif entry.name.endswith(".json"):
+                try:
+                    with open(entry.path, encoding="utf-8") as f:
+                        expired = json.load(f)["expires_at"] < now
+                except (OSError, ValueError, KeyError):
+                    expired = True
+                if expired:
+                    try:
+                        self.delete(entry.name[:-5])
+                    except ArtifactError:   # not one of ours
+                        continue
+                    removed += 1
+        return removed
+
+
+artifacts = ArtifactStore()
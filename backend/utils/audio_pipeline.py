@@ -0,0 +1,271 @@
+# backend/utils/audio_pipeline.py
+"""
+Streaming audio decode: any upload (video or audio) -> ffmpeg -> 16 kHz mono
+float32 NumPy chunks, without writing a WAV (or the decoded audio) to disk.
+
+Memory is bounded by one chunk (CHUNK_SECONDS * 16000 * 4 bytes) no matter
+how long the recording is. Chunks handed to Whisper end at the quietest 30 ms
+in their last ASR_CUT_SEARCH_SECONDS (iter_speech_chunks), with the remainder
+carried into the next chunk, so a word is not split between two chunks.
+
+transcribe_parallel is the long-audio mode: a VAD pass per chunk finds speech,
+silence is dropped, the speech slices are concatenated into <=30 s windows
+(Whisper's native context) and the windows are decoded concurrently by a
+WhisperModel built with num_workers > 1. Window timestamps are mapped back to
+the recording through each window's slice offsets, and segments are merged in
+timestamp order.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+from bisect import bisect_left, bisect_right
+import stat
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+
+from utils.lazy_imports import lazy
+
+np = lazy("numpy", "asr")
+
+SAMPLE_RATE = 16000
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+CHUNK_SECONDS = float(os.getenv("ASR_CHUNK_SECONDS", "300"))
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", "1"))
+WINDOW_SECONDS = float(os.getenv("ASR_WINDOW_SECONDS", "30"))
+VAD_MIN_SILENCE_MS = int(os.getenv("ASR_VAD_MIN_SILENCE_MS", "500"))
+CUT_SEARCH_SECONDS = float(os.getenv("ASR_CUT_SEARCH_SECONDS", "10"))
+_CUT_FRAME = SAMPLE_RATE * 30 // 1000
+_COPY_BLOCK = 1024 * 1024
+
+
+class AudioDecodeError(RuntimeError):
+    pass
+
+
+def _regular_fd(source) -> int:
+    """fd of a real (seekable) file behind a file object, else -1."""
+    try:
+        fd = source.fileno()
+        return fd if stat.S_ISREG(os.fstat(fd).st_mode) else -1
+    except (AttributeError, OSError, ValueError):
+        return -1
+
+
+def _feed(src: BinaryIO, dst):
+    try:
+        while block := src.read(_COPY_BLOCK):
+            dst.write(block)
+    except (BrokenPipeError, ValueError):
+        pass  # ffmpeg stopped reading (error or we closed it)
+    finally:
+        try:
+            dst.close()
+        except OSError:
+            pass
+
+
+def iter_pcm_chunks(source: Union[str, BinaryIO, np.ndarray], chunk_seconds: float = CHUNK_SECONDS) -> Iterator[np.ndarray]:
+    """
+    Yield float32 mono 16 kHz chunks of `chunk_seconds` (last one shorter).
+
+    `source` is a path or a binary file object. File objects backed by a real file
+    (e.g. a rolled-over UploadFile) are handed to ffmpeg as /dev/fd/N so it can seek
+    (MP4 with the index at the end); anything else is streamed through stdin.
+
+    An in-memory float32 array (already 16 kHz mono) is just sliced.
+    """
+    if isinstance(source, np.ndarray):
+        step = int(chunk_seconds * SAMPLE_RATE)
+        for i in range(0, len(source), step):
+            yield source[i:i + step]
+        return
+
+    if shutil.which(FFMPEG) is None:
+        raise AudioDecodeError("ffmpeg is not installed")
+
+    pass_fds, feeder_src = (), None
+    if isinstance(source, (str, os.PathLike)):
+        input_arg = os.fspath(source)
+    else:
+        fd = _regular_fd(source)
+        if fd >= 0 and os.path.exists("/dev/fd"):
+            source.seek(0)
+            input_arg, pass_fds = f"/dev/fd/{fd}", (fd,)
+        else:
+            input_arg, feeder_src = "pipe:0", source
+
+    cmd = [
+        FFMPEG, "-hide_banner", "-loglevel", "error", "-i", input_arg,
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-acodec", "pcm_s16le", "pipe:1",
+    ]
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if feeder_src is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        pass_fds=pass_fds,
+    )
+    feeder = None
+    if feeder_src is not None:
+        feeder = threading.Thread(target=_feed, args=(feeder_src, proc.stdin), daemon=True)
+        feeder.start()
+
+    # drain stderr concurrently so a chatty ffmpeg can't block on a full pipe
+    err_chunks = []
+    err_reader = threading.Thread(target=lambda: err_chunks.append(proc.stderr.read()), daemon=True)
+    err_reader.start()
+
+    chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2
+    completed = False
+    try:
+        while True:
+            buf = proc.stdout.read(chunk_bytes)
+            if not buf:
+                break
+            if len(buf) % 2:
+                buf = buf[:-1]
+            yield np.frombuffer(buf, dtype=np.int16).astype(np.float32) / 32768.0
+        completed = True
+    finally:
+        if not completed and proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        rc = proc.wait()
+        err_reader.join(timeout=5)
+        if feeder is not None:
+            feeder.join(timeout=5)
+    if rc != 0:
+        err = b"".join(c for c in err_chunks if c).decode("utf-8", "replace").strip()
+        raise AudioDecodeError(f"ffmpeg failed ({rc}): {err[-500:]}")
+
+
+def quietest_cut(audio: np.ndarray, search_seconds: float = CUT_SEARCH_SECONDS) -> int:
+    """Sample index just after the quietest 30 ms frame in the last `search_seconds` (latest on ties)."""
+    search = min(int(search_seconds * SAMPLE_RATE), len(audio) // 2) // _CUT_FRAME * _CUT_FRAME
+    if search < _CUT_FRAME:
+        return len(audio)
+    tail = audio[len(audio) - search:].reshape(-1, _CUT_FRAME)
+    energy = np.square(tail).mean(axis=1)
+    frame = len(energy) - 1 - int(np.argmin(energy[::-1]))
+    return len(audio) - search + (frame + 1) * _CUT_FRAME
+
+
+def iter_speech_chunks(source, chunk_seconds: float = CHUNK_SECONDS,
+                       search_seconds: float = CUT_SEARCH_SECONDS) -> Iterator[Tuple[np.ndarray, float]]:
+    """iter_pcm_chunks, re-cut at a pause: yields (audio, start seconds); the chunks tile the recording."""
+    full = int(chunk_seconds * SAMPLE_RATE)
+    carry = np.zeros(0, dtype=np.float32)
+    offset = 0
+    for chunk in iter_pcm_chunks(source, chunk_seconds):
+        audio = np.concatenate([carry, chunk]) if len(carry) else chunk
+        cut = quietest_cut(audio, search_seconds) if len(chunk) >= full else len(audio)   # short chunk = the last
+        if cut:
+            yield audio[:cut], offset / SAMPLE_RATE
+        carry, offset = audio[cut:], offset + cut
+    if len(carry):
+        yield carry, offset / SAMPLE_RATE
+
+
+def transcribe_stream(model, source, beam_size: int = 1, vad_filter: bool = True,
+                      chunk_seconds: float = CHUNK_SECONDS) -> dict:
+    """Decode `source` chunk by chunk straight into faster-whisper; timestamps are absolute."""
+    segments, texts = [], []
+    duration = 0.0
+    for audio, offset in iter_speech_chunks(source, chunk_seconds):
+        segs, _ = model.transcribe(audio, beam_size=beam_size, vad_filter=vad_filter)
+        for seg in segs:
+            segments.append({"start": round(offset + seg.start, 2), "end": round(offset + seg.end, 2), "text": seg.text})
+            texts.append(seg.text)
+        duration = offset + len(audio) / SAMPLE_RATE
+    return {"text": "".join(texts).strip(), "segments": segments, "duration": round(duration, 2)}
+
+
+# ---------------- long-audio mode: VAD + parallel windows ----------------
+
+def speech_regions(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """Silero VAD (bundled with faster-whisper) -> [(start_sample, end_sample)]."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    opts = VadOptions(min_silence_duration_ms=VAD_MIN_SILENCE_MS, max_speech_duration_s=WINDOW_SECONDS)
+    return [(r["start"], r["end"]) for r in get_speech_timestamps(audio, opts)]
+
+
+def pack_regions(regions: List[Tuple[int, int]], window_seconds: float = WINDOW_SECONDS) -> List[List[Tuple[int, int]]]:
+    """Greedily group neighbouring speech regions into windows of at most `window_seconds` of speech."""
+    limit = int(window_seconds * SAMPLE_RATE)
+    windows, used = [], 0
+    for start, end in regions:
+        if windows and used + (end - start) <= limit:
+            windows[-1].append((start, end))
+            used += end - start
+        else:
+            windows.append([(start, end)])
+            used = end - start
+    return windows
+
+
+class _WindowClock:
+    """Maps a time inside a concatenated window back to the recording (seconds)."""
+
+    def __init__(self, pieces: List[Tuple[int, int]], offset: float):
+        self.starts, self.local, self.offset = [s for s, _ in pieces], [], offset
+        pos = 0
+        for s, e in pieces:
+            self.local.append(pos)
+            pos += e - s
+
+    def at(self, t: float, end: bool = False) -> float:
+        x = t * SAMPLE_RATE
+        # an end exactly on a seam belongs to the slice before it, a start to the one after
+        i = max(0, (bisect_left(self.local, x) if end else bisect_right(self.local, x)) - 1)
+        return self.offset + (self.starts[i] + x - self.local[i]) / SAMPLE_RATE
+
+
+def transcribe_parallel(model, source, workers: int = ASR_WORKERS, beam_size: int = 1,
+                        chunk_seconds: float = CHUNK_SECONDS,
+                        vad: Optional[Callable[[np.ndarray], List[Tuple[int, int]]]] = None,
+                        on_window: Optional[Callable[[float, float], None]] = None) -> dict:
+    """
+    Same result shape as transcribe_stream, plus "speech" (seconds actually decoded: the
+    VAD regions only, the silence between them is never sent to the model).
+
+    Decoding of the next PCM chunk overlaps with transcription of the current one;
+    at most 2 * workers windows are queued so memory stays bounded.
+    """
+    workers = max(1, workers)
+    vad = vad or speech_regions
+    pending, results = [], []
+    duration = 0.0
+    speech = 0.0
+
+    def run(audio: np.ndarray, pieces: List[Tuple[int, int]], offset: float):
+        window = np.concatenate([audio[s:e] for s, e in pieces]) if len(pieces) > 1 else audio[pieces[0][0]:pieces[0][1]]
+        clock = _WindowClock(pieces, offset)
+        segs, _ = model.transcribe(window, beam_size=beam_size, vad_filter=False)
+        out = [(clock.at(seg.start), clock.at(seg.end, end=True), seg.text) for seg in segs]
+        if on_window:
+            on_window(offset + pieces[0][0] / SAMPLE_RATE, offset + pieces[-1][1] / SAMPLE_RATE)
+        return out
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asr") as pool:
+        for audio, offset in iter_speech_chunks(source, chunk_seconds):
+            for pieces in pack_regions(vad(audio)):
+                while len(pending) >= 2 * workers:
+                    results.extend(pending.pop(0).result())
+                speech += sum(e - s for s, e in pieces) / SAMPLE_RATE
+                pending.append(pool.submit(run, audio, pieces, offset))
+            duration = offset + len(audio) / SAMPLE_RATE
+        for fut in pending:
+            results.extend(fut.result())
+
+    results.sort(key=lambda r: r[0])
+    segments = [{"start": round(s, 2), "end": round(e, 2), "text": t} for s, e, t in results]
+    return {
+        "text": "".join(t for _, _, t in results).strip(),
+        "segments": segments,
+        "duration": round(duration, 2),
+        "speech": round(speech, 2),
+    }
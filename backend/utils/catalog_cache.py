@@ -0,0 +1,90 @@
+# backend/utils/catalog_cache.py
+"""
+Process-local snapshot of the applications catalog.
+
+The catalog only changes through POST /applications (or seed.py), so the hot
+GET /applications path serves pre-serialised JSON (+ gzip) from memory and
+only goes to the DB after an invalidate() or when CATALOG_TTL_SEC expires
+(the TTL lets other processes/workers pick up seed.py runs).
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from typing import Callable, NamedTuple, Optional
+
+CATALOG_TTL_SEC = float(os.getenv("CATALOG_TTL_SEC", "300"))  # 0 = never expire
+MAX_CACHED_PAGES = 256
+
+
+class CatalogPage:
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+        self.etag = etag
+
+
+class _Snapshot(NamedTuple):
+    rows: list
+    ids: list
+    version: int
+    digest: str
+    loaded_at: float
+
+
+class CatalogCache:
+    def __init__(self, loader: Callable[[], list[dict]], ttl: float = CATALOG_TTL_SEC):
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._snap: Optional[_Snapshot] = None
+        self._version = 0
+        self._pages: dict[tuple, CatalogPage] = {}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._snap = None
+
+    def _fresh(self, snap: Optional[_Snapshot]) -> bool:
+        return snap is not None and (not self._ttl or time.monotonic() - snap.loaded_at < self._ttl)
+
+    def snapshot(self) -> _Snapshot:
+        snap = self._snap
+        if self._fresh(snap):
+            return snap
+        with self._lock:
+            if self._fresh(self._snap):
+                return self._snap
+            rows = sorted(self._loader(), key=lambda r: r["id"])
+            digest = hashlib.sha1(json.dumps(rows, separators=(",", ":")).encode()).hexdigest()[:16]
+            prev = self._snap
+            if prev is None or prev.digest != digest:
+                self._version += 1
+                self._pages = {}
+            self._snap = _Snapshot(rows, [r["id"] for r in rows], self._version, digest, time.monotonic())
+            return self._snap
+
+    def page(self, after_id: int = 0, limit: int = 100, skip: int = 0) -> CatalogPage:
+        snap = self.snapshot()
+        key = (snap.version, after_id, limit, skip)
+        cached = self._pages.get(key)
+        if cached is not None:
+            return cached
+
+        start = bisect_right(snap.ids, after_id) + skip
+        body = json.dumps(snap.rows[start:start + limit], separators=(",", ":")).encode()
+        page = CatalogPage(body, f'W/"catalog-{snap.digest}-{after_id}-{limit}-{skip}"')
+
+        if len(self._pages) >= MAX_CACHED_PAGES:
+            self._pages = {}
+        self._pages[key] = page
+        return page
@@ -0,0 +1,146 @@
+# backend/utils/disk_cache.py
+"""
+Small JSON-on-disk cache with TTL and an LRU size budget.
+
+One file per key under <dir>/<key[:2]>/<key>.json. Both timestamps live on the
+file and are set explicitly with os.utime, so they survive a restart: mtime is
+the write time (what the TTL counts from) and atime the last access (bumped on
+every hit), so eviction drops the least recently used entries first once
+max_bytes / max_entries is exceeded. BlobCache stores raw bytes (<key>.bin)
+the same way.
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+class DiskCache:
+    suffix = ".json"
+
+    def __init__(self, directory: str, ttl: float = 0, max_bytes: int = 0, max_entries: int = 0):
+        self.directory = directory
+        self.ttl = ttl                  # seconds since last write; 0 = never expires
+        self.max_bytes = max_bytes      # 0 = unbounded
+        self.max_entries = max_entries  # 0 = unbounded
+        self._lock = threading.Lock()
+        self._index: Optional[dict] = None  # key -> [size, atime, written_at]
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index, self._bytes = {}, 0
+        if not os.path.isdir(self.directory):
+            return
+        for root, _, files in os.walk(self.directory):
+            for f in files:
+                if not f.endswith(self.suffix):
+                    continue
+                st = os.stat(os.path.join(root, f))
+                self._index[f[:-len(self.suffix)]] = [st.st_size, st.st_atime, st.st_mtime]
+                self._bytes += st.st_size
+
+    def _drop(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry:
+            self._bytes -= entry[0]
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(key)
+            now = time.time()
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.ttl and now - entry[2] > self.ttl:
+                self._drop(key)
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = self._decode(f.read())
+                os.utime(self._path(key), (now, entry[2]))   # mtime stays the write time
+            except (OSError, ValueError):
+                self._drop(key)
+                self.misses += 1
+                return None
+            entry[1] = now
+            self.hits += 1
+            return value
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _decode(data: bytes):
+        return json.loads(data)
+
+    def set(self, key: str, value: dict):
+        data = self._encode(value)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        now = time.time()
+        os.utime(tmp, (now, now))
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._load_index()
+            old = self._index.get(key)
+            if old:
+                self._bytes -= old[0]
+            self._index[key] = [len(data), now, now]
+            self._bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        over = lambda: (  # noqa: E731
+            (self.max_bytes and self._bytes > self.max_bytes)
+            or (self.max_entries and len(self._index) > self.max_entries)
+        )
+        if not over():
+            return
+        for key, _ in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            self._drop(key)
+            if not over():
+                break
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            return {"entries": len(self._index), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+class BlobCache(DiskCache):
+    """Same cache for raw bytes (rendered images etc.)."""
+
+    suffix = ".bin"
+
+    @staticmethod
+    def _encode(value: bytes) -> bytes:
+        return value
+
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        return data
@@ -0,0 +1,365 @@
+# backend/utils/doc_sessions.py
+"""
+Upload a PDF once, run many operations on it.
+
+A document is stored content-addressed under DOC_DIR/<sha256>.pdf (the sha256
+is the doc_id, so uploading the same file twice is free). Because two callers
+can share one document, <sha256>.owners.json records who added it, and
+delete() only drops the caller's own reference: the file goes once the last
+owner lets go (or when it expires). Open documents live
+in an LRU of DocSession objects: the file is mmap'd once and the PyPDF2 reader,
+the PyMuPDF document and extracted page text are built on first use and reused
+by every later call. Entries in use (leased) are never evicted; evicted or
+never-opened documents are reopened from disk on demand, and the files expire
+DOC_TTL_SEC after their last use.
+
+Readers are not thread-safe, so each session serialises access to them with
+its own lock; different documents run in parallel. A session is only closed
+(and a deleted document's file only removed) once no lease holds it.
+"""
+import hashlib
+import io
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from typing import BinaryIO, List, Optional
+
+from utils.lazy_imports import lazy
+from utils.page_spec import PageSelection, PageSpecError, select
+
+PyPDF2 = lazy("PyPDF2", "pdf")
+fitz = lazy("fitz", "pdf")  # PyMuPDF
+
+DOC_DIR = os.getenv("DOC_DIR", "cache/docs")
+DOC_CACHE_SIZE = int(os.getenv("DOC_CACHE_SIZE", "16"))            # open documents kept parsed
+DOC_CACHE_MAX_MB = int(os.getenv("DOC_CACHE_MAX_MB", "512"))       # ... and their total file size
+DOC_TTL_SEC = float(os.getenv("DOC_TTL_SEC", str(6 * 3600)))
+
+
+class DocumentError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def select_pages(spec: Optional[str], count: int) -> PageSelection:
+    """utils/page_spec.py selection, as a 400 DocumentError when it's invalid."""
+    try:
+        return select(spec, count)
+    except PageSpecError as e:
+        raise DocumentError(400, str(e))
+
+
+class DocSession:
+    def __init__(self, doc_id: str, path: str):
+        self.doc_id = doc_id
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = open(path, "rb")
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.lock = threading.RLock()
+        self.refs = 0
+        self.detached = False   # out of the store's LRU; closed by the last lease
+        self.last_used = time.monotonic()
+        self._reader = None
+        self._fitz = None
+        self._text: dict = {}
+
+    @property
+    def reader(self):
+        """PyPDF2 reader over the mmap (call with self.lock held)."""
+        if self._reader is None:
+            self._reader = PyPDF2.PdfReader(self.buffer)
+        return self._reader
+
+    @property
+    def fitz_doc(self):
+        if self._fitz is None:
+            self._fitz = fitz.open(self.path)
+        return self._fitz
+
+    def fresh_reader(self):
+        """A reader of its own, for operations that mutate it (decrypt)."""
+        with self.lock:
+            return PyPDF2.PdfReader(mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def page_text(self, index: int) -> str:
+        with self.lock:
+            text = self._text.get(index)
+            if text is None:
+                text = self._text[index] = self.reader.pages[index].extract_text() or ""
+            return text
+
+    def info(self) -> dict:
+        with self.lock:
+            reader = self.reader
+            encrypted = reader.is_encrypted
+            if encrypted and not reader.decrypt(""):
+                pages = None    # needs the user password; unlock it first
+            else:
+                pages = len(reader.pages)
+            return {"doc_id": self.doc_id, "size": self.size, "pages": pages, "encrypted": encrypted}
+
+    def close(self):
+        with self.lock:
+            if self._fitz is not None:
+                self._fitz.close()
+            self._reader = self._fitz = None
+            self._text.clear()
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass  # a reader still holds a view; the mapping goes when it does
+            self._file.close()
+
+
+class DocumentStore:
+    def __init__(self, directory: str = DOC_DIR, max_open: int = DOC_CACHE_SIZE,
+                 max_bytes: int = DOC_CACHE_MAX_MB * 1024 * 1024, ttl: float = DOC_TTL_SEC):
+        self.directory = directory
+        self.max_open = max_open
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._open: "OrderedDict[str, DocSession]" = OrderedDict()
+        self._doomed: set = set()   # deleted while leased: file removed when the last lease ends
+        self.opens = 0
+        self.hits = 0
+
+    def _path(self, doc_id: str) -> str:
+        if len(doc_id) != 64 or not all(c in "0123456789abcdef" for c in doc_id):
+            raise DocumentError(404, "Unknown doc_id")
+        return os.path.join(self.directory, f"{doc_id}.pdf")
+
+    def _owners_path(self, doc_id: str) -> str:
+        return os.path.join(self.directory, f"{doc_id}.owners.json")
+
+    def _owners(self, doc_id: str) -> set:
+        try:
+            with open(self._owners_path(doc_id), encoding="utf-8") as f:
+                return set(json.load(f))
+        except (OSError, ValueError):
+            return set()
+
+    def _write_owners(self, doc_id: str, owners: set):
+        path = self._owners_path(doc_id)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sorted(owners), f)
+        os.replace(tmp, path)
+
+    def _unlink(self, doc_id: str):
+        for path in (self._path(doc_id), self._owners_path(doc_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def add(self, source: BinaryIO, owner: str = "") -> dict:
+        """Store an uploaded PDF (stream) for `owner` (a user or client key), parse it once, return its info."""
+        os.makedirs(self.directory, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+            while block := source.read(1024 * 1024):
+                digest.update(block)
+                tmp.write(block)
+        doc_id = digest.hexdigest()
+        path = self._path(doc_id)
+        with self._lock:
+            if os.path.exists(path):
+                os.remove(tmp.name)
+            else:
+                os.replace(tmp.name, path)
+            self._doomed.discard(doc_id)   # added again before a pending delete finished: keep it
+            self._write_owners(doc_id, self._owners(doc_id) | {owner})
+        try:
+            with self.lease(doc_id) as doc:
+                return doc.info()
+        except DocumentError:
+            raise
+        except Exception as e:
+            try:
+                self.delete(doc_id, owner)
+            except DocumentError:
+                pass
+            raise DocumentError(400, f"Not a readable PDF: {e}")
+
+    @contextmanager
+    def lease(self, doc_id: str):
+        """Open (or reuse) the session; it can't be evicted while the block runs."""
+        path = self._path(doc_id)
+        with self._lock:
+            if doc_id in self._doomed:
+                raise DocumentError(404, "Unknown doc_id")
+            doc = self._open.get(doc_id)
+            if doc is not None:
+                self._open.move_to_end(doc_id)
+                self.hits += 1
+            else:
+                if not os.path.exists(path):
+                    raise DocumentError(404, "Unknown doc_id")
+                doc = self._open[doc_id] = DocSession(doc_id, path)
+                self.opens += 1
+                os.utime(path)   # file TTL counts from last use
+            doc.refs += 1
+            self._evict()
+        try:
+            yield doc
+        finally:
+            with self._lock:
+                doc.refs -= 1
+                doc.last_used = time.monotonic()
+                if doc.detached and doc.refs == 0:
+                    doc.close()
+                    if doc_id in self._doomed:
+                        self._doomed.discard(doc_id)
+                        self._unlink(doc_id)
+                self._evict()
+
+    def _evict(self):
+        used = sum(d.size for d in self._open.values())
+        for doc_id, doc in list(self._open.items()):   # least recently used first
+            if len(self._open) <= self.max_open and used <= self.max_bytes:
+                break
+            if doc.refs == 0:
+                del self._open[doc_id]
+                used -= doc.size
+                doc.close()
+
+    def delete(self, doc_id: str, owner: str = ""):
+        """Drop `owner`'s reference; the document itself goes with the last one (after any running lease)."""
+        path = self._path(doc_id)
+        with self._lock:
+            owners = self._owners(doc_id)
+            if doc_id in self._doomed or owner not in owners or not os.path.exists(path):
+                raise DocumentError(404, "Unknown doc_id")
+            owners.discard(owner)
+            if owners:
+                self._write_owners(doc_id, owners)
+                return
+            doc = self._open.pop(doc_id, None)
+            if doc is not None and doc.refs > 0:
+                doc.detached = True          # closed and removed by the last lease (see lease())
+                self._doomed.add(doc_id)
+                self._write_owners(doc_id, set())
+                return
+            self._unlink(doc_id)
+        if doc is not None:
+            doc.close()
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Remove stored documents unused for longer than the TTL (open ones are kept)."""
+        now = time.time() if now is None else now
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for entry in os.scandir(self.directory):
+            stale = now - entry.stat().st_mtime > self.ttl
+            if entry.name.endswith(".tmp") and stale:
+                os.remove(entry.path)
+            elif entry.name.endswith(".pdf") and stale:
+                doc_id = entry.name[:-4]
+                with self._lock:
+                    if doc_id in self._open or doc_id in self._doomed:
+                        continue
+                    self._unlink(doc_id)
+                removed += 1
+            elif entry.name.endswith(".owners.json") and not os.path.exists(entry.path[:-12] + ".pdf"):
+                os.remove(entry.path)   # orphaned by a crash between the two removals
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"open": len(self._open), "max_open": self.max_open, "opens": self.opens, "hits": self.hits,
+                    "open_mb": round(sum(d.size for d in self._open.values()) / (1024 * 1024), 1)}
+
+
+
+documents = DocumentStore()
+
+
+# ---------------- operations (bytes out; callers run them in a worker thread) ----------------
+def _readable(doc: DocSession):
+    reader = doc.reader
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise DocumentError(400, "Document is encrypted; unlock it first")
+    return reader
+
+
+def _write(writer) -> bytes:
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def split(doc: DocSession, pages: Optional[str]) -> bytes:
+    with doc.lock:
+        reader = _readable(doc)
+        writer = PyPDF2.PdfWriter()
+        for i in select_pages(pages, len(reader.pages)):
+            writer.add_page(reader.pages[i])
+        return _write(writer)
+
+
+def lock(doc: DocSession, password: str, pages: Optional[str] = None) -> bytes:
+    with doc.lock:
+        reader = _readable(doc)
+        writer = PyPDF2.PdfWriter()
+        for i in select_pages(pages, len(reader.pages)):
+            writer.add_page(reader.pages[i])
+        writer.encrypt(password)
+        return _write(writer)
+
+
+def unlock(doc: DocSession, password: str) -> bytes:
+    reader = doc.fresh_reader()
+    if reader.is_encrypted and reader.decrypt(password) == 0:
+        raise DocumentError(400, "Wrong password or corrupted PDF")
+    writer = PyPDF2.PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    return _write(writer)
+
+
+def text(doc: DocSession, pages: Optional[str] = None) -> dict:
+    with doc.lock:
+        selected = select_pages(pages, len(_readable(doc).pages))
+        texts = [doc.page_text(i) for i in selected]
+    return {"text": "\n".join(texts).strip(), "pages": [{"page": i + 1, "text": t} for i, t in zip(selected, texts)]}
+
+
+def images(doc: DocSession, pages: Optional[str] = None, dpi: int = 72) -> bytes:
+    """ZIP of page_<n>.png."""
+    buf = io.BytesIO()
+    with doc.lock:
+        pdf = doc.fitz_doc
+        if pdf.needs_pass:
+            raise DocumentError(400, "Document is encrypted; unlock it first")
+        with zipfile.ZipFile(buf, "w") as zf:
+            for i in select_pages(pages, pdf.page_count):
+                pix = pdf.load_page(i).get_pixmap(dpi=dpi)
+                zf.writestr(f"page_{i + 1}.png", pix.tobytes("png"))
+    return buf.getvalue()
+
+
+def merge(store: DocumentStore, parts: List[tuple]) -> bytes:
+    """parts: [(doc_id, page selection)] in output order; the same doc may appear more than once."""
+    writer = PyPDF2.PdfWriter()
+    with ExitStack() as stack:
+        docs = {doc_id: stack.enter_context(store.lease(doc_id)) for doc_id, _ in parts}
+        # pages are read from the source mmaps while writing: hold every source's
+        # lock until then, taken in a fixed order so two merges can't deadlock
+        for doc_id in sorted(docs):
+            stack.enter_context(docs[doc_id].lock)
+        for doc_id, pages in parts:
+            reader = _readable(docs[doc_id])
+            for i in select_pages(pages, len(reader.pages)):
+                writer.add_page(reader.pages[i])
+        return _write(writer)
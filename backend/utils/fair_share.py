@@ -0,0 +1,366 @@
+# backend/utils/fair_share.py
+"""
+Fair-share admission for the heavy endpoints.
+
+Every request is put in a cost class by route (ROUTE_CLASSES): light, pdf,
+ocr, asr or llm. Admission then has two steps, both before the endpoint runs
+(and before a large body is read):
+
+1. token bucket per (class, caller): logged-in users are keyed by the JWT
+   subject, everyone else by client IP. An empty bucket is a 429 with
+   Retry-After. Buckets live in process memory, or with FAIR_SHARE_BACKEND=db
+   in the rate_buckets table (one atomic UPSERT per request, refilled on the
+   database clock) so all nodes share them.
+2. for classes with worker slots, a weighted round-robin queue across callers:
+   when every slot is busy, waiting requests are granted one caller at a time
+   (`weight` grants per turn; logged-in users get FAIR_USER_WEIGHT), not in
+   arrival order, and one caller never holds more than slots - 1 of them. A
+   batch of 200 conversions therefore delays an interactive request by at
+   most about one job, instead of queueing it behind the batch. Queues are
+   per node, like the worker pools they sit in front of.
+
+Limits are "class=rate/burst/slots" in FAIR_SHARE_LIMITS (rate in requests per
+second, slots 0 = no queue), e.g. FAIR_SHARE_LIMITS="ocr=0.2/5/1,asr=0.1/3/1".
+FAIR_SHARE=0 disables the middleware.
+
+Anonymous callers are keyed by scope["client"], so behind a reverse proxy the
+server must rewrite it from X-Forwarded-For, or every visitor shares the
+proxy's buckets. render.yaml starts uvicorn with --proxy-headers
+--forwarded-allow-ips='*' (or set FORWARDED_ALLOW_IPS); FAIR_TRUST_PROXY=1 is
+the fallback for servers that can't, and reads the header here instead.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+
+from utils import metrics
+
+FAIR_SHARE = os.getenv("FAIR_SHARE", "1") == "1"
+FAIR_SHARE_BACKEND = os.getenv("FAIR_SHARE_BACKEND", "memory")      # memory | db
+FAIR_USER_WEIGHT = int(os.getenv("FAIR_USER_WEIGHT", "2"))
+FAIR_MAX_WAITING = int(os.getenv("FAIR_MAX_WAITING", "20"))         # queued requests per caller and class
+FAIR_QUEUE_TIMEOUT_SEC = float(os.getenv("FAIR_QUEUE_TIMEOUT_SEC", "120"))
+FAIR_TRUST_PROXY = os.getenv("FAIR_TRUST_PROXY", "0") == "1"        # key anonymous callers by X-Forwarded-For
+
+# class: (tokens per second, burst, worker slots)
+DEFAULT_LIMITS = {
+    "light": (20.0, 100, 0),
+    "pdf": (2.0, 30, 4),
+    "ocr": (0.5, 10, 2),
+    "asr": (0.2, 5, 2),
+    "llm": (0.5, 10, 4),
+}
+
+# (method or None for any, path prefix, class); first match wins, default "light"
+ROUTE_CLASSES = [
+    (None, "/transcribe", "asr"),
+    (None, "/meeting-mom", "asr"),
+    (None, "/ai/mom-generator", "llm"),
+    (None, "/convert/pdf-to-word", "ocr"),     # layout analysis / rasterising: the slowest document tools
+    (None, "/convert/pdf-to-image", "ocr"),
+    (None, "/convert/", "pdf"),
+    ("POST", "/documents", "pdf"),             # GETs (info, page-picker thumbnails) stay light
+    ("POST", "/tasks", "pdf"),                 # enqueueing worker jobs; the kind is in the body, not seen here
+]
+
+rejected = metrics.REGISTRY.counter("fair_share_rejected_total", "Requests refused by admission control",
+                                    ("cost_class", "reason"))
+queue_wait = metrics.REGISTRY.histogram("fair_share_queue_wait_seconds", "Time spent waiting for a worker slot",
+                                        ("cost_class",))
+
+
+class FairShareError(Exception):
+    def __init__(self, status: int, detail: str, retry_after: float = 1):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def parse_limits(spec: str, base: dict = DEFAULT_LIMITS) -> Dict[str, Tuple[float, int, int]]:
+    limits = dict(base)
+    for item in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = item.partition("=")
+        rate, burst, slots = (value.split("/") + ["", ""])[:3]
+        old = limits.get(name.strip(), (1.0, 10, 0))
+        limits[name.strip()] = (float(rate or old[0]), int(burst or old[1]), int(slots or old[2]))
+    return limits
+
+
+def classify(method: str, path: str) -> str:
+    for want, prefix, cost_class in ROUTE_CLASSES:
+        if path.startswith(prefix) and (want is None or want == method):
+            return cost_class
+    return "light"
+
+
+# ---------------- token buckets ----------------
+class TokenBuckets:
+    """In-process buckets keyed by string; take() -> seconds until a token is available (0 = taken)."""
+
+    def __init__(self, max_keys: int = 50000):
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()   # key -> [tokens, updated]
+        self.max_keys = max_keys
+
+    def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                while len(self._buckets) > self.max_keys:   # oldest-touched callers are the fullest anyway
+                    self._buckets.popitem(last=False)
+            self._buckets.move_to_end(key)
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / rate if rate > 0 else 3600.0
+
+
+class SqlTokenBuckets:
+    """Same contract, state in the rate_buckets table so every node draws from one bucket per caller."""
+
+    def __init__(self, engine, fallback: Optional[TokenBuckets] = None):
+        self.engine = engine
+        self.fallback = fallback or TokenBuckets()
+        if engine.dialect.name == "postgresql":
+            now, least = "EXTRACT(EPOCH FROM clock_timestamp())", "LEAST"
+        else:
+            now, least = "((julianday('now') - 2440587.5) * 86400.0)", "MIN"
+        refill = f"{least}(:burst, rate_buckets.tokens + ({now} - rate_buckets.updated_at) * :rate)"
+        self._take_sql = (
+            f"INSERT INTO rate_buckets (bucket_key, tokens, updated_at) VALUES (:key, :burst - 1, {now}) "
+            f"ON CONFLICT (bucket_key) DO UPDATE SET tokens = {refill} - 1, updated_at = {now} "
+            f"WHERE {refill} >= 1 RETURNING tokens"
+        )
+        self._peek_sql = f"SELECT {refill} FROM rate_buckets WHERE bucket_key = :key"
+
+    def take(self, key: str, rate: float, burst: int, now: Optional[float] = None) -> float:
+        from sqlalchemy import text
+
+        params = {"key": key, "rate": rate, "burst": burst}
+        try:
+            with self.engine.begin() as conn:
+                if conn.execute(text(self._take_sql), params).first() is not None:
+                    return 0.0
+                tokens = conn.execute(text(self._peek_sql), params).scalar() or 0.0
+        except Exception as e:
+            print(f"[WARN] shared rate limit unavailable, using this node's buckets: {e}")
+            return self.fallback.take(key, rate, burst, now)
+        return (1 - tokens) / rate if rate > 0 else 3600.0
+
+
+# ---------------- weighted round-robin slots ----------------
+class FairQueue:
+    """`slots` concurrent holders; waiters are granted round-robin across keys, `weight` per turn.
+
+    Thread-safe and usable from several event loops (each waiter is resolved on its own loop).
+    """
+
+    def __init__(self, slots: int, max_waiting: int = FAIR_MAX_WAITING):
+        self.slots = slots
+        self.cap = max(1, slots - 1)         # per key, so one caller can't hold every slot
+        self.max_waiting = max_waiting
+        self._lock = threading.Lock()
+        self.busy = 0
+        self._active: Dict[str, int] = {}
+        self._waiting: Dict[str, deque] = {}
+        self._ring: deque = deque()          # keys with waiters, in service order
+        self._credit: Dict[str, int] = {}
+        self._weight: Dict[str, int] = {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"busy": self.busy, "waiting": sum(len(q) for q in self._waiting.values()),
+                    "callers_waiting": len(self._ring)}
+
+    def _grant(self, key: str):
+        self.busy += 1
+        self._active[key] = self._active.get(key, 0) + 1
+
+    def _next_waiter(self):
+        """Pop the next (key, waiter) in weighted round-robin order, or None."""
+        for _ in range(len(self._ring)):
+            key = self._ring[0]
+            queue = self._waiting[key]
+            while queue and queue[0].abandoned:     # timed out / disconnected
+                queue.popleft()
+            if not queue:
+                self._ring.popleft()
+                del self._waiting[key]
+                self._credit.pop(key, None)
+                if key not in self._active:
+                    self._weight.pop(key, None)
+                continue
+            if self._active.get(key, 0) >= self.cap:
+                self._ring.rotate(-1)
+                continue
+            waiter = queue.popleft()
+            self._credit[key] = self._credit.get(key, self._weight.get(key, 1)) - 1
+            if self._credit[key] <= 0 or not queue:
+                self._credit.pop(key, None)
+                self._ring.rotate(-1)
+            return key, waiter
+        return None
+
+    def _dispatch(self):
+        while self.busy < self.slots:
+            nxt = self._next_waiter()
+            if nxt is None:
+                return
+            key, waiter = nxt
+            self._grant(key)
+            waiter.granted = True     # decided here, under the lock; the future only wakes the task
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+    async def acquire(self, key: str, weight: int = 1, timeout: float = FAIR_QUEUE_TIMEOUT_SEC) -> float:
+        """Wait for a slot; returns seconds waited. FairShareError if the caller's queue is full or on timeout."""
+        with self._lock:
+            if self.busy < self.slots and self._active.get(key, 0) < self.cap and key not in self._waiting:
+                self._grant(key)
+                return 0.0
+            queue = self._waiting.get(key)
+            if queue is not None and len(queue) >= self.max_waiting:
+                raise FairShareError(429, f"Too many queued requests (max {self.max_waiting})", 5)
+            waiter = _Waiter(asyncio.get_running_loop())
+            if queue is None:
+                queue = self._waiting[key] = deque()
+                self._ring.append(key)
+            queue.append(waiter)
+            self._weight[key] = max(1, weight)
+            self._dispatch()
+        t0 = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except BaseException as e:
+            with self._lock:
+                granted = waiter.granted
+                waiter.abandoned = not granted
+            if granted:
+                self.release(key)
+            if isinstance(e, asyncio.TimeoutError):
+                raise FairShareError(503, "Server busy, please retry", 10)
+            raise
+        return time.monotonic() - t0
+
+    def release(self, key: str):
+        with self._lock:
+            self.busy -= 1
+            left = self._active.get(key, 1) - 1
+            if left > 0:
+                self._active[key] = left
+            else:
+                self._active.pop(key, None)
+                if key not in self._waiting:
+                    self._weight.pop(key, None)
+            self._dispatch()
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted", "abandoned")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+        self.abandoned = False
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+# ---------------- scheduler + middleware ----------------
+class FairShare:
+    def __init__(self, limits: Optional[dict] = None, buckets=None):
+        self.limits = limits or parse_limits(os.getenv("FAIR_SHARE_LIMITS", ""))
+        self.buckets = buckets or TokenBuckets()
+        self.queues = {name: FairQueue(slots) for name, (_, _, slots) in self.limits.items() if slots > 0}
+
+    def stats(self) -> dict:
+        return {name: queue.stats() for name, queue in self.queues.items()}
+
+    async def admit(self, cost_class: str, caller: str, weight: int = 1) -> Optional[FairQueue]:
+        """Take a token and, for queued classes, a slot (the caller must release() it). FairShareError if refused."""
+        rate, burst, _ = self.limits.get(cost_class, self.limits["light"])
+        if isinstance(self.buckets, TokenBuckets):
+            wait = self.buckets.take(f"{cost_class}:{caller}", rate, burst)
+        else:
+            wait = await asyncio.to_thread(self.buckets.take, f"{cost_class}:{caller}", rate, burst)
+        if wait > 0:
+            rejected.inc(cost_class=cost_class, reason="rate")
+            raise FairShareError(429, f"Rate limit for {cost_class} requests exceeded", wait)
+        queue = self.queues.get(cost_class)
+        if queue is not None:
+            try:
+                waited = await queue.acquire(caller, weight)
+            except FairShareError:
+                rejected.inc(cost_class=cost_class, reason="queue")
+                raise
+            queue_wait.observe(waited, cost_class=cost_class)
+        return queue
+
+
+def caller_key(scope) -> Tuple[str, int]:
+    """("user:<id>", FAIR_USER_WEIGHT) for a valid bearer token, else ("ip:<addr>", 1)."""
+    headers = dict(scope.get("headers") or [])
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    if auth[:7].lower() == "bearer ":
+        from utils.security import decode_token
+
+        data = decode_token(auth[7:].strip())
+        if data and data.get("sub"):
+            return f"user:{data['sub']}", FAIR_USER_WEIGHT
+    forwarded = headers.get(b"x-forwarded-for", b"").decode("latin-1")
+    if FAIR_TRUST_PROXY and forwarded:
+        return f"ip:{forwarded.split(',')[0].strip()}", 1
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}", 1
+
+
+class FairShareMiddleware:
+    def __init__(self, app, scheduler: Optional[FairShare] = None):
+        self.app = app
+        self.scheduler = scheduler or build_scheduler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":   # CORS preflights are free
+            return await self.app(scope, receive, send)
+
+        cost_class = classify(scope["method"], scope["path"])
+        caller, weight = caller_key(scope)
+        try:
+            queue = await self.scheduler.admit(cost_class, caller, weight)
+        except FairShareError as e:
+            body = json.dumps({"detail": e.detail}).encode()
+            await send({"type": "http.response.start", "status": e.status, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(e.retry_after))).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if queue is not None:
+                queue.release(caller)
+
+
+def build_scheduler() -> FairShare:
+    """Limits from FAIR_SHARE_LIMITS; buckets in memory or, with FAIR_SHARE_BACKEND=db, in the app database."""
+    if FAIR_SHARE_BACKEND == "db":
+        from database import engine
+
+        return FairShare(buckets=SqlTokenBuckets(engine))
+    return FairShare()
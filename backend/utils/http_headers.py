@@ -0,0 +1,52 @@
+# backend/utils/http_headers.py
+"""
+Request header parsing shared by the routes that answer conditional GETs or
+serve a pre-compressed body: If-None-Match entity-tag lists and Accept-Encoding
+with q-values.
+"""
+from typing import Iterable, Set
+
+
+def entity_tags(header: str) -> Set[str]:
+    """If-None-Match -> the set of opaque tags (weak prefix dropped, RFC 9110 weak comparison)."""
+    tags, tag, quoted = set(), "", False
+    for ch in header:
+        if ch == '"':
+            tag += ch
+            if quoted:
+                tags.add(tag)
+                tag = ""
+            quoted = not quoted
+        elif quoted:
+            tag += ch
+        elif ch == "*":
+            tags.add("*")
+    return tags
+
+
+def etag_matches(header: str, etags: Iterable[str]) -> bool:
+    tags = entity_tags(header)
+    return "*" in tags or any(e.removeprefix("W/") in tags for e in etags)
+
+
+def accepts_gzip(header: str) -> bool:
+    """True when Accept-Encoding allows gzip (directly or via *) with a non-zero q."""
+    wildcard = None
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q > 0
+        else:
+            return q > 0
+    return bool(wildcard)
@@ -0,0 +1,148 @@
+# backend/utils/lazy_imports.py
+"""
+Heavy modules imported on first use, grouped by subsystem, with timings.
+
+    PyPDF2 = lazy("PyPDF2", "pdf")      # nothing imported yet
+    PyPDF2.PdfReader(...)               # imported (once, thread-safe) here
+
+Subsystems can also register warmers (e.g. loading the Whisper model).
+start_background_warmup() runs everything in a daemon thread after the server
+is up, so /health, auth and the dashboard never wait for it; a request that
+needs a cold subsystem just imports it itself, which marks the subsystem
+ready once all its modules are in (subsystems with warmers call mark_ready()
+when their own on-demand load succeeds). A failed warm-up is retried the same
+way: the next request that uses the subsystem imports / loads it again.
+readiness() feeds /ready and import_profile() lists what each import cost.
+"""
+import importlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+BOOT_AT = time.monotonic()
+
+_lock = threading.Lock()
+_modules: Dict[str, "LazyModule"] = {}
+_warmers: Dict[str, List[Callable[[], None]]] = {}
+_state: Dict[str, dict] = {}
+
+
+class LazyModule:
+    def __init__(self, name: str, subsystem: str, on_import: Optional[Callable] = None):
+        self._name = name
+        self._subsystem = subsystem
+        self._on_import = on_import
+        self._module = None
+        self._import_sec: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._load_lock:
+                if self._module is None:
+                    t0 = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_import:
+                        self._on_import(module)
+                    self._import_sec = time.perf_counter() - t0
+                    self._module = module
+                    _settle(self._subsystem)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy(name: str, subsystem: str, on_import: Optional[Callable] = None) -> LazyModule:
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            module = _modules[name] = LazyModule(name, subsystem, on_import)
+            _state.setdefault(subsystem, {"state": "cold"})
+        return module
+
+
+def on_warm(subsystem: str, fn: Callable[[], None]):
+    """Extra warm-up work for a subsystem (runs after its modules are imported)."""
+    with _lock:
+        _warmers.setdefault(subsystem, []).append(fn)
+        _state.setdefault(subsystem, {"state": "cold"})
+
+
+def _settle(subsystem: str):
+    """Cold or failed subsystem whose modules are now all imported (and has no warmers) -> ready."""
+    with _lock:
+        if _state.get(subsystem, {}).get("state") not in ("cold", "failed") or subsystem in _warmers:
+            return
+        if all(m._module is not None for m in _modules.values() if m._subsystem == subsystem):
+            _state[subsystem] = {"state": "ready", "seconds": 0.0}
+
+
+def mark_ready(subsystem: str):
+    """For subsystems that are ready by construction (e.g. the DB after migrations) or whose
+    warm-up work was just done on demand (e.g. a request loading the Whisper model)."""
+    with _lock:
+        _state[subsystem] = {"state": "ready", "seconds": 0.0}
+
+
+def warm(subsystem: str):
+    with _lock:
+        if _state.get(subsystem, {}).get("state") in ("ready", "warming"):
+            return
+        _state[subsystem] = {"state": "warming"}
+        modules = [m for m in _modules.values() if m._subsystem == subsystem]
+        warmers = list(_warmers.get(subsystem, []))
+    t0 = time.perf_counter()
+    try:
+        for m in modules:
+            m._load()
+        for fn in warmers:
+            fn()
+    except Exception as e:
+        print(f"[WARN] warm-up of '{subsystem}' failed: {e}")
+        with _lock:
+            _state[subsystem] = {"state": "failed", "seconds": round(time.perf_counter() - t0, 3), "error": str(e)}
+        return
+    with _lock:
+        _state[subsystem] = {"state": "ready", "seconds": round(time.perf_counter() - t0, 3)}
+    print(f"[Warm-up] {subsystem} ready in {time.perf_counter() - t0:.2f}s")
+
+
+def start_background_warmup(order: Optional[List[str]] = None) -> threading.Thread:
+    """Warm subsystems one by one (in `order` first, then the rest) in a daemon thread."""
+    def run():
+        with _lock:
+            names = list(_state)
+        for name in (order or []) + [n for n in names if n not in (order or [])]:
+            warm(name)
+
+    t = threading.Thread(target=run, name="warmup", daemon=True)
+    t.start()
+    return t
+
+
+def readiness() -> dict:
+    with _lock:
+        subsystems = {}
+        for name, state in _state.items():
+            mods = {m._name: m._module is not None for m in _modules.values() if m._subsystem == name}
+            subsystems[name] = {**state, "modules": mods}
+    return {
+        "ready": all(s["state"] == "ready" for s in subsystems.values()),
+        "uptime_sec": round(time.monotonic() - BOOT_AT, 1),
+        "subsystems": subsystems,
+    }
+
+
+def import_profile() -> List[dict]:
+    with _lock:
+        rows = [
+            {"module": m._name, "subsystem": m._subsystem, "loaded": m._module is not None,
+             "import_sec": None if m._import_sec is None else round(m._import_sec, 3)}
+            for m in _modules.values()
+        ]
+    return sorted(rows, key=lambda r: -(r["import_sec"] or 0))
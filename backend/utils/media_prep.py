@@ -0,0 +1,142 @@
+# backend/utils/media_prep.py
+"""
+Shrink MOM attachments before they go to the LLM, and remember what was uploaded.
+
+- video / audio -> 16 kHz mono Opus audio + a few sampled, downscaled keyframes
+  (one ffmpeg run; only the outputs whose stream the input actually has)
+- image -> downscaled JPEG
+- RemoteFileCache maps content hash -> uploaded file handles, so regenerating a
+  MOM for the same media skips the upload entirely.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Set
+
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE = os.getenv("FFPROBE_BINARY", "ffprobe")
+AUDIO_BITRATE = os.getenv("MEDIA_AUDIO_BITRATE", "24k")
+KEYFRAME_EVERY_SEC = float(os.getenv("MEDIA_KEYFRAME_EVERY_SEC", "60"))
+MAX_KEYFRAMES = int(os.getenv("MEDIA_MAX_KEYFRAMES", "8"))
+FRAME_MAX_WIDTH = int(os.getenv("MEDIA_FRAME_MAX_WIDTH", "768"))
+IMAGE_MAX_SIDE = int(os.getenv("MEDIA_IMAGE_MAX_SIDE", "1600"))
+IMAGE_QUALITY = int(os.getenv("MEDIA_IMAGE_QUALITY", "85"))
+FFMPEG_TIMEOUT_SEC = float(os.getenv("MEDIA_FFMPEG_TIMEOUT_SEC", "600"))
+
+# Gemini deletes uploaded files after 48h; stay well inside that
+REMOTE_FILE_TTL_SEC = float(os.getenv("GEMINI_FILE_TTL_SEC", str(40 * 3600)))
+REMOTE_FILE_MAX_ENTRIES = int(os.getenv("GEMINI_FILE_CACHE_ENTRIES", "512"))
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG) is not None
+
+
+_STREAM_RE = re.compile(r"^\s*Stream #\d+:\d+.*?: (Audio|Video):(.*)$", re.MULTILINE)
+
+
+def probe_streams(path: str) -> Set[str]:
+    """{"audio", "video"} present in `path`; cover art (attached pictures) doesn't count as video."""
+    if shutil.which(FFPROBE):
+        out = subprocess.run([FFPROBE, "-v", "error", "-show_streams", "-of", "json", path],
+                             check=True, capture_output=True, timeout=60).stdout
+        return {
+            s["codec_type"] for s in json.loads(out or b"{}").get("streams", [])
+            if s.get("codec_type") in ("audio", "video") and not s.get("disposition", {}).get("attached_pic")
+        }
+    # no ffprobe (e.g. the imageio-ffmpeg build): ffmpeg lists the input streams on stderr
+    err = subprocess.run([FFMPEG, "-hide_banner", "-nostdin", "-i", path],
+                         capture_output=True, timeout=60).stderr.decode("utf-8", "replace")
+    return {kind.lower() for kind, rest in _STREAM_RE.findall(err) if "(attached pic)" not in rest}
+
+
+def slim_video(path: str, workdir: str) -> List[str]:
+    """One ffmpeg pass: audio track -> audio.ogg, every KEYFRAME_EVERY_SEC -> frame_NN.jpg.
+
+    Audio-only recordings get just the audio output, silent screen captures just
+    the frames; an input with neither returns [] (the caller uploads the original).
+    """
+    streams = probe_streams(path)
+    if not streams:
+        return []
+    audio = os.path.join(workdir, "audio.ogg")
+    frames = os.path.join(workdir, "frame_%02d.jpg")
+    cmd = [FFMPEG, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-i", path]
+    if "audio" in streams:
+        cmd += ["-map", "0:a:0", "-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", AUDIO_BITRATE, audio]
+    if "video" in streams:
+        # the first frame, then one every KEYFRAME_EVERY_SEC (fps=1/N gives nothing for clips shorter than N/2)
+        pick = f"select='isnan(prev_selected_t)+gte(t-prev_selected_t\\,{KEYFRAME_EVERY_SEC:g})'"
+        cmd += ["-map", "0:V:0", "-an", "-vf", f"{pick},scale='min({FRAME_MAX_WIDTH},iw)':-2", "-fps_mode", "vfr",
+                "-frames:v", str(MAX_KEYFRAMES), "-q:v", "5", frames]
+    subprocess.run(cmd, check=True, capture_output=True, timeout=FFMPEG_TIMEOUT_SEC)
+    out = sorted(os.path.join(workdir, f) for f in os.listdir(workdir) if f.startswith("frame_"))
+    if os.path.exists(audio) and os.path.getsize(audio) > 0:
+        out.insert(0, audio)
+    return out
+
+
+def slim_image(path: str, workdir: str) -> str:
+    from PIL import Image
+
+    with Image.open(path) as img:
+        if max(img.size) <= IMAGE_MAX_SIDE and os.path.getsize(path) <= 1024 * 1024:
+            return path
+        img.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        out = os.path.join(workdir, "image.jpg")
+        img.save(out, "JPEG", quality=IMAGE_QUALITY, optimize=True)
+    return out if os.path.getsize(out) < os.path.getsize(path) else path
+
+
+def prepare_media(path: str, kind: str, workdir: str) -> List[str]:
+    """Return the (smaller) files to upload for one attachment. Falls back to the original on failure."""
+    try:
+        if kind == "video" and ffmpeg_available():
+            slim = slim_video(path, workdir)
+            return slim or [path]
+        if kind == "image":
+            return [slim_image(path, workdir)]
+    except Exception as e:
+        print(f"[WARN] media slimming failed for {kind}, uploading original: {e}")
+    return [path]
+
+
+class RemoteFileCache:
+    """content hash -> uploaded file handles, with TTL and an LRU entry cap."""
+
+    def __init__(self, ttl: float = REMOTE_FILE_TTL_SEC, max_entries: int = REMOTE_FILE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, handles: list) -> list:
+        """Returns handles that fell out of the cache (caller may delete them remotely)."""
+        with self._lock:
+            self._entries[key] = (handles, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                _, (old, _) = self._entries.popitem(last=False)
+                evicted.extend(old)
+            return evicted
@@ -0,0 +1,325 @@
+# backend/utils/metrics.py
+"""
+In-process metrics in the Prometheus text format (GET /metrics).
+
+Writers never take a shared lock: every thread owns a shard (thread-local dict
+of label values -> numbers) per metric, and a scrape sums the shards. The only
+lock is taken once per (thread, metric) to register a new shard. Gauges whose
+value lives elsewhere (DB pool, temp disk) are read by callbacks at scrape time.
+
+MetricsMiddleware (pure ASGI) records per-route latency, status, in-flight
+requests and request/response bytes for conversion routes, and writes sampled
+one-line JSON access logs instead of printing every request.
+"""
+import glob
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RTF_BUCKETS = (0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 4)
+
+ACCESS_LOG_SAMPLE = float(os.getenv("ACCESS_LOG_SAMPLE", "0.01"))     # fraction of requests logged
+ACCESS_LOG_SLOW_SEC = float(os.getenv("ACCESS_LOG_SLOW_SEC", "5"))    # always log slower ones (and 5xx)
+CONVERSION_PREFIXES = ("/convert/", "/transcribe/", "/ai/", "/meeting-mom")
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class _Sharded:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def _merged(self) -> Dict[Tuple, list]:
+        with self._lock:
+            shards = list(self._shards)
+        out: Dict[Tuple, list] = {}
+        for shard in shards:
+            for key, vals in list(shard.items()):
+                acc = out.get(key)
+                if acc is None:
+                    out[key] = list(vals)
+                else:
+                    for i, v in enumerate(vals):
+                        acc[i] += v
+        return out
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, value: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        cell = shard.get(key)
+        if cell is None:
+            shard[key] = [value]
+        else:
+            cell[0] += value
+
+    def value(self, **labels) -> float:
+        return self._merged().get(self._key(labels), [0])[0]
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v[0])}" for k, v in sorted(self._merged().items())]
+
+
+class Gauge(Counter):
+    """inc/dec from any thread (sharded sums); or a callback returning {label tuple: value}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (),
+                 fn: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def dec(self, value: float = 1, **labels):
+        self.inc(-value, **labels)
+
+    def _merged(self):
+        if self.fn is not None:
+            try:
+                return {k: [v] for k, v in self.fn().items()}
+            except Exception as e:
+                print(f"[WARN] metric {self.name} callback failed: {e}")
+                return {}
+        return super()._merged()
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0] * (len(self.buckets) + 2)   # buckets..., count, sum
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                cell[i] += 1
+                break
+        cell[-2] += 1
+        cell[-1] += value
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, cell in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, cell):
+                cumulative += n
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, inf)} {cell[-2]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cell[-2]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(cell[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Sharded] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=(), fn=None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        out = []
+        for m in metrics:
+            out.append(f"# HELP {m.name} {m.help}")
+            out.append(f"# TYPE {m.name} {m.kind}")
+            out.extend(m.render())
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------------- shared metrics ----------------
+http_requests = REGISTRY.counter("http_requests_total", "HTTP requests", ("route", "method", "status"))
+http_latency = REGISTRY.histogram("http_request_duration_seconds", "Time to response headers", ("route", "method"))
+http_in_flight = REGISTRY.gauge("http_requests_in_flight", "Requests being handled")
+conversion_bytes_in = REGISTRY.counter("conversion_bytes_in_total", "Request body bytes", ("route",))
+conversion_bytes_out = REGISTRY.counter("conversion_bytes_out_total", "Response body bytes", ("route",))
+
+asr_decode = REGISTRY.histogram("asr_decode_seconds", "Whisper wall time per file", ("model", "mode"))
+asr_rtf = REGISTRY.histogram("asr_real_time_factor", "Whisper wall time / audio duration", ("model", "mode"), RTF_BUCKETS)
+asr_audio = REGISTRY.counter("asr_audio_seconds_total", "Audio transcribed", ("model",))
+
+llm_latency = REGISTRY.histogram("llm_request_duration_seconds", "LLM backend call latency", ("backend", "op"))
+llm_errors = REGISTRY.counter("llm_errors_total", "LLM backend call failures", ("backend", "op", "error"))
+
+
+def observe_asr(model: str, mode: str, seconds: float, audio_seconds: float):
+    asr_decode.observe(seconds, model=model, mode=mode)
+    if audio_seconds > 0:
+        asr_rtf.observe(seconds / audio_seconds, model=model, mode=mode)
+        asr_audio.inc(audio_seconds, model=model)
+
+
+def timed_llm(op: str):
+    """Decorator for LLM backend methods (self.name is the backend label)."""
+    def wrap(fn):
+        def inner(self, *args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(self, *args, **kwargs)
+            except Exception as e:
+                llm_errors.inc(backend=self.name, op=op, error=type(e).__name__)
+                raise
+            finally:
+                llm_latency.observe(time.perf_counter() - t0, backend=self.name, op=op)
+        inner.__name__, inner.__doc__ = fn.__name__, fn.__doc__
+        return inner
+    return wrap
+
+
+# ---------------- disk usage (cached; walking dirs on every scrape is too slow) ----------------
+class DirSizes:
+    """Bytes per directory. A glob entry ("temp_*") sums every matching directory under one label,
+    minus the ones listed on their own."""
+
+    def __init__(self, dirs: Iterable[str], ttl: float = 30):
+        self.dirs = list(dirs)
+        self.ttl = ttl
+        self._at = 0.0
+        self._value: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(path: str) -> int:
+        total = 0
+        for root, _, files in os.walk(path):
+            for f in files:
+                try:
+                    total += os.lstat(os.path.join(root, f)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def _measure(self, entry: str) -> int:
+        if not glob.has_magic(entry):
+            return self._size(entry)
+        return sum(self._size(p) for p in glob.glob(entry) if os.path.isdir(p) and p not in self.dirs)
+
+    def __call__(self) -> Dict[Tuple, float]:
+        with self._lock:
+            if time.monotonic() - self._at > self.ttl:
+                self._value = {(d,): self._measure(d) for d in self.dirs}
+                self._at = time.monotonic()
+            return dict(self._value)
+
+
+# ---------------- ASGI middleware ----------------
+class MetricsMiddleware:
+    def __init__(self, app, sample: float = ACCESS_LOG_SAMPLE, slow_sec: float = ACCESS_LOG_SLOW_SEC):
+        self.app = app
+        self.sample = sample
+        self.slow_sec = slow_sec
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        t0 = time.perf_counter()
+        state = {"status": 500, "in": 0, "out": 0, "ttfb": None}
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                state["in"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["ttfb"] = time.perf_counter() - t0
+            elif message["type"] == "http.response.body":
+                state["out"] += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            http_in_flight.dec()
+            self._record(scope, state, time.perf_counter() - t0)
+
+    def _record(self, scope, state, total: float):
+        route = scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        status = state["status"]
+        latency = state["ttfb"] if state["ttfb"] is not None else total
+        http_requests.inc(route=path, method=method, status=str(status))
+        http_latency.observe(latency, route=path, method=method)
+        if path.startswith(CONVERSION_PREFIXES):
+            conversion_bytes_in.inc(state["in"], route=path)
+            conversion_bytes_out.inc(state["out"], route=path)
+
+        if status >= 500 or total >= self.slow_sec or random.random() < self.sample:
+            headers = dict(scope.get("headers") or [])
+            print(json.dumps({
+                "event": "request",
+                "route": path,
+                "path": scope["path"],
+                "method": method,
+                "status": status,
+                "ms": round(total * 1000, 1),
+                "ttfb_ms": round(latency * 1000, 1),
+                "bytes_in": state["in"],
+                "bytes_out": state["out"],
+                "origin": headers.get(b"origin", b"").decode("latin-1") or None,
+            }, separators=(",", ":")))
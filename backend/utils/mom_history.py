@@ -0,0 +1,68 @@
+# backend/utils/mom_history.py
+import os
+import re
+import zlib
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+import models
+
+# Transcripts longer than this are stored zlib-compressed (meeting text shrinks ~3-4x)
+COMPRESS_OVER_CHARS = int(os.getenv("MOM_TRANSCRIPT_COMPRESS_CHARS", "4096"))
+PREVIEW_CHARS = 280
+
+_TITLE = re.compile(r"^\W*(?:meeting\s+)?title\W*:?\s*(.*)$", re.IGNORECASE)
+
+
+def extract_title(mom: str) -> str:
+    lines = [l.strip() for l in mom.splitlines() if l.strip()]
+    for i, line in enumerate(lines):
+        m = _TITLE.match(line)
+        if m:
+            title = m.group(1).strip(" *#:") or (lines[i + 1].strip(" *#") if i + 1 < len(lines) else "")
+            if title:
+                return title[:255]
+    return (lines[0].strip(" *#") if lines else "Minutes of Meeting")[:255]
+
+
+def save_mom(db: Session, *, user_id: int, mode: str, transcript: str, mom: str,
+             cache_key: Optional[str] = None) -> models.MomRecord:
+    """Store one generated MOM in a user's history. A user re-generating an identical MOM gets the existing record back.
+
+    Only signed-in runs are kept: an anonymous MOM has no owner who could list or delete it.
+    """
+    if user_id is None:
+        raise ValueError("MOM history needs a user")
+    if cache_key:
+        existing = (
+            db.query(models.MomRecord.id)
+            .filter(models.MomRecord.user_id == user_id, models.MomRecord.cache_key == cache_key)
+            .first()
+        )
+        if existing:
+            return db.get(models.MomRecord, existing.id)
+
+    transcript = transcript or ""
+    rec = models.MomRecord(
+        user_id=user_id,
+        mode=mode,
+        title=extract_title(mom),
+        preview=" ".join(mom.split())[:PREVIEW_CHARS],
+        cache_key=cache_key,
+        transcript_chars=len(transcript),
+        mom=mom,
+    )
+    if len(transcript) > COMPRESS_OVER_CHARS:
+        rec.transcript_gz = zlib.compress(transcript.encode("utf-8"), 6)
+    else:
+        rec.transcript = transcript
+    db.add(rec)
+    db.commit()
+    return rec
+
+
+def record_transcript(rec: models.MomRecord) -> str:
+    if rec.transcript_gz is not None:
+        return zlib.decompress(rec.transcript_gz).decode("utf-8")
+    return rec.transcript or ""
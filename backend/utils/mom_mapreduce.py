@@ -0,0 +1,120 @@
+# backend/utils/mom_mapreduce.py
+"""
+Map-reduce MOM generation for long transcripts.
+
+The transcript is cut into token-bounded, overlapping chunks (on sentence
+boundaries where possible); every chunk is summarised concurrently under a
+semaphore, then one reduce call merges the notes into the usual
+TITLE / AGENDA / SUMMARY / DECISIONS / ACTION ITEMS format. Wall time is
+roughly ceil(chunks / concurrency) map calls + 1 reduce call, instead of one
+call whose latency grows with the whole transcript.
+"""
+import asyncio
+import os
+import re
+from typing import Callable, List, Optional
+
+MOM_CHUNK_TOKENS = int(os.getenv("MOM_CHUNK_TOKENS", "3000"))
+MOM_CHUNK_OVERLAP_TOKENS = int(os.getenv("MOM_CHUNK_OVERLAP_TOKENS", "150"))
+MOM_LLM_CONCURRENCY = int(os.getenv("MOM_LLM_CONCURRENCY", "4"))
+MOM_CHUNK_TIMEOUT_SEC = float(os.getenv("MOM_CHUNK_TIMEOUT_SEC", "60"))
+MOM_LONG_THRESHOLD_TOKENS = int(os.getenv("MOM_LONG_THRESHOLD_TOKENS", "8000"))
+
+MAP_PROMPT = (
+    "You are reading part {index} of {total} of a meeting transcript. "
+    "Write concise notes with these headers: TOPICS, KEY POINTS, DECISIONS, ACTION ITEMS (with owners and dates if stated). "
+    "Only use what is in this part."
+)
+REDUCE_PROMPT = (
+    "Below are notes taken from consecutive parts of one meeting. Merge them into a single clean corporate MOM "
+    "with Headers: TITLE, AGENDA, SUMMARY, DECISIONS, ACTION ITEMS. Remove duplicates caused by overlapping parts."
+)
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token; good enough for budgeting English transcripts."""
+    return (len(text) + 3) // 4
+
+
+def _sentences(text: str, max_tokens: int) -> List[str]:
+    out = []
+    for s in _SENTENCE.split(text):
+        s = s.strip()
+        if not s:
+            continue
+        if estimate_tokens(s) <= max_tokens:
+            out.append(s)
+            continue
+        # run-on "sentence" (ASR output often has no punctuation): fall back to words
+        words, cur = s.split(), []
+        for w in words:
+            cur.append(w)
+            if estimate_tokens(" ".join(cur)) >= max_tokens:
+                out.append(" ".join(cur))
+                cur = []
+        if cur:
+            out.append(" ".join(cur))
+    return out
+
+
+def chunk_transcript(text: str, max_tokens: int = MOM_CHUNK_TOKENS, overlap_tokens: int = MOM_CHUNK_OVERLAP_TOKENS) -> List[str]:
+    overlap_tokens = min(overlap_tokens, max_tokens // 2)
+    chunks, cur, cur_tokens = [], [], 0
+    for s in _sentences(text, max_tokens):
+        t = estimate_tokens(s) + 1
+        if cur and cur_tokens + t > max_tokens:
+            chunks.append(" ".join(cur))
+            # carry the tail of this chunk into the next one for context
+            tail, tail_tokens = [], 0
+            for prev in reversed(cur):
+                pt = estimate_tokens(prev) + 1
+                if tail_tokens + pt > overlap_tokens:
+                    break
+                tail.insert(0, prev)
+                tail_tokens += pt
+            cur, cur_tokens = tail, tail_tokens
+        cur.append(s)
+        cur_tokens += t
+    if cur:
+        chunks.append(" ".join(cur))
+    return chunks
+
+
+async def map_reduce_mom(
+    llm,
+    transcript: str,
+    attachments: Optional[list] = None,
+    concurrency: int = MOM_LLM_CONCURRENCY,
+    chunk_tokens: int = MOM_CHUNK_TOKENS,
+    overlap_tokens: int = MOM_CHUNK_OVERLAP_TOKENS,
+    timeout: float = MOM_CHUNK_TIMEOUT_SEC,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> str:
+    """`attachments` are already-uploaded file handles; they go into the reduce call."""
+    chunks = chunk_transcript(transcript, chunk_tokens, overlap_tokens)
+    total = len(chunks)
+    sem = asyncio.Semaphore(max(1, concurrency))
+    done = 0
+
+    def report(**event):
+        if on_progress:
+            on_progress(event)
+
+    async def summarise(i: int, chunk: str) -> str:
+        nonlocal done
+        async with sem:
+            prompt = MAP_PROMPT.format(index=i + 1, total=total)
+            notes = await asyncio.wait_for(asyncio.to_thread(llm.generate, [prompt, chunk]), timeout=timeout)
+        done += 1
+        report(stage="map", chunk=i + 1, done=done, total=total)
+        return notes
+
+    report(stage="start", total=total)
+    notes = await asyncio.gather(*[summarise(i, c) for i, c in enumerate(chunks)])
+
+    merged = "\n\n".join(f"Part {i + 1}:\n{n}" for i, n in enumerate(notes))
+    parts = [REDUCE_PROMPT, merged, *(attachments or [])]
+    report(stage="reduce", total=total)
+    return await asyncio.wait_for(asyncio.to_thread(llm.generate, parts), timeout=timeout)
@@ -0,0 +1,137 @@
+# backend/utils/page_spec.py
+"""
+Page selections ("1-3,7,odd", "-5..last", "10-1:2") compiled once into a
+few range objects, never a list of every page number.
+
+Grammar (1-based, comma separated, whitespace ignored):
+
+    all | odd | even                   whole document / every other page
+    N | -N | last                      one page; -N counts from the end (-1 == last)
+    A-B | A..B                         inclusive range, either end may be negative
+                                       or "last"; A > B runs backwards
+    A- | A..                           A to the last page
+    <range or keyword>:S               every S-th page of it (e.g. 1-20:5, odd:2)
+
+compile_pages() only checks syntax, so it can run before the document is
+opened. resolve(count) clamps every item to 1..count in O(items) and returns a
+PageSelection: 0-based, in the order written (duplicates kept), iterable
+lazily, with len() in O(items). Single pages outside the document are dropped,
+like the original split endpoint did; an empty result is an error.
+"""
+import re
+from typing import Iterator, List, Optional, Tuple
+
+MAX_ITEMS = 1000
+
+_END = r"(?:-?\d+|last)"
+_ITEM = re.compile(rf"^(?:(?P<kw>all|odd|even)|(?P<a>{_END})(?:(?P<sep>\.\.|-)(?P<b>{_END})?)?)(?::(?P<step>\d+))?$")
+
+
+class PageSpecError(ValueError):
+    pass
+
+
+class PageSelection:
+    def __init__(self, ranges: List[range], count: int):
+        self.ranges = ranges
+        self.count = count
+
+    def __iter__(self) -> Iterator[int]:
+        for r in self.ranges:
+            yield from r
+
+    def __len__(self) -> int:
+        return sum(len(r) for r in self.ranges)
+
+    def __bool__(self) -> bool:
+        return any(self.ranges)
+
+    def __repr__(self):
+        return f"PageSelection({self.ranges!r}, count={self.count})"
+
+    def as_tuples(self) -> List[Tuple[int, int, int]]:
+        """(start, stop, step) per range, e.g. for PdfMerger.append(pages=...)."""
+        return [(r.start, r.stop, r.step) for r in self.ranges]
+
+
+class _Item:
+    __slots__ = ("kind", "a", "b", "open_end", "step")
+
+    def __init__(self, kind: str, a=None, b=None, open_end=False, step: int = 1):
+        self.kind, self.a, self.b, self.open_end, self.step = kind, a, b, open_end, step
+
+
+def _index(token: str, count: int) -> int:
+    """1-based / negative / "last" -> 0-based, possibly out of 0..count-1."""
+    if token == "last":
+        return count - 1
+    n = int(token)
+    return count + n if n < 0 else n - 1
+
+
+class PageSpec:
+    def __init__(self, items: List[_Item], text: str):
+        self.items = items
+        self.text = text
+
+    def resolve(self, count: int) -> PageSelection:
+        ranges = []
+        for it in self.items:
+            if it.kind == "kw":
+                start = 1 if it.a == "even" else 0
+                step = (1 if it.a == "all" else 2) * it.step
+                ranges.append(range(start, count, step))
+                continue
+            a = _index(it.a, count)
+            if it.kind == "page":
+                if 0 <= a < count:
+                    ranges.append(range(a, a + 1))
+                continue
+            b = count - 1 if it.open_end else _index(it.b, count)
+            if a <= b:
+                lo, hi = max(a, 0), min(b, count - 1)
+                # keep the step phase anchored at the written start when clamping
+                lo += (-(lo - a)) % it.step
+                ranges.append(range(lo, hi + 1, it.step))
+            else:
+                hi, lo = min(a, count - 1), max(b, 0)
+                hi -= (-(a - hi)) % it.step
+                ranges.append(range(hi, lo - 1, -it.step))
+        ranges = [r for r in ranges if len(r)]
+        if not ranges:
+            raise PageSpecError(f"No valid pages selected (document has {count})")
+        return PageSelection(ranges, count)
+
+    def __repr__(self):
+        return f"PageSpec({self.text!r})"
+
+
+def compile_pages(spec: Optional[str]) -> PageSpec:
+    """Parse a selection; empty / None means every page. PageSpecError on bad syntax."""
+    text = (spec or "").replace(" ", "").lower()
+    if not text:
+        return PageSpec([_Item("kw", "all")], "all")
+    parts = [p for p in text.split(",") if p]
+    if len(parts) > MAX_ITEMS:
+        raise PageSpecError(f"At most {MAX_ITEMS} items in a page selection")
+    items = []
+    for part in parts:
+        m = _ITEM.match(part)
+        if not m:
+            raise PageSpecError(f"Bad page selection '{part}'")
+        step = int(m["step"] or 1)
+        if step < 1:
+            raise PageSpecError(f"Bad step in '{part}'")
+        if any(t not in (None, "last") and int(t) == 0 for t in (m["a"], m["b"])):
+            raise PageSpecError("Pages are numbered from 1")
+        if m["kw"]:
+            items.append(_Item("kw", m["kw"], step=step))
+        elif m["sep"] is None:
+            items.append(_Item("page", m["a"], step=step))
+        else:
+            items.append(_Item("range", m["a"], m["b"], open_end=m["b"] is None, step=step))
+    return PageSpec(items, text)
+
+
+def select(spec: Optional[str], count: int) -> PageSelection:
+    return compile_pages(spec).resolve(count)
@@ -0,0 +1,119 @@
+# backend/utils/pdf_optimize.py
+"""
+Shrink a PDF: downsample oversized images, dedupe and recompress everything else.
+
+1. every image is measured where it is drawn (page.get_image_rects); one that
+   is stored at more than PDF_OPT_DPI at its largest placement is resized to
+   that DPI and re-encoded as JPEG (PDF_OPT_QUALITY) by Pillow in a thread
+   pool (Pillow releases the GIL while resizing/encoding; PyMuPDF doesn't, so
+   extraction and replacement stay on the calling thread). Images with soft
+   masks, tiny ones, those that wouldn't get smaller and those that can't be
+   extracted or decoded (JBIG2, CCITT, odd colour spaces) are left alone.
+2. save with garbage=4 (drops unused objects and merges identical objects and
+   streams, e.g. the same font embedded by every merged input), deflate on
+   content streams, fonts and images, and object streams.
+
+The result is only used if it is actually smaller than the input.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from utils.lazy_imports import lazy
+
+fitz = lazy("fitz", "pdf")  # PyMuPDF
+
+PDF_OPT_DPI = int(os.getenv("PDF_OPT_DPI", "150"))
+PDF_OPT_QUALITY = int(os.getenv("PDF_OPT_QUALITY", "75"))
+PDF_OPT_WORKERS = int(os.getenv("PDF_OPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+_MIN_PIXELS = 64 * 64
+
+
+def _placements(doc) -> dict:
+    """xref -> (pixel width, pixel height, max DPI it is drawn at) for images without soft masks."""
+    seen = {}
+    for page in doc:
+        for xref, smask, width, height, *_ in page.get_images(full=True):
+            if smask or width * height < _MIN_PIXELS:
+                continue
+            for rect in page.get_image_rects(xref):
+                if rect.width <= 0 or rect.height <= 0:
+                    continue
+                dpi = max(width / (rect.width / 72), height / (rect.height / 72))
+                seen[xref] = (width, height, max(dpi, seen.get(xref, (0, 0, 0))[2]))
+    return seen
+
+
+def _downsample(raw: bytes, scale: float, quality: int) -> Optional[bytes]:
+    """JPEG at `scale`, or None to keep the original (not smaller, or Pillow can't decode it)."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(raw)) as im:
+            if im.mode not in ("RGB", "L"):
+                im = im.convert("RGB")
+            size = (max(1, round(im.width * scale)), max(1, round(im.height * scale)))
+            small = im.resize(size, Image.LANCZOS)
+            buf = io.BytesIO()
+            small.save(buf, "JPEG", quality=quality, optimize=True)
+    except Exception as e:   # one odd image must not fail the whole document
+        print(f"[WARN] pdf-optimize: keeping an image Pillow can't re-encode: {e}")
+        return None
+    data = buf.getvalue()
+    return data if len(data) < len(raw) else None
+
+
+def optimize_pdf(data: bytes, dpi: int = PDF_OPT_DPI, quality: int = PDF_OPT_QUALITY,
+                 workers: int = PDF_OPT_WORKERS) -> Tuple[bytes, dict]:
+    """(optimized bytes, report). Returns the input unchanged if nothing got smaller."""
+    doc = fitz.open(stream=data, filetype="pdf")
+    try:
+        if doc.needs_pass:
+            raise ValueError("PDF is encrypted")
+        jobs = {}
+        for xref, (w, h, drawn_dpi) in _placements(doc).items():
+            if drawn_dpi > dpi * 1.1:
+                try:
+                    img = doc.extract_image(xref)
+                except Exception as e:
+                    print(f"[WARN] pdf-optimize: cannot extract image {xref}: {e}")
+                    continue
+                if img and img.get("image"):
+                    jobs[xref] = (img["image"], dpi / drawn_dpi)
+
+        replaced = 0
+        if jobs:
+            with ThreadPoolExecutor(max(1, workers), thread_name_prefix="pdf-opt") as pool:
+                results = dict(zip(jobs, pool.map(lambda job: _downsample(job[0], job[1], quality), jobs.values())))
+            pages_by_xref = {}
+            for page in doc:
+                for img in page.get_images(full=True):
+                    pages_by_xref.setdefault(img[0], page)
+            for xref, new in results.items():
+                if new is not None and xref in pages_by_xref:
+                    pages_by_xref[xref].replace_image(xref, stream=new)
+                    replaced += 1
+
+        out = doc.tobytes(garbage=4, deflate=True, deflate_images=True, deflate_fonts=True,
+                          clean=True, use_objstms=1)
+    finally:
+        doc.close()
+
+    smaller = len(out) < len(data)
+    report = {"bytes_before": len(data), "bytes_after": len(out) if smaller else len(data),
+              "images_downsampled": replaced if smaller else 0, "target_dpi": dpi, "quality": quality}
+    return (out if smaller else data), report
+
+
+def optimize_file(path: str, **kwargs) -> dict:
+    """Optimize a PDF on disk in place; returns the report."""
+    with open(path, "rb") as f:
+        data = f.read()
+    out, report = optimize_pdf(data, **kwargs)
+    if out is not data:
+        tmp = path + ".opt"
+        with open(tmp, "wb") as f:
+            f.write(out)
+        os.replace(tmp, path)
+    return report
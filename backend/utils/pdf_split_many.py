@@ -0,0 +1,217 @@
+# backend/utils/pdf_split_many.py
+"""
+Split one PDF into many: every N pages, one file per page, or at bookmarks.
+
+plan() opens the source once with PyMuPDF and turns the request into a list of
+parts, each a few (first, last) page runs. The parts are then built with
+insert_pdf (which copies only the objects those pages use) and saved with
+deflate. PyMuPDF holds the GIL, so with PDF_SPLIT_WORKERS > 1 parts are built
+in a spawn-based process pool whose workers open the source once and keep it
+open for all of their parts; with one worker they are built in-process from
+a single open document.
+
+iter_zip() streams the result as a ZIP, each entry written as soon as its part
+is ready (completion order; names are numbered, so order doesn't matter).
+At most 2 parts per worker are in flight, so memory stays flat however many
+parts there are. Entries are stored, not deflated: the PDFs already are.
+"""
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple
+
+from utils.lazy_imports import lazy
+from utils.page_spec import PageSpecError, select
+
+fitz = lazy("fitz", "pdf")  # PyMuPDF
+
+PDF_SPLIT_WORKERS = int(os.getenv("PDF_SPLIT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_SPLIT_MAX_PARTS = int(os.getenv("PDF_SPLIT_MAX_PARTS", "5000"))
+MODES = ("every", "pages", "bookmarks")
+
+Part = Tuple[str, List[Tuple[int, int]]]   # (file name, [(first, last) 0-based, inclusive])
+
+
+class SplitError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _runs(indexes: List[int]) -> List[Tuple[int, int]]:
+    """[3, 4, 5, 9, 8] -> [(3, 5), (9, 9), (8, 8)]: ascending runs, selection order kept."""
+    runs = []
+    for i in indexes:
+        if runs and i == runs[-1][1] + 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return [tuple(r) for r in runs]
+
+
+def _safe_name(title: str) -> str:
+    return re.sub(r"[^\w\-. ]+", "_", title).strip(" ._")[:80] or "section"
+
+
+def _bookmark_parts(doc, level: int) -> List[Tuple[str, int, int]]:
+    """(title, first, last) per bookmark at `level` or above; pages before the first one become front matter."""
+    starts = []
+    for lvl, title, page in doc.get_toc(simple=True):
+        if lvl <= level and 1 <= page <= doc.page_count and (not starts or page - 1 > starts[-1][1]):
+            starts.append((title, page - 1))   # out-of-order / same-page bookmarks would give empty parts
+    if not starts:
+        raise SplitError(400, f"PDF has no bookmarks at level {level} or above")
+    if starts[0][1] > 0:
+        starts.insert(0, ("front matter", 0))
+    ends = [s[1] - 1 for s in starts[1:]] + [doc.page_count - 1]
+    return [(title, first, last) for (title, first), last in zip(starts, ends)]
+
+
+def plan(doc, mode: str, every: int = 1, level: int = 1, pages: Optional[str] = None) -> List[Part]:
+    """Parts for an open, decrypted PyMuPDF document."""
+    if mode not in MODES:
+        raise SplitError(400, f"mode must be one of {', '.join(MODES)}")
+    if mode == "bookmarks":
+        if pages:
+            raise SplitError(400, "pages can't be combined with mode=bookmarks")
+        sections = _bookmark_parts(doc, level)
+        width = len(str(len(sections)))
+        parts = [(f"{n:0{width}d}_{_safe_name(title)}.pdf", [(first, last)])
+                 for n, (title, first, last) in enumerate(sections, 1)]
+    else:
+        try:
+            selected = list(select(pages, doc.page_count))
+        except PageSpecError as e:
+            raise SplitError(400, str(e))
+        size = 1 if mode == "pages" else every
+        if size < 1:
+            raise SplitError(400, "every must be at least 1")
+        chunks = [selected[i:i + size] for i in range(0, len(selected), size)]
+        width = len(str(doc.page_count))
+        parts = []
+        for n, chunk in enumerate(chunks, 1):
+            first, last = chunk[0] + 1, chunk[-1] + 1
+            label = f"p{first:0{width}d}" if len(chunk) == 1 else f"p{first:0{width}d}-{last:0{width}d}"
+            parts.append((f"part_{n:0{len(str(len(chunks)))}d}_{label}.pdf", _runs(chunk)))
+    if len(parts) > PDF_SPLIT_MAX_PARTS:
+        raise SplitError(400, f"At most {PDF_SPLIT_MAX_PARTS} output files per split")
+    return parts
+
+
+def plan_file(path: str, mode: str, every: int = 1, level: int = 1, pages: Optional[str] = None) -> List[Part]:
+    try:
+        doc = fitz.open(path)
+    except Exception as e:
+        raise SplitError(400, f"Not a readable PDF: {e}")
+    try:
+        if doc.needs_pass:
+            raise SplitError(400, "PDF is encrypted; unlock it first")
+        return plan(doc, mode, every, level, pages)
+    finally:
+        doc.close()
+
+
+def build_part(src, runs: List[Tuple[int, int]]) -> bytes:
+    out = fitz.open()
+    try:
+        for first, last in runs:
+            out.insert_pdf(src, from_page=first, to_page=last)
+        return out.tobytes(garbage=1, deflate=True)
+    finally:
+        out.close()
+
+
+# ---- process pool side ----
+_worker_docs: "OrderedDict[str, object]" = OrderedDict()
+
+
+def _build_in_worker(path: str, runs: List[Tuple[int, int]]) -> bytes:
+    doc = _worker_docs.get(path)
+    if doc is None:
+        doc = _worker_docs[path] = fitz.open(path)
+        if len(_worker_docs) > 2:
+            _worker_docs.popitem(last=False)[1].close()
+    _worker_docs.move_to_end(path)
+    return build_part(doc, runs)
+
+
+class _Sink:
+    """Write-only, unseekable file for ZipFile; the generator drains it after every entry."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class PdfSplitter:
+    def __init__(self, workers: int = PDF_SPLIT_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def iter_parts(self, path: str, parts: List[Part]) -> Iterator[Tuple[str, bytes]]:
+        """(name, pdf bytes) as each part is ready."""
+        if len(parts) > 1 and self.workers > 1:
+            pool, pending, todo = self._executor(), {}, iter(parts)
+            try:
+                while True:
+                    while len(pending) < self.workers * 2:
+                        name, runs = next(todo, (None, None))
+                        if name is None:
+                            break
+                        pending[pool.submit(_build_in_worker, path, runs)] = name
+                    if not pending:
+                        return
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+            return
+        src = fitz.open(path)
+        try:
+            for name, runs in parts:
+                yield name, build_part(src, runs)
+        finally:
+            src.close()
+
+    def iter_zip(self, path: str, parts: List[Part]) -> Iterator[bytes]:
+        sink = _Sink()
+        stamp = time.localtime()[:6]
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+            for name, data in self.iter_parts(path, parts):
+                zf.writestr(zipfile.ZipInfo(name, stamp), data)
+                yield sink.drain()
+        yield sink.drain()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+splitter = PdfSplitter()
@@ -0,0 +1,290 @@
+# backend/utils/profiling.py
+"""
+Opt-in profiling of a single request.
+
+Enabled only when PROFILE_ADMIN_TOKEN is set (the middleware isn't even
+installed otherwise). A request carrying `X-Profile: <token>` or
+`?profile=<token>` gets:
+
+- a stack sampler thread (sys._current_frames every PROFILE_INTERVAL_MS) that
+  samples only the threads working for this request: the event-loop thread
+  for the whole request, and an executor thread while it is inside one of the
+  request's stage() blocks. Other requests' executor jobs stay out of the
+  profile; the loop thread is shared, so its samples can still include other
+  coroutines that ran in between. Idle threads are skipped
+- per-stage timings: "upload" (request body received / spooled) and
+  "respond" (response start -> last byte) from the middleware, plus whatever
+  the endpoint marks with `with stage("convert"): ...`
+- both saved under PROFILE_DIR as <id>.speedscope.json + <id>.json, served by
+  routers/profiles.py; the response carries X-Profile-Id
+
+stage() is a ContextVar lookup returning a shared no-op when no profile is
+active, so instrumented code costs nothing in normal requests. asyncio.to_thread
+and Starlette's threadpool copy the context, so stages inside executor
+threads land in the right profile (and enlist that thread for sampling);
+executor work outside any stage() is not sampled.
+"""
+import contextvars
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+from urllib.parse import parse_qs
+
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "cache/profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+# leaf frames that mean "this thread is parked", not working
+_IDLE = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("thread.py", "_worker"), ("_thread.py", "run"),
+}
+
+_current: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+_NULL = nullcontext()
+
+
+def profiling_enabled() -> bool:
+    return bool(PROFILE_ADMIN_TOKEN)
+
+
+def check_token(token: Optional[str]) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token, PROFILE_ADMIN_TOKEN)
+
+
+def stage(name: str):
+    """Time a block as a named stage of the current profiled request (no-op otherwise)."""
+    profile = _current.get()
+    return _NULL if profile is None else profile.stage(name)
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, interval: float, threads):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.threads = threads          # () -> idents currently working for the request
+        self.frames: list = []          # [(name, file, line)]
+        self._frame_ix: dict = {}
+        self.samples: dict = {}         # thread ident -> ([stack], [weight])
+        self._halt = threading.Event()
+
+    def _ix(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        ix = self._frame_ix.get(key)
+        if ix is None:
+            ix = self._frame_ix[key] = len(self.frames)
+            self.frames.append(key)
+        return ix
+
+    def run(self):
+        me = threading.get_ident()
+        last = time.perf_counter()
+        while not self._halt.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            wanted = self.threads()
+            for ident, frame in sys._current_frames().items():
+                if ident == me or ident not in wanted:
+                    continue
+                leaf = frame.f_code
+                if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._ix(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                stacks, weights = self.samples.setdefault(ident, ([], []))
+                stacks.append(stack)
+                weights.append(weight)
+
+    def stop(self):
+        self._halt.set()
+        self.join(timeout=5)
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.t0 = time.perf_counter()
+        self.started_at = time.time()
+        self.stages: list = []
+        self._lock = threading.Lock()
+        self._threads: dict = {}        # ident -> open enlistments (nested stages)
+        self.sampler = _Sampler(PROFILE_INTERVAL_MS / 1000, self.threads)
+
+    def enlist(self):
+        """Sample the calling thread until the matching discharge()."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def discharge(self):
+        ident = threading.get_ident()
+        with self._lock:
+            left = self._threads.get(ident, 0) - 1
+            if left > 0:
+                self._threads[ident] = left
+            else:
+                self._threads.pop(ident, None)
+
+    def threads(self) -> frozenset:
+        with self._lock:
+            return frozenset(self._threads)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        self.enlist()
+        try:
+            yield
+        finally:
+            self.discharge()
+            self.add_stage(name, start, time.perf_counter())
+
+    def add_stage(self, name: str, start: float, end: float):
+        with self._lock:
+            self.stages.append({
+                "stage": name,
+                "start_ms": round((start - self.t0) * 1000, 2),
+                "ms": round((end - start) * 1000, 2),
+                "thread": threading.current_thread().name,
+            })
+
+    def speedscope(self, end: float) -> dict:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        profiles = []
+        for ident, (stacks, weights) in self.sampler.samples.items():
+            profiles.append({
+                "type": "sampled",
+                "name": f"{names.get(ident, 'thread')} ({ident})",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": stacks,
+                "weights": [round(w, 6) for w in weights],
+            })
+        profiles.sort(key=lambda p: -p["endValue"])
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "my-applications profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in self.sampler.frames]},
+            "profiles": profiles or [{"type": "sampled", "name": "no samples", "unit": "seconds",
+                                      "startValue": 0, "endValue": round(end - self.t0, 6), "samples": [], "weights": []}],
+        }
+
+    def save(self, route: str, status: int, end: float) -> dict:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        meta = {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "started_at": self.started_at,
+            "total_ms": round((end - self.t0) * 1000, 2),
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "samples": sum(len(w) for _, w in self.sampler.samples.values()),
+            "stages": sorted(self.stages, key=lambda s: s["start_ms"]),
+        }
+        with open(os.path.join(PROFILE_DIR, f"{self.id}.speedscope.json"), "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(end), f, separators=(",", ":"))
+        with open(os.path.join(PROFILE_DIR, f"{self.id}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=1)
+        _prune()
+        return meta
+
+
+def _prune():
+    metas = sorted((e for e in os.scandir(PROFILE_DIR) if e.name.endswith(".json") and ".speedscope" not in e.name),
+                   key=lambda e: e.stat().st_mtime)
+    for e in metas[:-PROFILE_KEEP] if PROFILE_KEEP else []:
+        pid = e.name[:-5]
+        for suffix in (".json", ".speedscope.json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, pid + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> list:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for e in os.scandir(PROFILE_DIR):
+        if e.name.endswith(".json") and ".speedscope" not in e.name:
+            with open(e.path, encoding="utf-8") as f:
+                out.append(json.load(f))
+    return sorted(out, key=lambda m: -m["started_at"])
+
+
+def profile_path(profile_id: str, kind: str) -> Optional[str]:
+    if not profile_id.isalnum():
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.speedscope.json" if kind == "speedscope" else f"{profile_id}.json")
+    return path if os.path.exists(path) else None
+
+
+def _requested_token(scope) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == b"x-profile":
+            return v.decode("latin-1")
+    qs = scope.get("query_string") or b""
+    if b"profile=" in qs:
+        return (parse_qs(qs.decode("latin-1")).get("profile") or [None])[0]
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not check_token(_requested_token(scope)):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        state = {"status": 500, "body_done": False, "respond_at": None, "sent_at": None}
+
+        async def timed_receive():
+            message = await receive()
+            if message["type"] == "http.request" and not message.get("more_body") and not state["body_done"]:
+                state["body_done"] = True
+                profile.add_stage("upload", profile.t0, time.perf_counter())
+            return message
+
+        async def tagged_send(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["respond_at"] = time.perf_counter()
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                state["sent_at"] = time.perf_counter()   # background tasks run after this
+
+        token = _current.set(profile)
+        profile.enlist()   # the event-loop thread, for the whole request
+        profile.sampler.start()
+        try:
+            await self.app(scope, timed_receive, tagged_send)
+        finally:
+            end = time.perf_counter()
+            profile.sampler.stop()
+            profile.discharge()
+            _current.reset(token)
+            if state["respond_at"] is not None:
+                profile.add_stage("respond", state["respond_at"], state["sent_at"] or end)
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            meta = profile.save(route, state["status"], end)
+            print(f"[Profile] {profile.method} {route} -> {profile.id} ({meta['total_ms']} ms, {meta['samples']} samples)")
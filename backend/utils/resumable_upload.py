@@ -0,0 +1,302 @@
+# backend/utils/resumable_upload.py
+"""
+Resumable uploads: create -> PATCH chunks at byte offsets -> finalize.
+
+- create() preallocates <id>.part at the declared size (posix_fallocate where
+  available), so chunks are pwrite()n straight into place, in any order and
+  from parallel connections, and a full disk fails up front, not at 90%
+- every chunk carries a SHA-256 that is checked before its byte range counts as
+  received; a bad chunk is simply sent again (its bytes get overwritten)
+- state lives next to the data in <id>.json (atomic replace), so an upload
+  survives a restart and the client can ask which ranges are still missing
+- finalize() checks the file is fully covered (and the whole-file SHA-256 if
+  given), then renames it to <id>.bin; from then on any tool can open it by
+  upload_id until UPLOAD_TTL_SEC after its last use
+- since create() reserves disk before a byte arrives, it is capped: per caller
+  (user or client IP) at UPLOAD_CALLER_MAX_OPEN unfinished sessions and
+  UPLOAD_CALLER_QUOTA_MB on disk (429), and in total at UPLOAD_MAX_OPEN
+  unfinished sessions (429) and UPLOAD_QUOTA_MB on disk (507)
+"""
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from typing import List, Optional
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "cache/uploads")
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "2048"))
+UPLOAD_CHUNK_MAX_MB = int(os.getenv("UPLOAD_CHUNK_MAX_MB", "16"))
+UPLOAD_TTL_SEC = float(os.getenv("UPLOAD_TTL_SEC", str(24 * 3600)))
+UPLOAD_QUOTA_MB = int(os.getenv("UPLOAD_QUOTA_MB", "10240"))                  # every upload on disk, 0 = unbounded
+UPLOAD_MAX_OPEN = int(os.getenv("UPLOAD_MAX_OPEN", "64"))                     # unfinished sessions, all callers
+UPLOAD_CALLER_QUOTA_MB = int(os.getenv("UPLOAD_CALLER_QUOTA_MB", str(UPLOAD_MAX_MB)))
+UPLOAD_CALLER_MAX_OPEN = int(os.getenv("UPLOAD_CALLER_MAX_OPEN", "8"))
+
+
+class UploadError(Exception):
+    """`status` is the HTTP status the API should answer with."""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _merge(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    """Add [start, end) to sorted, non-overlapping ranges."""
+    out = []
+    for s, e in sorted(ranges + [[start, end]]):
+        if out and s <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], e)
+        else:
+            out.append([s, e])
+    return out
+
+
+def _missing(ranges: List[List[int]], size: int) -> List[List[int]]:
+    gaps, pos = [], 0
+    for s, e in ranges:
+        if s > pos:
+            gaps.append([pos, s])
+        pos = max(pos, e)
+    if pos < size:
+        gaps.append([pos, size])
+    return gaps
+
+
+class UploadStore:
+    def __init__(self, directory: str = UPLOAD_DIR, max_bytes: int = UPLOAD_MAX_MB * 1024 * 1024,
+                 ttl: float = UPLOAD_TTL_SEC, quota_bytes: int = UPLOAD_QUOTA_MB * 1024 * 1024,
+                 max_open: int = UPLOAD_MAX_OPEN, caller_quota_bytes: int = UPLOAD_CALLER_QUOTA_MB * 1024 * 1024,
+                 caller_max_open: int = UPLOAD_CALLER_MAX_OPEN):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.quota_bytes = quota_bytes              # 0 = unbounded, like the other limits
+        self.max_open = max_open
+        self.caller_quota_bytes = caller_quota_bytes
+        self.caller_max_open = caller_max_open
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()        # usage check + reservation as one step
+        self._locks: dict = {}  # upload id -> lock serialising its metadata updates
+
+    # ---- paths / metadata ----
+    def _path(self, upload_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.{ext}")
+
+    def _id_lock(self, upload_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _read_meta(self, upload_id: str) -> dict:
+        if not upload_id.isalnum():
+            raise UploadError(404, "Unknown upload_id")
+        try:
+            with open(self._path(upload_id, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadError(404, "Unknown upload_id")
+
+    def _write_meta(self, meta: dict):
+        path = self._path(meta["id"], "json")
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def status(meta: dict) -> dict:
+        received = sum(e - s for s, e in meta["ranges"])
+        contiguous = meta["ranges"][0][1] if meta["ranges"] and meta["ranges"][0][0] == 0 else 0
+        return {
+            "upload_id": meta["id"],
+            "filename": meta["filename"],
+            "content_type": meta["content_type"],
+            "size": meta["size"],
+            "received": received,
+            "offset": contiguous,                       # resume point for strictly sequential clients
+            "missing": _missing(meta["ranges"], meta["size"]),
+            "complete": meta["complete"],
+            "sha256": meta.get("sha256"),
+            "expires_at": meta["touched_at"] + meta["ttl"],
+        }
+
+    def usage(self, owner: Optional[str] = None) -> dict:
+        """Bytes reserved / unfinished sessions, overall and for `owner`; expired uploads are dropped on the way."""
+        out = {"bytes": 0, "open": 0, "owner_bytes": 0, "owner_open": 0}
+        if not os.path.isdir(self.directory):
+            return out
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                meta = self._read_meta(entry.name[:-5])
+            except UploadError:
+                continue
+            if now - meta["touched_at"] > meta["ttl"]:
+                self.delete(meta["id"])
+                continue
+            mine = owner is not None and meta.get("owner") == owner
+            out["bytes"] += meta["size"]
+            out["owner_bytes"] += meta["size"] if mine else 0
+            if not meta["complete"]:
+                out["open"] += 1
+                out["owner_open"] += 1 if mine else 0
+        return out
+
+    def _check_quota(self, size: int, owner: Optional[str]):
+        used = self.usage(owner)
+        mb = lambda n: n // (1024 * 1024)  # noqa: E731
+        if owner is not None:
+            if self.caller_max_open and used["owner_open"] >= self.caller_max_open:
+                raise UploadError(429, f"Too many unfinished uploads (max {self.caller_max_open}); "
+                                       f"finalize or delete one first")
+            if self.caller_quota_bytes and used["owner_bytes"] + size > self.caller_quota_bytes:
+                raise UploadError(429, f"Upload quota of {mb(self.caller_quota_bytes)} MB per caller reached")
+        if self.max_open and used["open"] >= self.max_open:
+            raise UploadError(429, "Too many uploads in progress, please retry later")
+        if self.quota_bytes and used["bytes"] + size > self.quota_bytes:
+            raise UploadError(507, "Upload storage is full, please retry later")
+
+    # ---- protocol ----
+    def create(self, size: int, filename: str = "", content_type: str = "application/octet-stream",
+               sha256: Optional[str] = None, owner: Optional[str] = None) -> dict:
+        """Reserve `size` bytes for a new upload. `owner` (a user or client key) is what the per-caller limits count."""
+        if size <= 0:
+            raise UploadError(400, "size must be positive")
+        if size > self.max_bytes:
+            raise UploadError(413, f"Upload exceeds {self.max_bytes // (1024 * 1024)} MB")
+        os.makedirs(self.directory, exist_ok=True)
+        with self._create_lock:
+            self._check_quota(size, owner)
+            return self._create(size, filename, content_type, sha256, owner)
+
+    def _create(self, size: int, filename: str, content_type: str, sha256: Optional[str],
+                owner: Optional[str]) -> dict:
+        upload_id = secrets.token_hex(16)
+        fd = os.open(self._path(upload_id, "part"), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, size)
+            else:
+                os.ftruncate(fd, size)
+        except OSError as e:
+            os.close(fd)
+            os.remove(self._path(upload_id, "part"))
+            raise UploadError(507, f"Cannot reserve {size} bytes: {e}")
+        os.close(fd)
+        now = time.time()
+        meta = {
+            "id": upload_id,
+            "filename": os.path.basename(filename or "upload"),
+            "content_type": content_type or "application/octet-stream",
+            "size": size,
+            "expect_sha256": (sha256 or "").lower() or None,
+            "owner": owner,
+            "ranges": [],
+            "complete": False,
+            "created_at": now,
+            "touched_at": now,
+            "ttl": self.ttl,
+        }
+        self._write_meta(meta)
+        return self.status(meta)
+
+    def write_chunk(self, upload_id: str, offset: int, data: bytes, sha256: str) -> dict:
+        meta = self._read_meta(upload_id)
+        if meta["complete"]:
+            raise UploadError(409, "Upload already finalized")
+        if offset < 0 or offset + len(data) > meta["size"]:
+            raise UploadError(416, f"Chunk [{offset}, {offset + len(data)}) outside 0..{meta['size']}")
+        if hashlib.sha256(data).hexdigest() != (sha256 or "").lower():
+            raise UploadError(400, "Chunk checksum mismatch")
+
+        try:
+            fd = os.open(self._path(upload_id, "part"), os.O_WRONLY)
+        except FileNotFoundError:   # finalized (or deleted) since we read the metadata
+            raise UploadError(409, "Upload already finalized")
+        try:
+            view, pos = memoryview(data), 0
+            while pos < len(data):
+                pos += os.pwrite(fd, view[pos:], offset + pos)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        with self._id_lock(upload_id):
+            meta = self._read_meta(upload_id)
+            meta["ranges"] = _merge(meta["ranges"], offset, offset + len(data))
+            meta["touched_at"] = time.time()
+            self._write_meta(meta)
+        return self.status(meta)
+
+    def finalize(self, upload_id: str) -> dict:
+        with self._id_lock(upload_id):
+            meta = self._read_meta(upload_id)
+            if meta["complete"]:
+                return self.status(meta)
+            missing = _missing(meta["ranges"], meta["size"])
+            if missing:
+                raise UploadError(409, f"Upload incomplete, missing byte ranges {missing[:10]}")
+            digest = hashlib.sha256()
+            with open(self._path(upload_id, "part"), "rb") as f:
+                while block := f.read(1024 * 1024):
+                    digest.update(block)
+            meta["sha256"] = digest.hexdigest()
+            if meta["expect_sha256"] and meta["expect_sha256"] != meta["sha256"]:
+                # every chunk matched its own checksum, so the client declared the wrong file
+                raise UploadError(400, "File checksum mismatch")
+            os.replace(self._path(upload_id, "part"), self._path(upload_id, "bin"))
+            meta["complete"] = True
+            meta["touched_at"] = time.time()
+            self._write_meta(meta)
+        return self.status(meta)
+
+    def get(self, upload_id: str) -> dict:
+        return self.status(self._read_meta(upload_id))
+
+    def open(self, upload_id: str):
+        """(binary file object, metadata) of a finalized upload; bumps its TTL."""
+        with self._id_lock(upload_id):
+            meta = self._read_meta(upload_id)
+            if not meta["complete"]:
+                raise UploadError(409, "Upload not finalized")
+            meta["touched_at"] = time.time()
+            self._write_meta(meta)
+        return open(self._path(upload_id, "bin"), "rb"), meta
+
+    def delete(self, upload_id: str):
+        with self._id_lock(upload_id):
+            self._read_meta(upload_id)
+            for ext in ("part", "bin", "json"):
+                try:
+                    os.remove(self._path(upload_id, ext))
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._locks.pop(upload_id, None)
+
+    def cleanup(self, now: Optional[float] = None) -> int:
+        """Drop uploads (finished or not) untouched for longer than their TTL."""
+        now = time.time() if now is None else now
+        if not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json"):
+                continue
+            upload_id = entry.name[:-5]
+            try:
+                meta = self._read_meta(upload_id)
+            except UploadError:
+                continue
+            if now - meta["touched_at"] > meta["ttl"]:
+                self.delete(upload_id)
+                removed += 1
+        return removed
+
+
+upload_store = UploadStore()
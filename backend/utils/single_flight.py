@@ -0,0 +1,51 @@
+# backend/utils/single_flight.py
+"""
+Collapse concurrent identical work into one call.
+
+The first caller for a key starts `fn` as its own task; everyone arriving
+while it is in flight (the first caller included) awaits the same result (or
+exception). The leader only awaits it through asyncio.shield, so a leader
+whose client disconnects is cancelled alone and the others still get the
+result. Built on concurrent.futures so it also works across threads/event
+loops.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._tasks: set = set()   # the loop keeps only weak references to tasks
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        with self._lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+
+        if not leader:
+            return await asyncio.wrap_future(fut)
+
+        task = asyncio.get_running_loop().create_task(fn())   # not tied to the leader's request
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._settle(key, fut, t))
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, fut: Future, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            fut.cancel()
+        elif task.exception() is not None:
+            fut.set_exception(task.exception())
+        else:
+            fut.set_result(task.result())
+        with self._lock:
+            self._inflight.pop(key, None)
@@ -1,9 +1,94 @@
+# backend/utils/speech_to_text.py
+# faster-whisper model shared by /transcribe/local and /meeting-mom
+import os
+import time
+from typing import Optional
 
+from utils import lazy_imports
+from utils.audio_pipeline import ASR_WORKERS, transcribe_parallel, transcribe_stream
+from utils.metrics import observe_asr
+from utils.transcript_cache import asr_cache, fingerprint, transcript_key
+from utils.whisper_registry import WhisperRegistry, resolve
 
-import speech_recognition as sr
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
+WHISPER_BEAM = int(os.getenv("WHISPER_BEAM", "1"))
+WHISPER_COMPUTE = os.getenv("WHISPER_COMPUTE", "cpu")              # device
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
 
-def audio_to_text(audio_path: str) -> str:
-    r = sr.Recognizer()
-    with sr.AudioFile(audio_path) as source:
-        audio = r.record(source)
-    return r.recognize_google(audio)
\ No newline at end of file
+whisper_model = None   # the default model, pinned in the registry
+
+def build_whisper(workers: int = ASR_WORKERS, model_name: str = WHISPER_MODEL, compute_type: str = WHISPER_COMPUTE_TYPE):
+    """num_workers lets that many threads transcribe at once; the cores are split between them."""
+    from faster_whisper import WhisperModel
+    workers = max(1, workers)
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    return WhisperModel(model_name, device=WHISPER_COMPUTE, compute_type=compute_type,
+                        cpu_threads=cpu_threads, num_workers=workers)
+
+registry = WhisperRegistry(lambda name, compute_type: build_whisper(ASR_WORKERS, name, compute_type))
+
+def load_whisper():
+    global whisper_model
+    try:
+        whisper_model = registry.get(WHISPER_MODEL, WHISPER_COMPUTE_TYPE, pin=True)
+        lazy_imports.mark_ready("asr")   # also when a request loads it (warm-up off, or it failed earlier)
+        print(f"[Whisper] Default model='{WHISPER_MODEL}' device='{WHISPER_COMPUTE}' workers={ASR_WORKERS}")
+    except Exception as e:
+        whisper_model = None
+        print(f"[WARN] Faster-Whisper init failed: {e}")
+    return whisper_model
+
+def get_whisper():
+    return whisper_model
+
+def ensure_whisper():
+    """Default model, loading it now if the background warm-up hasn't yet (or failed)."""
+    return whisper_model or load_whisper()
+
+def transcribe(source, beam_size: int = WHISPER_BEAM, model=None, parallel: bool = ASR_WORKERS > 1) -> dict:
+    """Sequential chunked decode, or the VAD + parallel-window long-audio mode."""
+    model = model or ensure_whisper()
+    if model is None:
+        raise RuntimeError("Whisper not loaded")
+    if parallel:
+        return transcribe_parallel(model, source, beam_size=beam_size)
+    return transcribe_stream(model, source, beam_size=beam_size)
+
+def resolve_model(model: Optional[str] = None, compute_type: Optional[str] = None):
+    """Request params -> (model name, compute type); None means the configured default."""
+    name = WHISPER_MODEL if model in (None, "", "default") else model
+    compute_type = compute_type or WHISPER_COMPUTE_TYPE
+    if name == WHISPER_MODEL and compute_type == WHISPER_COMPUTE_TYPE:
+        return name, compute_type
+    return resolve(name, compute_type)
+
+def is_default(model_name: str, compute_type: str) -> bool:
+    return (model_name, compute_type) == (WHISPER_MODEL, WHISPER_COMPUTE_TYPE)
+
+def transcribe_with(model_name: str, compute_type: str, source, beam_size: int = WHISPER_BEAM,
+                    parallel: bool = ASR_WORKERS > 1) -> dict:
+    """Run on a registry model (loaded on demand, leased so it can't be evicted mid-file)."""
+    if is_default(model_name, compute_type):
+        model = ensure_whisper()
+        t0 = time.perf_counter()   # decode time only, not the model load
+        result = transcribe(source, beam_size=beam_size, model=model, parallel=parallel)
+    else:
+        with registry.lease(model_name, compute_type) as model:
+            t0 = time.perf_counter()
+            result = transcribe(source, beam_size=beam_size, model=model, parallel=parallel)
+    observe_asr(model_name, "parallel" if parallel else "sequential", time.perf_counter() - t0, result["duration"])
+    return result
+
+def transcribe_cached(source, beam_size: int = WHISPER_BEAM, parallel: bool = ASR_WORKERS > 1):
+    """transcribe() with the on-disk cache in front. Returns (result, cache_hit)."""
+    key = transcript_key(fingerprint(source), f"{WHISPER_MODEL}/{WHISPER_COMPUTE_TYPE}", beam_size, parallel)
+    hit = asr_cache.get(key)
+    if hit is not None:
+        return hit, True
+    result = transcribe_with(WHISPER_MODEL, WHISPER_COMPUTE_TYPE, source, beam_size=beam_size, parallel=parallel)
+    asr_cache.set(key, result)
+    return result, False
+
+def audio_to_text(source, beam_size: int = WHISPER_BEAM) -> str:
+    """Path or file object (audio or video) -> transcript, streamed through ffmpeg, no temp WAV."""
+    return transcribe_cached(source, beam_size=beam_size)[0]["text"]
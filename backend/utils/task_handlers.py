@@ -0,0 +1,85 @@
+# backend/utils/task_handlers.py
+"""
+What a worker can run. Each handler takes (input path, params, output dir)
+and returns (result dict, artifact file name or None); the artifact is written
+into the output dir, which lives on the shared TASK_DIR volume.
+
+Only converter / model code is imported here (lazily), never the web app, so
+`python worker.py` stays small. Bad input raises TaskError (no retry).
+"""
+import os
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.lazy_imports import lazy
+from utils.task_queue import TaskError
+
+pdf2docx = lazy("pdf2docx", "pdf_to_word")
+
+Handler = Callable[[str, dict, str], Tuple[Optional[dict], Optional[str]]]
+
+
+def pdf_to_word(path: str, params: dict, out_dir: str):
+    cv = pdf2docx.Converter(path)
+    try:
+        cv.convert(os.path.join(out_dir, "converted.docx"), start=0, end=None)
+    finally:
+        cv.close()
+    return None, "converted.docx"
+
+
+def pdf_optimize(path: str, params: dict, out_dir: str):
+    from utils.pdf_optimize import PDF_OPT_DPI, PDF_OPT_QUALITY, optimize_pdf
+
+    try:
+        dpi, quality = int(params.get("dpi", PDF_OPT_DPI)), int(params.get("quality", PDF_OPT_QUALITY))
+    except (TypeError, ValueError):
+        raise TaskError("dpi and quality must be integers")
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        out, report = optimize_pdf(data, dpi=dpi, quality=quality)
+    except ValueError as e:
+        raise TaskError(str(e))
+    with open(os.path.join(out_dir, "optimized.pdf"), "wb") as f:
+        f.write(out)
+    return report, "optimized.pdf"
+
+
+def pdf_split_many(path: str, params: dict, out_dir: str):
+    from utils.pdf_split_many import SplitError, plan_file, splitter
+
+    try:
+        every, level = int(params.get("every", 1)), int(params.get("level", 1))
+    except (TypeError, ValueError):
+        raise TaskError("every and level must be integers")
+    try:
+        parts = plan_file(path, params.get("mode", "every"), every, level, params.get("pages"))
+    except SplitError as e:
+        raise TaskError(e.detail)
+    with open(os.path.join(out_dir, "split.zip"), "wb") as f:
+        for block in splitter.iter_zip(path, parts):
+            f.write(block)
+    return {"parts": len(parts)}, "split.zip"
+
+
+def transcribe(path: str, params: dict, out_dir: str):
+    from utils.audio_pipeline import ASR_WORKERS, AudioDecodeError
+    from utils.speech_to_text import WHISPER_BEAM, resolve_model, transcribe_with
+
+    try:
+        model_name, compute = resolve_model(params.get("model"), params.get("compute_type"))
+    except ValueError as e:
+        raise TaskError(str(e))
+    parallel = params.get("mode", "auto") == "parallel" or (params.get("mode", "auto") == "auto" and ASR_WORKERS > 1)
+    try:
+        return transcribe_with(model_name, compute, path, WHISPER_BEAM, parallel), None
+    except AudioDecodeError as e:
+        raise TaskError(str(e))
+
+
+HANDLERS: Dict[str, Handler] = {
+    "pdf-to-word": pdf_to_word,
+    "pdf-optimize": pdf_optimize,
+    "pdf-split-many": pdf_split_many,
+    "transcribe": transcribe,
+}
@@ -0,0 +1,187 @@
+# backend/utils/task_queue.py
+"""
+Task queue in the app database, drained by `python worker.py` processes.
+
+The web node stores the input under TASK_DIR/<id>/ and inserts a row; any
+number of workers (other machines included, as long as TASK_DIR is a shared
+volume) claim rows with
+
+    UPDATE tasks SET status = 'running', ... WHERE id =
+        (SELECT id FROM tasks WHERE status = 'queued' ORDER BY created_at
+         LIMIT 1 FOR UPDATE SKIP LOCKED)
+    RETURNING ...
+
+so two workers never get the same task and never wait on each other's row
+locks. SQLite has no row locks (the clause is dropped) but serialises writers,
+which makes the same statement safe there: tests and single-box setups need no
+Postgres.
+
+A running task's worker bumps heartbeat_at every TASK_HEARTBEAT_SEC. reclaim()
+(run by every worker between claims) puts tasks whose heartbeat is older than
+TASK_STALE_SEC back in the queue, or fails them once max_attempts is used up.
+complete()/fail() only apply while the caller still owns the task, so a worker
+that lost its task to a reclaim can't overwrite the new owner's result. Each
+attempt writes into its own TASK_DIR/<id>/out.<attempt>/ (out_dir()), so a lost
+worker that is still running can't clobber the new owner's files either;
+complete() records which directory won.
+"""
+import json
+import os
+import secrets
+import shutil
+import time
+from typing import BinaryIO, Iterable, Optional
+
+from sqlalchemy import delete, select, update
+
+from models import Task
+
+TASK_DIR = os.getenv("TASK_DIR", "cache/tasks")
+TASK_HEARTBEAT_SEC = float(os.getenv("TASK_HEARTBEAT_SEC", "10"))
+TASK_STALE_SEC = float(os.getenv("TASK_STALE_SEC", "60"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_TTL_SEC = float(os.getenv("TASK_TTL_SEC", str(24 * 3600)))
+
+tasks = Task.__table__
+
+
+class TaskError(Exception):
+    """Permanent failure (bad input / params): the task fails without being retried."""
+
+
+def task_dir(task_id: str) -> str:
+    return os.path.join(TASK_DIR, task_id)
+
+
+def input_path(task: dict) -> Optional[str]:
+    return os.path.join(task_dir(task["id"]), "input", task["filename"]) if task.get("filename") else None
+
+
+def out_dir(task: dict) -> str:
+    """Output directory of the attempt that claimed `task` (attempts is bumped by every claim)."""
+    return os.path.join(task_dir(task["id"]), f"out.{task['attempts']}")
+
+
+def artifact_path(task: dict) -> Optional[str]:
+    if not task.get("artifact"):
+        return None
+    if "/" not in task["artifact"]:   # rows completed before per-attempt directories
+        return os.path.join(task_dir(task["id"]), "out", task["artifact"])
+    return os.path.join(task_dir(task["id"]), *task["artifact"].split("/"))
+
+
+def artifact_name(task: dict) -> Optional[str]:
+    return task["artifact"].rsplit("/", 1)[-1] if task.get("artifact") else None
+
+
+def public(task: dict) -> dict:
+    """What GET /tasks/{id} shows."""
+    return {
+        "task_id": task["id"],
+        "kind": task["kind"],
+        "status": task["status"],
+        "attempts": task["attempts"],
+        "result": json.loads(task["result"]) if task["result"] else None,
+        "error": task["error"],
+        "artifact": artifact_name(task),
+        "created_at": task["created_at"],
+        "finished_at": task["finished_at"],
+    }
+
+
+def enqueue(engine, kind: str, params: Optional[dict] = None, source: Optional[BinaryIO] = None,
+            filename: str = "input", max_attempts: int = TASK_MAX_ATTEMPTS) -> str:
+    task_id = secrets.token_hex(16)
+    filename = os.path.basename(filename or "input")
+    if source is not None:
+        os.makedirs(os.path.join(task_dir(task_id), "input"), exist_ok=True)
+        with open(os.path.join(task_dir(task_id), "input", filename), "wb") as f:
+            shutil.copyfileobj(source, f, 1024 * 1024)
+    with engine.begin() as conn:   # the row goes in after the file, so no worker can claim a half-written input
+        conn.execute(tasks.insert().values(
+            id=task_id, kind=kind, status="queued", params=json.dumps(params or {}),
+            filename=filename if source is not None else None, attempts=0, max_attempts=max_attempts,
+            created_at=time.time()))
+    return task_id
+
+
+def get(engine, task_id: str) -> Optional[dict]:
+    with engine.connect() as conn:
+        row = conn.execute(select(tasks).where(tasks.c.id == task_id)).mappings().first()
+    return dict(row) if row else None
+
+
+def claim(engine, worker_id: str, kinds: Optional[Iterable[str]] = None) -> Optional[dict]:
+    """Oldest queued task (of `kinds`), now running and owned by worker_id; None if the queue is empty."""
+    pick = select(tasks.c.id).where(tasks.c.status == "queued")
+    if kinds:
+        pick = pick.where(tasks.c.kind.in_(list(kinds)))
+    pick = pick.order_by(tasks.c.created_at).limit(1).with_for_update(skip_locked=True).scalar_subquery()
+    now = time.time()
+    with engine.begin() as conn:
+        row = conn.execute(
+            update(tasks)
+            .where(tasks.c.id == pick, tasks.c.status == "queued")
+            .values(status="running", worker_id=worker_id, started_at=now, heartbeat_at=now,
+                    attempts=tasks.c.attempts + 1)
+            .returning(*tasks.c)
+        ).mappings().first()
+    return dict(row) if row else None
+
+
+def _owned(task_id: str, worker_id: str):
+    return (tasks.c.id == task_id, tasks.c.worker_id == worker_id, tasks.c.status == "running")
+
+
+def heartbeat(engine, task_id: str, worker_id: str) -> bool:
+    """False once the task was reclaimed by someone else."""
+    with engine.begin() as conn:
+        return conn.execute(update(tasks).where(*_owned(task_id, worker_id))
+                            .values(heartbeat_at=time.time())).rowcount == 1
+
+
+def complete(engine, task_id: str, worker_id: str, result: Optional[dict] = None,
+             artifact: Optional[str] = None, out_dir: Optional[str] = None) -> bool:
+    """`artifact` is a file name in `out_dir`, the winning attempt's directory (stored as "<dir>/<name>")."""
+    if artifact and out_dir:
+        artifact = f"{os.path.basename(os.path.normpath(out_dir))}/{artifact}"
+    with engine.begin() as conn:
+        return conn.execute(update(tasks).where(*_owned(task_id, worker_id)).values(
+            status="done", result=json.dumps(result) if result is not None else None, artifact=artifact,
+            error=None, finished_at=time.time())).rowcount == 1
+
+
+def fail(engine, task_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+    """Back to the queue while attempts remain (and retry is allowed), else failed."""
+    retry_stmt = (update(tasks).where(*_owned(task_id, worker_id), tasks.c.attempts < tasks.c.max_attempts)
+                  .values(status="queued", worker_id=None, error=error))
+    fail_stmt = (update(tasks).where(*_owned(task_id, worker_id))
+                 .values(status="failed", error=error, finished_at=time.time()))
+    with engine.begin() as conn:
+        if retry and conn.execute(retry_stmt).rowcount:
+            return True
+        return conn.execute(fail_stmt).rowcount == 1
+
+
+def reclaim(engine, stale_sec: float = TASK_STALE_SEC) -> int:
+    """Requeue (or fail, when out of attempts) running tasks whose worker stopped heartbeating."""
+    now = time.time()
+    stale = (tasks.c.status == "running", tasks.c.heartbeat_at < now - stale_sec)
+    with engine.begin() as conn:
+        requeued = conn.execute(update(tasks).where(*stale, tasks.c.attempts < tasks.c.max_attempts)
+                                .values(status="queued", worker_id=None, error="worker lost")).rowcount
+        failed = conn.execute(update(tasks).where(*stale).values(
+            status="failed", error="worker lost on the last attempt", finished_at=now)).rowcount
+    return requeued + failed
+
+
+def purge(engine, ttl: float = TASK_TTL_SEC) -> int:
+    """Delete finished tasks (row and files) older than the TTL."""
+    old = (tasks.c.status.in_(("done", "failed")), tasks.c.finished_at < time.time() - ttl)
+    with engine.begin() as conn:
+        ids = [r[0] for r in conn.execute(select(tasks.c.id).where(*old))]
+        if ids:
+            conn.execute(delete(tasks).where(tasks.c.id.in_(ids)))
+    for task_id in ids:
+        shutil.rmtree(task_dir(task_id), ignore_errors=True)
+    return len(ids)
@@ -0,0 +1,123 @@
+# backend/utils/thumbnails.py
+"""
+Low-resolution page thumbnails for page pickers.
+
+Pages are rendered with PyMuPDF at the requested width and encoded as WebP
+(Pillow) or JPEG, then kept in a BlobCache keyed by (doc sha256, page, width,
+format, quality). The doc_id is the content hash, so a cached thumbnail never
+goes stale and can be served with an immutable Cache-Control.
+
+PyMuPDF holds the GIL while rendering, so threads don't help: with
+THUMB_WORKERS > 1, missing pages are rendered in a spawn-based process pool
+whose workers keep their last few documents open. With one worker (or one
+core) they are rendered in-process from the session's already-open document.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+from utils.disk_cache import BlobCache
+from utils.doc_sessions import DocumentError, select_pages
+from utils.lazy_imports import lazy
+
+fitz = lazy("fitz", "pdf")  # PyMuPDF
+
+THUMB_DIR = os.getenv("THUMB_DIR", "cache/thumbs")
+THUMB_CACHE_MAX_MB = int(os.getenv("THUMB_CACHE_MAX_MB", "256"))
+THUMB_WORKERS = int(os.getenv("THUMB_WORKERS", str(min(4, os.cpu_count() or 1))))
+THUMB_WIDTHS = (96, 160, 240, 320, 480)       # fixed steps keep the cache hit rate up
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+thumb_cache = BlobCache(THUMB_DIR, max_bytes=THUMB_CACHE_MAX_MB * 1024 * 1024)
+
+
+def snap_width(width: int) -> int:
+    return next((w for w in THUMB_WIDTHS if w >= width), THUMB_WIDTHS[-1])
+
+
+def thumb_key(doc_id: str, index: int, width: int, fmt: str, quality: int) -> str:
+    return f"{doc_id}-p{index + 1}-w{width}-q{quality}.{fmt}"
+
+
+def render_page(page, width: int, fmt: str, quality: int) -> bytes:
+    zoom = width / page.rect.width
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    if fmt == "jpeg":
+        return pix.tobytes("jpeg", jpg_quality=quality)
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.frombytes("RGB", (pix.width, pix.height), pix.samples).save(buf, "WEBP", quality=quality, method=4)
+    return buf.getvalue()
+
+
+# ---- process pool side ----
+_worker_docs: "OrderedDict[str, object]" = OrderedDict()
+
+
+def _render_in_worker(path: str, index: int, width: int, fmt: str, quality: int) -> bytes:
+    doc = _worker_docs.get(path)
+    if doc is None:
+        doc = _worker_docs[path] = fitz.open(path)
+        if len(_worker_docs) > 4:
+            _worker_docs.popitem(last=False)[1].close()
+    _worker_docs.move_to_end(path)
+    return render_page(doc.load_page(index), width, fmt, quality)
+
+
+class ThumbnailRenderer:
+    def __init__(self, workers: int = THUMB_WORKERS, cache: BlobCache = thumb_cache):
+        self.workers = workers
+        self.cache = cache
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def render(self, doc, pages: str, width: int, fmt: str = "webp", quality: int = 70,
+               limit: int = 0) -> Dict[int, bytes]:
+        """{page index: image bytes} for a DocSession and page selection, from cache or rendered in parallel."""
+        with doc.lock:
+            pdf = doc.fitz_doc
+            if pdf.needs_pass:
+                raise DocumentError(400, "Document is encrypted; unlock it first")
+            indexes = select_pages(pages, pdf.page_count)
+        if limit and len(indexes) > limit:
+            raise DocumentError(400, f"At most {limit} thumbnails per request")
+        out, missing = {}, []
+        for i in dict.fromkeys(indexes):
+            hit = self.cache.get(thumb_key(doc.doc_id, i, width, fmt, quality))
+            if hit is not None:
+                out[i] = hit
+            else:
+                missing.append(i)
+
+        if len(missing) > 1 and self.workers > 1:
+            pool = self._executor()
+            futures = {i: pool.submit(_render_in_worker, doc.path, i, width, fmt, quality) for i in missing}
+            rendered = {i: f.result() for i, f in futures.items()}
+        else:
+            with doc.lock:
+                pdf = doc.fitz_doc
+                rendered = {i: render_page(pdf.load_page(i), width, fmt, quality) for i in missing}
+
+        for i, data in rendered.items():
+            self.cache.set(thumb_key(doc.doc_id, i, width, fmt, quality), data)
+        out.update(rendered)
+        return out
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+thumbnails = ThumbnailRenderer()
@@ -0,0 +1,49 @@
+# backend/utils/transcript_cache.py
+"""
+Transcription results on local disk, keyed by audio fingerprint.
+
+Key = sha256(raw upload bytes + model + beam + decode settings). Hashing the
+raw bytes costs one sequential read and no decoding, so a retry or a re-run of
+the same recording is answered before ffmpeg or Whisper are touched. Entries
+are the {text, segments, duration} dicts the endpoints return; DiskCache keeps
+them under an LRU byte budget.
+"""
+import hashlib
+import json
+import os
+from typing import BinaryIO, Union
+
+from utils.audio_pipeline import CHUNK_SECONDS, VAD_MIN_SILENCE_MS, WINDOW_SECONDS
+from utils.disk_cache import DiskCache
+from utils.single_flight import SingleFlight
+
+asr_cache = DiskCache(
+    os.getenv("ASR_CACHE_DIR", "cache/asr"),
+    ttl=float(os.getenv("ASR_CACHE_TTL_SEC", str(30 * 24 * 3600))),
+    max_bytes=int(os.getenv("ASR_CACHE_MAX_MB", "256")) * 1024 * 1024,
+)
+asr_flights = SingleFlight()
+
+_BLOCK = 1024 * 1024
+
+
+def fingerprint(source: Union[str, BinaryIO]) -> str:
+    """sha256 of the raw bytes; file objects are rewound afterwards."""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            while block := f.read(_BLOCK):
+                digest.update(block)
+        return digest.hexdigest()
+    source.seek(0)
+    while block := source.read(_BLOCK):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def transcript_key(digest: str, model_name: str, beam_size: int, parallel: bool) -> str:
+    # chunk/VAD settings move segment boundaries, so they are part of the key
+    settings = [CHUNK_SECONDS, VAD_MIN_SILENCE_MS, WINDOW_SECONDS] if parallel else [CHUNK_SECONDS]
+    payload = json.dumps([digest, model_name, beam_size, parallel, settings], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,195 @@
+# backend/utils/whisper_registry.py
+"""
+Whisper models by tier, loaded on first use and kept in an LRU under a RAM budget.
+
+- tier names (tiny/base/small/medium/large) map to faster-whisper model names;
+  full names are accepted too
+- one entry per (model, compute_type); the loader runs outside the registry lock
+  and at most once per key, concurrent callers wait for it
+- after a load, least recently used unpinned, unleased entries are dropped until
+  the budget fits; evict_idle() drops entries unused for WHISPER_IDLE_SEC
+- stats() reports load time, memory and usage per model
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+TIERS = {
+    "tiny": "tiny.en",
+    "base": "base.en",
+    "small": "small.en",
+    "medium": "medium.en",
+    "large": "large-v3",
+}
+# int8 CPU footprint, used when RSS can't be measured (or the measurement is noise)
+EST_MB = {"tiny": 120, "base": 200, "small": 550, "medium": 1500, "large": 3200}
+COMPUTE_TYPES = ("int8", "int8_float32", "int8_float16", "int16", "float16", "float32")
+
+WHISPER_RAM_BUDGET_MB = int(os.getenv("WHISPER_RAM_BUDGET_MB", "2048"))
+WHISPER_IDLE_SEC = float(os.getenv("WHISPER_IDLE_SEC", "1800"))
+
+
+def resolve(model: str, compute_type: str) -> Tuple[str, str]:
+    """tier or faster-whisper name + compute type -> (model name, compute type); ValueError if unknown."""
+    name = TIERS.get(model, model)
+    if name not in TIERS.values():
+        raise ValueError(f"unknown Whisper model '{model}' (tiers: {', '.join(TIERS)})")
+    if compute_type not in COMPUTE_TYPES:
+        raise ValueError(f"unknown compute type '{compute_type}' ({', '.join(COMPUTE_TYPES)})")
+    return name, compute_type
+
+
+def _estimate_mb(name: str) -> int:
+    for tier, full in TIERS.items():
+        if full == name:
+            return EST_MB[tier]
+    return EST_MB["small"]
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class _Entry:
+    __slots__ = ("model", "load_sec", "mem_mb", "loaded_at", "last_used", "uses", "refs", "pinned")
+
+    def __init__(self, model, load_sec: float, mem_mb: float, pinned: bool):
+        self.model = model
+        self.load_sec = load_sec
+        self.mem_mb = mem_mb
+        self.loaded_at = self.last_used = time.monotonic()
+        self.uses = 0
+        self.refs = 0
+        self.pinned = pinned
+
+
+class WhisperRegistry:
+    def __init__(self, loader: Callable[[str, str], object], budget_mb: int = WHISPER_RAM_BUDGET_MB,
+                 idle_sec: float = WHISPER_IDLE_SEC, warmup: Optional[Callable[[object], None]] = None):
+        self.loader = loader
+        self.budget_mb = budget_mb
+        self.idle_sec = idle_sec
+        self.warmup = warmup
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._loading: dict = {}  # key -> threading.Lock held while that key loads
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, model: str, compute_type: str, pin: bool = False):
+        """`model` is a faster-whisper name (see resolve() for user input)."""
+        key = (model, compute_type)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.last_used = time.monotonic()
+                    entry.pinned = entry.pinned or pin
+                    return entry.model
+                gate = self._loading.get(key)
+                leader = gate is None
+                if leader:
+                    gate = self._loading[key] = threading.Lock()
+                    gate.acquire()
+            if leader:
+                break
+            with gate:  # someone else is loading this key; wait, then re-check
+                pass
+
+        try:
+            rss0, t0 = _rss_mb(), time.perf_counter()
+            try:
+                loaded = self.loader(*key)
+                if self.warmup:
+                    self.warmup(loaded)
+            except Exception as e:
+                raise RuntimeError(f"loading '{key[0]}' ({key[1]}) failed: {e}") from e
+            load_sec = time.perf_counter() - t0
+            measured = _rss_mb() - rss0
+            mem_mb = measured if measured > 10 else _estimate_mb(key[0])
+            print(f"[Whisper] Loaded model='{key[0]}' compute='{key[1]}' in {load_sec:.1f}s (~{mem_mb:.0f} MB)")
+            with self._lock:
+                self._entries[key] = _Entry(loaded, load_sec, mem_mb, pin)
+                self.loads += 1
+                self._evict_over_budget(keep=key)
+            return loaded
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            gate.release()
+
+    @contextmanager
+    def lease(self, model: str, compute_type: str):
+        """Model guaranteed not to be evicted while the block runs."""
+        key = (model, compute_type)
+        loaded = self.get(model, compute_type)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.refs += 1
+                entry.uses += 1
+        try:
+            yield loaded
+        finally:
+            with self._lock:
+                if entry is not None:
+                    entry.refs -= 1
+                    entry.last_used = time.monotonic()
+
+    def _evictable(self, keep=None):
+        return [k for k, e in self._entries.items() if k != keep and not e.pinned and e.refs == 0]
+
+    def _evict_over_budget(self, keep=None):
+        used = sum(e.mem_mb for e in self._entries.values())
+        for key in self._evictable(keep):  # OrderedDict order == least recently used first
+            if used <= self.budget_mb:
+                break
+            used -= self._entries.pop(key).mem_mb
+            self.evictions += 1
+            print(f"[Whisper] Evicted model='{key[0]}' compute='{key[1]}' (over {self.budget_mb} MB budget)")
+
+    def evict_idle(self, now: Optional[float] = None) -> list:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [k for k in self._evictable() if now - self._entries[k].last_used > self.idle_sec]
+            for key in idle:
+                del self._entries[key]
+                self.evictions += 1
+        for key in idle:
+            print(f"[Whisper] Evicted idle model='{key[0]}' compute='{key[1]}'")
+        return idle
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            loaded = [
+                {
+                    "model": name,
+                    "compute_type": compute_type,
+                    "load_sec": round(e.load_sec, 2),
+                    "memory_mb": round(e.mem_mb, 1),
+                    "uses": e.uses,
+                    "in_use": e.refs,
+                    "idle_sec": round(now - e.last_used, 1),
+                    "pinned": e.pinned,
+                }
+                for (name, compute_type), e in reversed(self._entries.items())
+            ]
+            return {
+                "budget_mb": self.budget_mb,
+                "used_mb": round(sum(e.mem_mb for e in self._entries.values()), 1),
+                "idle_sec": self.idle_sec,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "tiers": TIERS,
+                "compute_types": list(COMPUTE_TYPES),
+                "loaded": loaded,
+            }
@@ -0,0 +1,113 @@
+# worker.py
+# Standalone task worker: claims tasks queued by the web node (POST /tasks) and runs the converters / Whisper.
+#
+#   python worker.py                         # every kind, forever
+#   python worker.py --kinds transcribe      # an ASR-only node
+#   python worker.py --once                  # drain the queue and exit
+#
+# Same image and env as the web node (DATABASE_URL, TASK_DIR on a shared volume); it imports no FastAPI app,
+# so start as many as there are cores to spare: 1 web node + N workers. One task at a time per process.
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from typing import Iterable, Optional
+
+from utils import task_queue
+from utils.task_handlers import HANDLERS
+from utils.task_queue import TASK_HEARTBEAT_SEC, TASK_STALE_SEC, TaskError
+
+TASK_POLL_SEC = float(os.getenv("TASK_POLL_SEC", "1"))
+
+
+class Worker:
+    def __init__(self, engine, kinds: Optional[Iterable[str]] = None, handlers: Optional[dict] = None,
+                 worker_id: Optional[str] = None, heartbeat_sec: float = TASK_HEARTBEAT_SEC,
+                 stale_sec: float = TASK_STALE_SEC):
+        self.engine = engine
+        self.handlers = handlers or HANDLERS
+        self.kinds = list(kinds or self.handlers)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_sec = heartbeat_sec
+        self.stale_sec = stale_sec
+        self.stopping = threading.Event()
+
+    def _beat(self, task_id: str, done: threading.Event):
+        while not done.wait(self.heartbeat_sec):
+            try:
+                if not task_queue.heartbeat(self.engine, task_id, self.worker_id):
+                    print(f"[Worker] Task {task_id} was reclaimed; its result will be dropped")
+                    return
+            except Exception as e:   # a missed beat or two is fine; TASK_STALE_SEC is several beats
+                print(f"[WARN] heartbeat for task {task_id} failed: {e}")
+
+    def run_task(self, task: dict):
+        out_dir = task_queue.out_dir(task)   # per attempt: a reclaimed owner may still be writing its own
+        os.makedirs(out_dir, exist_ok=True)
+        done = threading.Event()
+        beat = threading.Thread(target=self._beat, args=(task["id"], done), daemon=True)
+        beat.start()
+        t0 = time.perf_counter()
+        try:
+            handler = self.handlers[task["kind"]]
+            result, artifact = handler(task_queue.input_path(task), json.loads(task["params"]), out_dir)
+        except TaskError as e:
+            task_queue.fail(self.engine, task["id"], self.worker_id, str(e), retry=False)
+            print(f"[Worker] Task {task['id']} ({task['kind']}) rejected: {e}")
+        except Exception as e:
+            traceback.print_exc()
+            task_queue.fail(self.engine, task["id"], self.worker_id, f"{type(e).__name__}: {e}")
+        else:
+            task_queue.complete(self.engine, task["id"], self.worker_id, result, artifact, out_dir)
+            print(f"[Worker] Task {task['id']} ({task['kind']}) done in {time.perf_counter() - t0:.1f}s")
+        finally:
+            done.set()
+            beat.join()
+
+    def run_once(self) -> bool:
+        """Reclaim stale tasks, then claim and run one. False if there was nothing to do."""
+        reclaimed = task_queue.reclaim(self.engine, self.stale_sec)
+        if reclaimed:
+            print(f"[Worker] Reclaimed {reclaimed} task(s) from lost workers")
+        task = task_queue.claim(self.engine, self.worker_id, self.kinds)
+        if task is None:
+            return False
+        self.run_task(task)
+        return True
+
+    def run(self, once: bool = False, poll: float = TASK_POLL_SEC):
+        print(f"[Worker] {self.worker_id} serving {', '.join(self.kinds)}")
+        while not self.stopping.is_set():
+            if not self.run_once():
+                if once:
+                    return
+                self.stopping.wait(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued conversion / transcription tasks.")
+    parser.add_argument("--kinds", default="", help=f"comma separated, default all: {', '.join(HANDLERS)}")
+    parser.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    parser.add_argument("--poll", type=float, default=TASK_POLL_SEC, help="seconds between polls of an empty queue")
+    parser.add_argument("--worker-id", default=None)
+    args = parser.parse_args()
+
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    unknown = set(kinds) - set(HANDLERS)
+    if unknown:
+        parser.error(f"unknown kinds: {', '.join(sorted(unknown))}")
+
+    from database import engine
+
+    worker = Worker(engine, kinds or None, worker_id=args.worker_id)
+    for sig in (signal.SIGTERM, signal.SIGINT):   # finish the current task, then exit
+        signal.signal(sig, lambda *_: worker.stopping.set())
+    worker.run(once=args.once, poll=args.poll)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,6 @@ import React, { useEffect, useRef, useState } from "react";
 import axios from "axios";
 import jsPDF from "jspdf";
 import ToolLayout from "./ToolLayout";
-import { createFFmpeg, fetchFile } from "@ffmpeg/ffmpeg";
-
-/**
- * FFmpeg WASM (0.11.x API)
- */
-
-const ffmpeg = createFFmpeg({ log: false });
-async function ensureFFmpegLoaded() {
-  if (!ffmpeg.isLoaded()) {
-    await ffmpeg.load();
-  }
-}
 
 /**
  * Warm up Render free-tier backend with /health (CORS-friendly)
@@ -34,47 +22,6 @@ async function warmUpServer(API_URL) {
   throw lastErr || new Error("Warm-up timed out");
 }
 
-/**
- * Extract audio and split into ~2‑min WAV chunks (16kHz mono)
- * 120s chunks are more stable on free CPU (smaller uploads to /transcribe/local)
- */
-async function extractAndChunkAudio(videoFile, onProgress) {
-  await ensureFFmpegLoaded();
-
-  const inputExt = (videoFile.name.split(".").pop() || "mp4").toLowerCase();
-  const inputName = `input.${inputExt}`;
-  ffmpeg.FS("writeFile", inputName, await fetchFile(videoFile));
-
-  onProgress?.("Extracting audio (16 kHz mono) …");
-  const wavName = "audio.wav";
-  await ffmpeg.run("-i", inputName, "-vn", "-ac", "1", "-ar", "16000", "-f", "wav", wavName);
-
-  onProgress?.("Splitting into 2‑minute chunks …");
-  await ffmpeg.run("-i", wavName, "-f", "segment", "-segment_time", "30", "-c", "copy", "chunk%03d.wav");
-
-  const entries = ffmpeg.FS("readdir", "/").filter((n) => /^chunk\d{3}\.wav$/.test(n)).sort();
-
-  if (!entries.length) {
-    // Fallback: ek hi chunk
-    const data = ffmpeg.FS("readFile", wavName);
-    try { ffmpeg.FS("unlink", wavName); } catch {}
-    try { ffmpeg.FS("unlink", inputName); } catch {}
-    return [{ name: "chunk000.wav", blob: new Blob([data.buffer], { type: "audio/wav" }), type: "audio/wav" }];
-  }
-
-  const chunks = [];
-  for (const name of entries) {
-    const data = ffmpeg.FS("readFile", name);
-    chunks.push({ name, blob: new Blob([data.buffer], { type: "audio/wav" }), type: "audio/wav" });
-    try { ffmpeg.FS("unlink", name); } catch {}
-  }
-
-  try { ffmpeg.FS("unlink", wavName); } catch {}
-  try { ffmpeg.FS("unlink", inputName); } catch {}
-
-  return chunks;
-}
-
 const MeetingMom = ({ setActiveTab, onSuccess }) => {
   // Files
   const [video, setVideo] = useState(null);
@@ -205,44 +152,28 @@ const MeetingMom = ({ setActiveTab, onSuccess }) => {
         const hasTranscript = Boolean(transcript.trim());
 
         let finalTranscript = "";
-// handleGenerate function ke andar jahan "hasVideo" wala block hai:
-
-if (hasVideo) {
-  setMsg("Extracting audio... Please keep this tab active.");
-  const chunks = await extractAndChunkAudio(video, (m) => setMsg(m));
-
-  const parts = [];
-  for (let i = 0; i < chunks.length; i++) {
-    setMsg(`Transcribing chunk ${i + 1}/${chunks.length} (safe mode) …`);
-    
-    // FormData har baar loop ke andar naya banna chahiye
-    const form = new FormData();
-    form.append("file", new File([chunks[i].blob], chunks[i].name, { type: "audio/wav" }));
-
-    let success = false;
-    let attempts = 0;
-
-    while (!success && attempts < 5) {
-      try {
-        const r = await axios.post(`${API_URL}/transcribe/local`, form, {
-          headers: { "Content-Type": "multipart/form-data" },
-          timeout: 300000, // 3 minutes
-        });
-          parts.push(r?.data?.text || "");
-          success = true;
-        
-        // Render server ko thoda "rest" dene ke liye 2 sec wait
-        await new Promise(res => setTimeout(res, 10000));
-        
-      } catch (e) {
-        attempts++;
-        setMsg(`Server busy... Retrying part ${i+1} (Attempt ${attempts}/5)`);
-        await new Promise(res => setTimeout(res, 15000));
-      }
-    }
-  }
-  finalTranscript = parts.join("\n").trim();
-}
+        if (hasVideo) {
+          // Server decodes the upload with ffmpeg and streams it into Whisper,
+          // so no ffmpeg.wasm download / in-browser extraction is needed.
+          let attempts = 0;
+          while (attempts < 3) {
+            try {
+              setMsg(attempts ? `Server busy... Retrying (Attempt ${attempts + 1}/3)` : "Uploading & transcribing on server …");
+              const form = new FormData();
+              form.append("file", video);
+              const r = await axios.post(`${API_URL}/transcribe/local`, form, {
+                headers: { "Content-Type": "multipart/form-data" },
+                timeout: 30 * 60_000,
+              });
+              finalTranscript = (r?.data?.text || "").trim();
+              break;
+            } catch (e) {
+              attempts++;
+              if (attempts >= 3) throw e;
+              await new Promise((res) => setTimeout(res, 15000));
+            }
+          }
+        }
 
         // 3) Generate MOM (image optional)
         setMsg("Generating MOM…");